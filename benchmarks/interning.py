@@ -0,0 +1,106 @@
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Dict
+from typing import List
+
+import pydantic
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+
+DESCRIPTION = """
+Benchmark loading rows that share identical JSON documents, with and without interning.
+
+Inserts `--rows` rows into an in-memory SQLite database, whose `MutableDict` and
+`MutablePydanticBaseModel` columns hold one of `--distinct` documents, then times selecting
+them back and measures the memory held by the loaded rows:
+
+* lazy     - `lazy=True`, every row decodes and validates its own document
+* interned - `intern_size=--distinct`, identical documents are decoded once and shared
+
+Usage: python benchmarks/interning.py [--rows 2000] [--distinct 10] [--items 32] [--repeat 5]
+"""
+
+
+class Item(pydantic.BaseModel):
+    name: str
+    tags: List[str] = []
+    attrs: Dict[str, int] = {}
+
+
+class Document(MutablePydanticBaseModel):
+    title: str
+    items: List[Item] = []
+
+
+def make_mapping(**options):
+    class Base(DeclarativeBase):
+        pass
+
+    class Row(Base):
+        __tablename__ = "row"
+
+        id: Mapped[int] = mapped_column(primary_key=True)
+        settings: Mapped[MutableDict] = mapped_column(MutableDict.as_mutable(sa.JSON(), **options))
+        model: Mapped[Document] = mapped_column(Document.as_mutable(sa.JSON(), **options))
+
+    return Base, Row
+
+
+def make_document(n: int, items: int):
+    return {
+        "title": f"doc{n}",
+        "items": [{"name": f"item{i}", "tags": ["a", "b"], "attrs": {"x": i, "n": n}} for i in range(items)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=10)
+    parser.add_argument("--items", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = [make_document(n, args.items) for n in range(args.distinct)]
+    print(f"rows={args.rows} distinct={args.distinct} items={args.items}")
+    for name, options in {"lazy": {"lazy": True}, "interned": {"intern_size": args.distinct}}.items():
+        Base, Row = make_mapping(**options)
+        engine = sa.create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            for i in range(args.rows):
+                document = documents[i % args.distinct]
+                session.add(Row(settings=document, model=document))
+            session.commit()
+
+        timings = []
+        for _ in range(args.repeat):
+            gc.collect()
+            with Session(engine) as session:
+                start = time.perf_counter()
+                session.scalars(sa.select(Row)).all()
+                timings.append(time.perf_counter() - start)
+
+        gc.collect()
+        with Session(engine) as session:
+            tracemalloc.start()
+            rows = session.scalars(sa.select(Row)).all()
+            # read a field of every row, as a typical endpoint would
+            titles = [row.model.title for row in rows]
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        del rows, titles
+
+        elapsed = min(timings)
+        print(f"{name:9} {elapsed * 1e3:9.2f} ms  held {current / 2**20:7.2f} MiB  peak {peak / 2**20:7.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import gc
+import time
+from typing import Dict
+from typing import List
+
+import pydantic
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+
+DESCRIPTION = """
+Benchmark loading pydantic columns with the `validate_json` and `trusted_load` options.
+
+Inserts `--rows` rows holding a `MutablePydanticBaseModel` document into an in-memory SQLite
+database, then times selecting them back:
+
+* default       - the driver's JSON decoding, then `model_validate` over the dicts
+* validate_json - the column is fetched as text and parsed by `model_validate_json`
+* trusted_load  - the driver's JSON decoding, then `model_construct` without validation
+* both          - the column is fetched as text, decoded by `pydantic_core`, then constructed
+
+With `--lazy` the columns wrap nested values on first access, which leaves the decoding and
+validation as the main cost of a load.
+
+Usage: python benchmarks/load.py [--rows 500] [--items 64] [--repeat 5] [--lazy]
+"""
+
+
+class Item(pydantic.BaseModel):
+    name: str
+    tags: List[str] = []
+    attrs: Dict[str, int] = {}
+
+
+class Document(MutablePydanticBaseModel):
+    title: str
+    items: List[Item] = []
+
+
+def make_mapping(lazy: bool, **options):
+    class Base(DeclarativeBase):
+        pass
+
+    class Row(Base):
+        __tablename__ = "row"
+
+        id: Mapped[int] = mapped_column(primary_key=True)
+        model: Mapped[Document] = mapped_column(Document.as_mutable(sa.JSON(), lazy=lazy, **options))
+
+    return Base, Row
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--items", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--lazy", action="store_true")
+    args = parser.parse_args()
+
+    document = {
+        "title": "doc",
+        "items": [
+            {"name": f"item{i}", "tags": ["a", "b", "c"], "attrs": {"x": i, "y": i, "z": i}} for i in range(args.items)
+        ],
+    }
+    print(f"rows={args.rows} items={args.items} lazy={args.lazy}")
+    variants = {
+        "default": {},
+        "validate_json": {"validate_json": True},
+        "trusted_load": {"trusted_load": True},
+        "both": {"validate_json": True, "trusted_load": True},
+    }
+    for name, options in variants.items():
+        Base, Row = make_mapping(args.lazy, **options)
+        engine = sa.create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add_all(Row(model=document) for _ in range(args.rows))
+            session.commit()
+
+        def load():
+            with Session(engine) as session:
+                session.scalars(sa.select(Row)).all()
+
+        elapsed = best_of(args.repeat, load)
+        print(f"{name:13} {elapsed * 1e3:10.2f} ms  ({elapsed / args.rows * 1e6:.0f} us/row)")
+
+
+if __name__ == "__main__":
+    main()
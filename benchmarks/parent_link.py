@@ -0,0 +1,80 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+from sqlalchemyv2_nested_mutable import MutableDict
+
+DESCRIPTION = """
+Benchmark the cost of linking nested tracked objects to their parents.
+
+Measures, for a `MutableDict` built from a nested document:
+
+* load   - wrapping the whole document (`MutableDict(doc)`)
+* mutate - a loop of deep `__setitem__` calls, each propagating `changed()` to the root
+* memory - peak memory allocated while wrapping the document
+
+Usage: python benchmarks/parent_link.py [--width 10] [--depth 4] [--repeat 5]
+"""
+
+
+def make_doc(width: int, depth: int):
+    if depth == 0:
+        return {f"k{i}": i for i in range(width)}
+    return {f"k{i}": make_doc(width, depth - 1) if i % 2 == 0 else [i, {"v": i}] for i in range(width)}
+
+
+def count_nodes(doc) -> int:
+    if isinstance(doc, dict):
+        return 1 + sum(count_nodes(v) for v in doc.values())
+    if isinstance(doc, list):
+        return 1 + sum(count_nodes(v) for v in doc)
+    return 0
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mutations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    doc = make_doc(args.width, args.depth)
+    nodes = count_nodes(doc)
+
+    load = best_of(args.repeat, lambda: MutableDict(doc))
+
+    tracemalloc.start()
+    tracked = MutableDict(doc)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    leaf = tracked
+    while isinstance(leaf.get("k0"), dict):
+        leaf = leaf["k0"]
+
+    def mutate():
+        for i in range(args.mutations):
+            leaf["k0"] = i
+
+    mutate_time = best_of(args.repeat, mutate)
+
+    print(f"nodes={nodes} depth={args.depth}")
+    print(f"load    {load * 1e3:10.2f} ms  ({load / nodes * 1e9:.0f} ns/node)")
+    print(f"mutate  {mutate_time * 1e3:10.2f} ms  ({mutate_time / args.mutations * 1e9:.0f} ns/change)")
+    print(f"memory  {peak / 1024:10.1f} KiB ({peak / nodes:.0f} B/node)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import gc
+import time
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import pydantic
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable._compat import msgspec
+from sqlalchemyv2_nested_mutable._compat import orjson
+
+DESCRIPTION = """
+Benchmark the JSON serializers available on the bind path of tracked columns.
+
+Flushes `--rows` rows holding a `MutablePydanticBaseModel` and a `MutableDict` built from
+the same nested document into an in-memory SQLite database, once per serializer:
+
+* default  - `value.dict()` / the dialect's `json.dumps`
+* pydantic - `model_dump_json()` / `pydantic_core.to_json`
+* orjson, msgspec - when installed
+
+Usage: python benchmarks/serializer.py [--rows 500] [--width 8] [--depth 2] [--repeat 5]
+"""
+
+
+class Item(pydantic.BaseModel):
+    name: str
+    tags: List[str] = []
+    attrs: Dict[str, int] = {}
+
+
+class Document(MutablePydanticBaseModel):
+    title: str
+    items: List[Item] = []
+    extra: Optional[dict] = None
+
+
+def make_doc(width: int, depth: int):
+    if depth == 0:
+        return {f"k{i}": i for i in range(width)}
+    return {f"k{i}": make_doc(width, depth - 1) if i % 2 == 0 else [i, {"v": i}] for i in range(width)}
+
+
+def make_model(width: int, depth: int):
+    return {
+        "title": "doc",
+        "items": [{"name": f"item{i}", "tags": ["a", "b"], "attrs": {"x": i, "y": i}} for i in range(width * 4)],
+        "extra": make_doc(width, depth),
+    }
+
+
+def make_mapping(serializer):
+    class Base(DeclarativeBase):
+        pass
+
+    class Row(Base):
+        __tablename__ = "row"
+
+        id: Mapped[int] = mapped_column(primary_key=True)
+        model: Mapped[Document] = mapped_column(Document.as_mutable(sa.JSON(), serializer=serializer))
+        doc: Mapped[MutableDict] = mapped_column(MutableDict.as_mutable(sa.JSON(), serializer=serializer))
+
+    return Base, Row
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        timings.append(fn())
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    serializers = {"default": None, "pydantic": "pydantic"}
+    if orjson is not None:
+        serializers["orjson"] = "orjson"
+    if msgspec is not None:
+        serializers["msgspec"] = "msgspec"
+
+    model = make_model(args.width, args.depth)
+    doc = make_doc(args.width, args.depth)
+    print(f"rows={args.rows} width={args.width} depth={args.depth}")
+    for name, serializer in serializers.items():
+        Base, Row = make_mapping(serializer)
+        engine = sa.create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+
+        def flush():
+            with Session(engine) as session:
+                session.add_all(Row(model=model, doc=doc) for _ in range(args.rows))
+                start = time.perf_counter()
+                session.flush()
+                elapsed = time.perf_counter() - start
+                session.rollback()
+            return elapsed
+
+        elapsed = best_of(args.repeat, flush)
+        print(f"{name:9} {elapsed * 1e3:10.2f} ms  ({args.rows / elapsed:8.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
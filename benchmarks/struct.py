@@ -0,0 +1,103 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import List
+
+import msgspec
+import pydantic
+from sqlalchemy.dialects import postgresql
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable import MutableStruct
+from sqlalchemyv2_nested_mutable.mutable import PydanticType
+from sqlalchemyv2_nested_mutable.mutable import StructType
+
+DESCRIPTION = """
+Benchmark `MutableStruct` columns against the equivalent `MutablePydanticBaseModel` columns.
+
+Runs the bind and result processors of both column types on a document of `--items` items:
+
+* load   - decoding the JSON text of the document into a tracked value (`validate_json=True` for pydantic)
+* dump   - encoding the tracked value back to JSON text (`serializer="pydantic"` for pydantic)
+* memory - memory held by a loaded value
+
+Usage: python benchmarks/struct.py [--items 200] [--number 200] [--repeat 5]
+"""
+
+
+class Item(msgspec.Struct):
+    sku: str
+    quantity: int = 1
+    tags: List[str] = []
+
+
+class Order(MutableStruct):
+    customer: str
+    items: List[Item] = []
+
+
+class ModelItem(pydantic.BaseModel):
+    sku: str
+    quantity: int = 1
+    tags: List[str] = []
+
+
+class ModelOrder(MutablePydanticBaseModel):
+    customer: str
+    items: List[ModelItem] = []
+
+
+def best_of(repeat: int, number: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+def retained(fn) -> int:
+    gc.collect()
+    tracemalloc.start()
+    value = fn()  # noqa: F841 - held while measuring
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    document = {
+        "customer": "c",
+        "items": [{"sku": f"s{i}", "quantity": i, "tags": ["a", "b"]} for i in range(args.items)],
+    }
+    text = json.dumps(document)
+    dialect = postgresql.dialect()
+    print(f"items={args.items}")
+    variants = {
+        "struct": StructType(Order),
+        "pydantic": PydanticType(ModelOrder, validate_json=True, serializer="pydantic"),
+    }
+    for name, sqltype in variants.items():
+        load = sqltype.result_processor(dialect, None)
+        dump = sqltype.bind_processor(dialect)
+        value = load(text)
+
+        load_time = best_of(args.repeat, args.number, lambda: load(text))
+        dump_time = best_of(args.repeat, args.number, lambda: dump(value))
+        memory = retained(lambda: load(text))
+        print(
+            f"{name:8} load {load_time * 1e3:8.3f} ms  dump {dump_time * 1e3:8.3f} ms  memory {memory / 1024:8.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
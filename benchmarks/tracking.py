@@ -0,0 +1,117 @@
+import argparse
+import gc
+import time
+
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+
+DESCRIPTION = """
+Compare the `mutations` and `snapshot` change tracking strategies of `MutableDict` columns.
+
+Loads `--rows` rows holding a nested JSON document from an in-memory SQLite database, applies
+`--edits` in-place changes to each of them and commits, once per strategy and number of edits:
+
+* mutations - the default, every change to a tracked container flags the column
+* snapshot  - plain dicts and lists, a fingerprint taken at load is compared at flush
+
+Then, with all rows loaded, alternates changing a single row and running a query (which
+autoflushes) `--queries` times.
+
+Mutation tracking pays on every change (and when wrapping values at load), snapshot tracking
+pays one fingerprint per value at load and one per loaded value at each flush. The first wins
+for sessions that flush often while holding many values, the second for edit-heavy ones.
+
+Usage: python benchmarks/tracking.py [--rows 200] [--width 8] [--edits 1 10 100 1000] [--queries 10 100] [--repeat 3]
+"""
+
+
+def make_doc(width: int):
+    return {f"k{i}": {"count": 0, "tags": ["a", "b"], "nested": {"x": i}} for i in range(width)}
+
+
+def make_mapping(tracking: str):
+    class Base(DeclarativeBase):
+        pass
+
+    class Row(Base):
+        __tablename__ = "row"
+
+        id: Mapped[int] = mapped_column(primary_key=True)
+        doc: Mapped[MutableDict] = mapped_column(MutableDict.as_mutable(sa.JSON(), tracking=tracking))
+
+    return Base, Row
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--edits", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--queries", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    doc = make_doc(args.width)
+    keys = list(doc)
+    print(f"rows={args.rows} width={args.width}")
+    print(f"{'edits':>6} " + " ".join(f"{tracking:>12}" for tracking in ("mutations", "snapshot")))
+    mappings = {}
+    for tracking in ("mutations", "snapshot"):
+        Base, Row = make_mapping(tracking)
+        engine = sa.create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add_all(Row(doc=doc) for _ in range(args.rows))
+            session.commit()
+        mappings[tracking] = (engine, Row)
+
+    for edits in args.edits:
+        timings = []
+        for tracking, (engine, Row) in mappings.items():
+
+            def run():
+                with Session(engine) as session:
+                    for row in session.scalars(sa.select(Row)):
+                        for i in range(edits):
+                            entry = row.doc[keys[i % len(keys)]]
+                            entry["count"] += 1
+                            entry["tags"][0] = str(i)
+                    session.commit()
+
+            timings.append(best_of(args.repeat, run))
+        print(f"{edits:>6} " + " ".join(f"{elapsed * 1e3:9.2f} ms" for elapsed in timings))
+
+    print(f"{'queries':>7}" + " ".join(f"{tracking:>12}" for tracking in ("mutations", "snapshot")))
+    for queries in args.queries:
+        timings = []
+        for tracking, (engine, Row) in mappings.items():
+
+            def run():
+                with Session(engine) as session:
+                    rows = session.scalars(sa.select(Row)).all()
+                    for i in range(queries):
+                        row = rows[i % len(rows)]
+                        row.doc[keys[0]]["count"] += 1
+                        session.scalar(sa.select(Row.id).where(Row.id == row.id))
+                    session.commit()
+
+            timings.append(best_of(args.repeat, run))
+        print(f"{queries:>7}" + " ".join(f"{elapsed * 1e3:9.2f} ms" for elapsed in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,37 @@
+from .comparators import json_path_indexes
+from .mutable import MutableDataclass
 from .mutable import MutableDict
 from .mutable import MutableList
 from .mutable import MutablePydanticBaseModel
+from .mutable import MutableSet
+from .mutable import MutableStruct
+from .trackable import register_tracker
+from .trackable import tracked_model_cache_clear
+from .trackable import tracked_model_cache_info
+from .trackable import TrackedDataclass
 from .trackable import TrackedDict
 from .trackable import TrackedList
 from .trackable import TrackedPydanticBaseModel
+from .trackable import TrackedSet
+from .trackable import TrackedStruct
 
 __version__ = '0.0.1'
 
 __all__ = [
     'TrackedList',
     'TrackedDict',
+    'TrackedSet',
     'TrackedPydanticBaseModel',
+    'TrackedDataclass',
+    'TrackedStruct',
     'MutableList',
     'MutableDict',
+    'MutableSet',
     'MutablePydanticBaseModel',
+    'MutableDataclass',
+    'MutableStruct',
+    'tracked_model_cache_info',
+    'tracked_model_cache_clear',
+    'json_path_indexes',
+    'register_tracker',
 ]
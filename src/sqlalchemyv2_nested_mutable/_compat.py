@@ -2,3 +2,13 @@ try:
     import pydantic
 except ImportError:
     pydantic = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
@@ -0,0 +1,115 @@
+# Measure how many bytes flushes rewrite in mutable columns, against how many actually changed.
+#
+# A one-field change to a document still rewrites the whole document, so columns holding large
+# documents that change a little at a time are candidates for `partial_updates` or for splitting
+# the document. With `enable()`, the paths changed on each value are remembered (see
+# `instrumentation`), and after each flush every value written in full is measured:
+#
+# * `bytes_written` - the size of the JSON text of the value
+# * `bytes_changed` - the size of the JSON text of its outermost changed entries, or of the whole
+#   value when it was assigned, inserted or replaced as a whole
+#
+# `report()` sums these up per column and per table, along with their ratio. Values written with
+# `partial_updates` are not rewritten in full, and are left out.
+from __future__ import annotations
+
+import json
+from itertools import chain
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import attributes
+from sqlalchemy.orm import InstanceState
+from sqlalchemy.orm import Session
+
+from . import instrumentation
+from ._compat import pydantic
+from .trackable import _child_at
+from .trackable import _MISSING
+
+
+def _json_size(value: Any) -> int:
+    if pydantic is not None:
+        from pydantic_core import to_json
+
+        return len(to_json(value))
+    return len(json.dumps(value, separators=(',', ':'), default=str).encode())
+
+
+def _outermost(paths: Set[Tuple[Any, ...]]) -> Iterable[Tuple[Any, ...]]:
+    # entries below a changed container are written along with it
+    return (path for path in paths if not any(path[:i] in paths for i in range(len(path))))
+
+
+def _changed_size(root: Any, paths: Set[Tuple[Any, ...]]) -> int:
+    size = 0
+    for path in _outermost(paths):
+        node = root
+        for key in path:
+            if (node := _child_at(node, key)) is _MISSING:
+                break
+        # removed entries only shrink the document
+        size += 0 if node is _MISSING else _json_size(node)
+    return size
+
+
+def enable() -> instrumentation.Recorder:
+    """Start measuring write amplification, along with the rest of `instrumentation`."""
+    recorder = instrumentation.enable()
+    recorder.track_writes = True
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_rollback', _forget_paths)
+    return recorder
+
+
+def report() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Return the writes, bytes written and bytes changed so far, by column and by table, with the
+    `amplification` (bytes written per byte changed, `None` if none changed).
+    """
+    columns: Dict[str, Dict[str, Any]] = {}
+    tables: Dict[str, Dict[str, Any]] = {}
+    recorder = instrumentation.recorder
+    if recorder is None:
+        return {'columns': columns, 'tables': tables}
+    for column, table in recorder.tables.items():
+        stats = recorder.columns[column]
+        for totals in (columns.setdefault(column, {}), tables.setdefault(table, {})):
+            totals['writes'] = totals.get('writes', 0) + stats.writes
+            totals['bytes_written'] = totals.get('bytes_written', 0) + stats.bytes_written
+            totals['bytes_changed'] = totals.get('bytes_changed', 0) + stats.bytes_changed
+    for totals in chain(columns.values(), tables.values()):
+        changed = totals['bytes_changed']
+        totals['amplification'] = totals['bytes_written'] / changed if changed else None
+    return {'columns': columns, 'tables': tables}
+
+
+def _forget_paths(session: Session) -> None:
+    session.info.pop(instrumentation.CHANGED_PATHS, None)
+
+
+def _after_flush(session: Session, flush_context: Any) -> None:
+    changed: Dict[int, Tuple[Any, Set[Tuple[Any, ...]]]] = session.info.pop(instrumentation.CHANGED_PATHS, {})
+    if (recorder := instrumentation.recorder) is None or not recorder.track_writes:
+        return
+    # `new` and `dirty` still list the flushed objects, and `committed_state` the written keys
+    for obj in chain(session.new, session.dirty):
+        state: InstanceState[Any] = attributes.instance_state(obj)
+        for key in instrumentation.column_keys(state.class_):
+            if state.key is not None and key not in state.committed_state:
+                continue
+            if (value := state.dict.get(key)) is None:
+                continue
+            written = _json_size(value)
+            paths: Optional[Set[Tuple[Any, ...]]] = None
+            if (entry := changed.get(id(value))) is not None and entry[0] is value:
+                paths = entry[1]
+            size = written if state.key is None or paths is None or () in paths else _changed_size(value, paths)
+            table = state.mapper.get_property(key).columns[0].table
+            recorder.record_write(f'{state.class_.__name__}.{key}', table.name, written, size)
@@ -0,0 +1,121 @@
+# Validate the pydantic columns of many rows at once.
+#
+# Loading a row validates each of its pydantic values with one `model_validate` call, whose fixed
+# cost dominates when reports load many small values. `bulk_load()` loads the rows with validation
+# left out, leaving `UnvalidatedValue` placeholders (also in related objects loaded along), then
+# validates the values of each column a chunk of rows at a time, with a single call to a cached
+# `TypeAdapter(list[Model])`, and puts them in place as if they had been loaded with the rows.
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from sqlalchemy.orm import Session
+
+from ._compat import pydantic
+from .offload import attach
+from .offload import PendingValue
+
+# The pydantic values left unvalidated while loading `collected()`.
+_collected: ContextVar[Optional[List[UnvalidatedValue]]] = ContextVar('_collected', default=None)
+
+
+class UnvalidatedValue(PendingValue):
+    """The JSON text or decoded document of a pydantic value, until `bulk_load()` validates it."""
+
+    __slots__ = ('sqltype', 'text')
+
+    def __init__(self, raw: Any, sqltype: Any, text: bool):
+        super().__init__(raw, None)
+        self.sqltype = sqltype
+        self.text = text
+
+    def __call__(self) -> Any:
+        return self.resolve(self.raw)
+
+    def resolve(self, value: Any) -> Any:
+        [value] = self.sqltype.validate_many([value], self.text)
+        return value if self.coerce is None else self.coerce(self.key, value)
+
+
+@contextmanager
+def collected() -> Iterator[List[UnvalidatedValue]]:
+    """Leave the values of pydantic columns loaded in this block unvalidated, in the list returned."""
+    token = _collected.set(values := [])
+    try:
+        yield values
+    finally:
+        _collected.reset(token)
+
+
+def collect(raw: Any, sqltype: Any, text: bool) -> Optional[UnvalidatedValue]:
+    """Return an `UnvalidatedValue` of the `sqltype` column, or `None` unless loading `collected()`."""
+    if (values := _collected.get()) is None:
+        return None
+    values.append(value := UnvalidatedValue(raw, sqltype, text))
+    return value
+
+
+@cache
+def list_adapter(model_cls: type) -> Any:
+    """
+    Return the cached `TypeAdapter` validating a list of `model_cls` instances.
+
+    The list holds instances of a subclass keeping the `__init__` of `pydantic.BaseModel`, which
+    pydantic-core builds without calling back into Python for each one, see `validate_models()`.
+    """
+    namespace = {'__slots__': (), '__init__': pydantic.BaseModel.__init__, '__module__': model_cls.__module__}
+    return pydantic.TypeAdapter(List[type(model_cls.__name__, (model_cls,), namespace)])  # type: ignore[misc]
+
+
+def validate_models(model_cls: type, values: List[Any], text: bool = False) -> List[Any]:
+    """Validate the documents, or JSON texts if `text`, of many `model_cls` instances in one call."""
+    adapter = list_adapter(model_cls)
+    # one JSON array of all the documents
+    models = adapter.validate_json('[' + ','.join(values) + ']') if text else adapter.validate_python(values)
+    setattr_ = object.__setattr__
+    for model in models:
+        # what `model_cls.__init__` would have done after validating
+        setattr_(model, '__class__', model_cls)
+        model._track_fields()
+    return models
+
+
+def validate(values: List[UnvalidatedValue]) -> None:
+    """Validate unvalidated `values`, one call per column, and put them in place in the objects holding them."""
+    columns: Dict[Tuple[int, bool], List[UnvalidatedValue]] = {}
+    for value in values:
+        # values of rows already in the session were discarded by the load
+        if value.state is not None:
+            columns.setdefault((id(value.sqltype), value.text), []).append(value)
+    for pending in columns.values():
+        validated = pending[0].sqltype.validate_many([value.raw for value in pending], pending[0].text)
+        for value, model in zip(pending, validated):
+            state, key = value.state, value.key
+            if (obj := state.obj()) is not None and state.dict.get(key) is value:
+                attach(obj, key, model if value.coerce is None else value.coerce(key, model))
+
+
+def bulk_load(session: Session, statement: Any, params: Any = None, chunk_size: int = 1000, **kw: Any) -> List[Any]:
+    """
+    Return the objects selected by `statement`, like `Session.scalars(...).all()`, validating their
+    pydantic values `chunk_size` rows at a time.
+
+    Rows are fetched with `yield_per=chunk_size`, so that only one chunk of them is loaded and left
+    unvalidated at a time, which rules out eager loading collections with `joinedload()`.
+    """
+    execution_options = {**kw.pop('execution_options', {}), 'yield_per': chunk_size}
+    objects: List[Any] = []
+    with collected() as values:
+        for chunk in session.scalars(statement, params, execution_options=execution_options, **kw).partitions():
+            validate(values)
+            values.clear()
+            objects.extend(chunk)
+    return objects
@@ -0,0 +1,134 @@
+# A compact pickle format for caching objects holding tracked values, e.g. in a second-level cache.
+#
+# Plain pickling stores every nested tracked container with its class, and cannot store the
+# classes generated for nested pydantic models or for the variants of a column (lazy, journaled).
+# `dumps()` pickles the values of mutable columns as the JSON document they are stored as instead,
+# along with the class mapped to the column, so payloads stay close to the size of the JSON:
+#
+#     region = make_region().configure(
+#         'dogpile.cache.redis', ..., serializer=caching.dumps, deserializer=caching.loads
+#     )
+#
+# `loads()` decodes the documents and wraps their nested values lazily, when they are first read, so
+# restoring costs little more than decoding the JSON. Restored values were loaded from the database
+# before being cached, but their first change is written in full rather than as a partial update.
+#
+# Values of columns that are not JSON (e.g. a `MutableList` on an ARRAY), and values JSON cannot
+# encode, are pickled as usual.
+from __future__ import annotations
+
+import io
+import json
+import pickle
+from functools import cache
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy.ext.mutable import Mutable
+
+from ._compat import msgspec
+from ._compat import orjson
+from .dataclass_json import structure
+from .dataclass_json import unstructure
+from .mutable import MutableDataclass
+from .mutable import MutableDict
+from .mutable import MutableList
+from .mutable import MutablePydanticBaseModel
+from .mutable import MutableStruct
+from .mutable import tracking_variant
+from .serializers import _dump_model
+from .trackable import TrackedObject
+from .trusted import trusted_constructor
+
+
+def dumps(obj: Any, protocol: int = pickle.HIGHEST_PROTOCOL) -> bytes:
+    """Pickle `obj`, storing the tracked values of mutable columns in it as JSON."""
+    buffer = io.BytesIO()
+    Pickler(buffer, protocol).dump(obj)
+    return buffer.getvalue()
+
+
+def loads(data: bytes) -> Any:
+    """Unpickle data written by `dumps()`."""
+    return pickle.loads(data)
+
+
+class Pickler(pickle.Pickler):
+    """A pickler storing the tracked values of mutable columns as JSON, see `dumps()`."""
+
+    def reducer_override(self, obj: Any) -> Any:
+        if isinstance(obj, Mutable) and isinstance(obj, TrackedObject):
+            return _reduce(obj)
+        return NotImplemented
+
+
+def restore(cls: type, journal_limit: Optional[int], partial_writes: bool, document: bytes) -> Any:
+    """Rebuild a value pickled by `Pickler` as an instance of the tracking variant of `cls`."""
+    variant = tracking_variant(cls, journal_limit=journal_limit, partial_writes=partial_writes)
+    return _loader(variant)(document)
+
+
+def _reduce(value: Any) -> Any:
+    cls = type(value)
+    while (source := cls.__dict__.get('__variant_of__')) is not None:
+        cls = source
+    if not isinstance(value, (MutablePydanticBaseModel, MutableDataclass, MutableStruct)) and not all(
+        _json_column(state, key) for state, key in value._parents.items()
+    ):
+        return NotImplemented
+    try:
+        document = _dumper(cls)(value)
+    except (TypeError, ValueError):
+        return NotImplemented
+    return restore, (cls, value._journal_limit, value._partial_writes, document)
+
+
+def _json_column(state: Any, key: str) -> bool:
+    sqltype = state.mapper.get_property(key).columns[0].type
+    while isinstance(sqltype, sa.types.TypeDecorator):
+        sqltype = sqltype.impl_instance
+    return isinstance(sqltype, sa.JSON)
+
+
+def _dump_json(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=_dump_model)
+    if msgspec is not None:
+        return msgspec.json.encode(value, enc_hook=_dump_model)
+    return json.dumps(value, separators=(',', ':'), default=_dump_model).encode()
+
+
+_load_json: Callable[[bytes], Any] = json.loads
+if orjson is not None:
+    _load_json = orjson.loads
+elif msgspec is not None:
+    _load_json = msgspec.json.decode
+
+
+def _dumper(cls: type) -> Callable[[Any], bytes]:
+    if issubclass(cls, MutablePydanticBaseModel):
+        return lambda value: value.model_dump_json().encode()
+    if issubclass(cls, MutableDataclass):
+        return lambda value: _dump_json(unstructure(value))
+    return _dump_json
+
+
+@cache
+def _loader(cls: type) -> Callable[[bytes], Any]:
+    # documents were valid when they were cached, nested values are wrapped when they are first read
+    if issubclass(cls, (MutableDict, MutableList)):
+        lazy_cls = tracking_variant(cls, lazy=True)
+        return lambda document: lazy_cls(_load_json(document))
+    if issubclass(cls, MutablePydanticBaseModel):
+        from pydantic_core import from_json
+
+        construct = trusted_constructor(tracking_variant(cls, lazy=True))
+        return lambda document: construct(from_json(document))
+    if issubclass(cls, MutableDataclass):
+        return lambda document: structure(cls, _load_json(document))
+    if issubclass(cls, MutableStruct):
+        return msgspec.json.Decoder(cls).decode
+    # e.g. a `MutableSet`
+    return lambda document: cls(_load_json(document))
@@ -0,0 +1,216 @@
+# Query pydantic columns by the fields of their model, with SQL that a GIN index can serve.
+#
+# On a `PydanticType` column, attributes named after the model's fields build a path into the
+# document, e.g. `User.addresses.preferred.city`, and comparing the path compiles to:
+#
+# * `==`, `!=` and `.contains()` - JSONB containment (`@>`) of the equivalent sub-document, served
+#   by a GIN index with the `jsonb_path_ops` operator class
+# * `<`, `<=`, `>`, `>=` - the value at the path cast to the SQL type of the field, served by a
+#   B-tree index on the same expression, or `jsonb_path_exists` when the path goes through a list
+#   (`User.addresses.others.city`), which the GIN index serves as well
+#
+# `json_path_indexes` returns these indexes for a column. Paths compile to PostgreSQL operators and
+# functions on JSONB, so they are only available on PostgreSQL.
+from __future__ import annotations
+
+import decimal
+import json
+from types import UnionType
+from typing import Annotated
+from typing import Any
+from typing import get_args
+from typing import get_origin
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONPATH
+from sqlalchemy.sql.elements import ColumnElement
+
+from ._compat import pydantic
+from .trackable import _jsonable
+
+# Marks a step through every item of a list.
+_EACH = object()
+
+# SQL types the text at a path is cast to before comparing it, by field annotation.
+_SQL_TYPES = {
+    bool: sa.Boolean,
+    int: sa.BigInteger,
+    float: sa.Float,
+    decimal.Decimal: sa.Numeric,
+}
+
+_OPERATORS = {
+    '<': sa.sql.operators.lt,
+    '<=': sa.sql.operators.le,
+    '>': sa.sql.operators.gt,
+    '>=': sa.sql.operators.ge,
+}
+
+
+def _unwrap(annotation: Any) -> Any:
+    # `Annotated[X, ...]` and `Optional[X]` query like `X`
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _unwrap(get_args(annotation)[0])
+    if origin is Union or origin is UnionType:
+        options = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(options) == 1:
+            return _unwrap(options[0])
+    return annotation
+
+
+def _item_type(annotation: Any) -> Optional[Tuple[Any]]:
+    # the annotation of the items of a list field, `None` if it is not a list
+    origin = get_origin(annotation)
+    if annotation is list or origin is list or origin is List:
+        args = get_args(annotation)
+        return (_unwrap(args[0]) if args else Any,)
+    return None
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and pydantic is not None and issubclass(annotation, pydantic.BaseModel)
+
+
+class JSONPath:
+    """
+    A path into the documents of a JSONB column, following the annotations of a pydantic model.
+
+    Attributes step into model fields (and into the items of list fields), subscripts into dict
+    keys and list indexes.
+    """
+
+    __slots__ = ('_column', '_annotation', '_steps')
+
+    def __init__(self, column: Any, annotation: Any, steps: Tuple[Any, ...] = ()):
+        self._column = column
+        self._annotation = _unwrap(annotation)
+        self._steps = steps
+
+    def __repr__(self) -> str:
+        path = '.'.join('*' if step is _EACH else str(step) for step in self._steps)
+        return f'JSONPath({self._column}, {path!r})'
+
+    def __getattr__(self, name: str) -> JSONPath:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        annotation, steps = self._annotation, self._steps
+        if (item := _item_type(annotation)) is not None:
+            # a field of a list of models matches if any of the items matches
+            annotation, steps = item[0], steps + (_EACH,)
+        if not _is_model(annotation) or name not in annotation.model_fields:
+            raise AttributeError(f'{self!r} has no field {name!r}')
+        return JSONPath(self._column, annotation.model_fields[name].annotation, steps + (name,))
+
+    def __getitem__(self, key: Union[str, int]) -> JSONPath:
+        annotation = self._annotation
+        if (item := _item_type(annotation)) is not None:
+            if not isinstance(key, int):
+                raise TypeError(f'{self!r} is a list, expected an index, got {key!r}')
+            return JSONPath(self._column, item[0], self._steps + (key,))
+        if get_origin(annotation) is dict and len(args := get_args(annotation)) == 2:
+            annotation = args[1]
+        elif annotation is not dict and annotation is not Any:
+            raise TypeError(f'{self!r} is not a list or a dict')
+        else:
+            annotation = Any
+        return JSONPath(self._column, annotation, self._steps + (key,))
+
+    @property
+    def _document(self) -> ColumnElement[Any]:
+        return sa.type_coerce(self._column, JSONB)
+
+    def _contains(self, value: Any) -> ColumnElement[bool]:
+        if any(isinstance(step, int) for step in self._steps):
+            # containment cannot pin a list index
+            return self._match('==', value)
+        for step in reversed(self._steps):
+            value = [value] if step is _EACH else {step: value}
+        return self._document.contains(value)
+
+    def _match(self, operator: str, value: Any) -> ColumnElement[bool]:
+        path = '$' + ''.join(
+            '[*]' if step is _EACH else f'[{step}]' if isinstance(step, int) else '.' + json.dumps(step)
+            for step in self._steps
+        )
+        return sa.func.jsonb_path_exists(
+            self._document,
+            sa.cast(sa.literal(f'{path} ? (@ {operator} $value)'), JSONPATH),
+            sa.cast(sa.literal(json.dumps({'value': value})), JSONB),
+        )
+
+    @property
+    def _text(self) -> ColumnElement[Any]:
+        if _EACH in self._steps:
+            raise TypeError(f'{self!r} goes through a list and has no single value')
+        keys = [str(step) for step in self._steps]
+        text = self._document[keys].astext
+        sqltype = _SQL_TYPES.get(self._annotation)
+        return text if sqltype is None else sa.cast(text, sqltype())
+
+    def _compare(self, operator: str, value: Any) -> ColumnElement[bool]:
+        value = _jsonable(value)
+        if _EACH in self._steps:
+            return self._match(operator, value)
+        return self._text.operate(_OPERATORS[operator], value)
+
+    def __eq__(self, value: Any) -> ColumnElement[bool]:  # type: ignore[override]
+        value = _jsonable(value)
+        if _item_type(self._annotation) is not None and _EACH not in self._steps:
+            # an equal list, rather than a list containing the items
+            return self._document[[str(step) for step in self._steps]] == sa.cast(sa.literal(json.dumps(value)), JSONB)
+        return self._contains(value)
+
+    def __ne__(self, value: Any) -> ColumnElement[bool]:  # type: ignore[override]
+        return sa.not_(self == value)
+
+    def __lt__(self, value: Any) -> ColumnElement[bool]:
+        return self._compare('<', value)
+
+    def __le__(self, value: Any) -> ColumnElement[bool]:
+        return self._compare('<=', value)
+
+    def __gt__(self, value: Any) -> ColumnElement[bool]:
+        return self._compare('>', value)
+
+    def __ge__(self, value: Any) -> ColumnElement[bool]:
+        return self._compare('>=', value)
+
+    def contains(self, value: Any) -> ColumnElement[bool]:
+        """Match documents whose value at this path contains `value`, an item of a list field."""
+        value = _jsonable(value)
+        if _item_type(self._annotation) is not None:
+            value = [value]
+        return self._contains(value)
+
+    def expression(self) -> ColumnElement[Any]:
+        """Return the value at this path, cast to the SQL type of its field, as ordering compares it."""
+        return self._text
+
+
+def json_path_indexes(attribute: Any, *paths: str) -> List[sa.Index]:
+    """
+    Return the indexes serving path queries on the pydantic column mapped by `attribute`.
+
+    These are a GIN `jsonb_path_ops` index on the column, for containment and `jsonb_path_exists`,
+    and a B-tree index on the value of each of the dotted `paths` to scalar fields, for ordering
+    comparisons. Add them to the table, e.g. in `__table_args__` or with `Index.create()`.
+    """
+    column = attribute.property.columns[0] if hasattr(attribute, 'property') else attribute
+    name = f'ix_{column.table.name}_{column.name}'
+    indexes = [
+        sa.Index(f'{name}_path_ops', column, postgresql_using='gin', postgresql_ops={column.name: 'jsonb_path_ops'})
+    ]
+    for path in paths:
+        node = JSONPath(column, column.type.pydantic_type)
+        for key in path.split('.'):
+            node = node[int(key)] if key.isdigit() else getattr(node, key)
+        if _item_type(node._annotation) is not None or _is_model(node._annotation):
+            raise ValueError(f'{path!r} is not a scalar field, containment queries use the GIN index')
+        indexes.append(sa.Index(f'{name}_{path.replace(".", "_")}', node.expression()))
+    return indexes
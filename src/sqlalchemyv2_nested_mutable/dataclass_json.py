@@ -0,0 +1,113 @@
+# Convert dataclasses to and from JSON documents, without validating them.
+#
+# `structure()` builds an instance from a decoded document, following the annotations of the
+# dataclass to build nested dataclasses (also in lists, dicts and optional fields) and sets, and
+# `unstructure()` turns an instance back into plain dicts and lists. Values are taken as they are,
+# so documents are expected to be valid already, e.g. because the application wrote them.
+#
+# Instances are built without calling `__init__` or `__post_init__`, fields missing from the
+# document get their default. Nested dataclasses are built as their tracked subclass (see
+# `trackable.tracked_dataclass_class`), unless they are frozen.
+from __future__ import annotations
+
+import dataclasses
+import typing
+from functools import cache
+from types import NoneType
+from types import UnionType
+from typing import Annotated
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import get_args
+from typing import get_origin
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from .serializers import sorted_members
+from .trackable import dataclass_fields
+from .trackable import tracked_dataclass_class
+from .trackable import TrackedDataclass
+
+# Builds a field value from its decoded JSON, `None` when the JSON is used as it is.
+_Converter = Optional[Callable[[Any], Any]]
+# How to build each field: its name, converter, and default value or factory.
+_Plan = Tuple[Tuple[str, _Converter, Any, Any], ...]
+
+_SCALARS = (str, int, float, bool, NoneType)
+
+
+def structure(dataclass_cls: type, document: Dict[str, Any]) -> Any:
+    """Build an instance of `dataclass_cls` from a decoded JSON `document`."""
+    obj = object.__new__(dataclass_cls)
+    setattr_ = object.__setattr__
+    for name, convert, default, default_factory in _plan(dataclass_cls):
+        if name in document:
+            value = document[name]
+            if convert is not None and value is not None:
+                value = convert(value)
+        elif default_factory is not dataclasses.MISSING:
+            value = default_factory()
+        elif default is not dataclasses.MISSING:
+            value = default
+        else:
+            raise TypeError(f"{dataclass_cls.__name__} document has no {name!r}")
+        setattr_(obj, name, value)
+    if isinstance(obj, TrackedDataclass):
+        obj._track_fields()
+    return obj
+
+
+def unstructure(value: Any) -> Any:
+    """Turn a dataclass instance, and the dataclasses nested in it, into plain dicts and lists."""
+    if isinstance(value, _SCALARS):
+        return value
+    if isinstance(value, dict):
+        return {key: unstructure(item) for key, item in dict.items(value)}
+    if isinstance(value, (list, tuple)):
+        return [unstructure(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted_members(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {name: unstructure(getattr(value, name)) for name in dataclass_fields(type(value))}
+    return value
+
+
+@cache
+def _plan(dataclass_cls: type) -> _Plan:
+    try:
+        hints = typing.get_type_hints(dataclass_cls, include_extras=True)
+    except (NameError, TypeError):
+        # e.g. annotations naming classes local to a function
+        hints = {}
+    return tuple(
+        (field.name, _converter(hints.get(field.name, field.type)), field.default, field.default_factory)
+        for field in dataclasses.fields(dataclass_cls)
+    )
+
+
+def _converter(annotation: Any) -> _Converter:
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin is Annotated:
+        return _converter(args[0])
+    if origin is Union or origin is UnionType:
+        options = [arg for arg in args if arg is not NoneType]
+        # `None` values are never converted, only `Optional` unions can be followed
+        return _converter(options[0]) if len(options) == 1 else None
+    if isinstance(annotation, type) and dataclasses.is_dataclass(annotation):
+        if not annotation.__dataclass_params__.frozen:  # type: ignore[attr-defined]
+            annotation = tracked_dataclass_class(annotation)
+        return lambda document, dataclass_cls=annotation: structure(dataclass_cls, document)
+    if origin is list and args:
+        if (item := _converter(args[0])) is None:
+            return None
+        return lambda items: [None if value is None else item(value) for value in items]
+    if origin is dict and len(args) == 2:
+        if (item := _converter(args[1])) is None:
+            return None
+        return lambda items: {key: None if value is None else item(value) for key, value in items.items()}
+    if origin is set or annotation is set:
+        # JSON has no sets, they are stored as arrays
+        return set
+    return None
@@ -0,0 +1,345 @@
+# Count and time the work done by the tracking machinery, per mapped column.
+#
+# Instrumentation is disabled by default, which costs the instrumented code paths one check of the
+# module's `recorder`. `enable()` installs a `Recorder`, which then accumulates, for each column
+# (named `<Class>.<attribute>`):
+#
+# * the outermost `make_nested_trackable` calls, their duration and the containers they wrapped
+# * the `changed()` notifications, and the parent links they followed up to the root
+# * the calls, duration and JSON text size of the bind and result processing of the column types
+#   of this package (`PydanticType`, and JSON types given a `serializer` or an `intern_size`)
+#
+# as well as the classes created on the fly (tracked models and column variants). The totals are
+# read with `metrics()`, and `add_listener` registers a callback receiving every measurement, e.g.
+# to feed them to a metrics library:
+#
+#     instrumentation.enable()
+#     instrumentation.add_listener(lambda column, metric, value: histograms[metric].observe(value))
+#
+# Values loaded or assigned are attributed to their column, and nested values to the column of the
+# root they are attached to. The recorder is shared by all threads, so the split between columns is
+# approximate when several threads load values at the same time.
+from __future__ import annotations
+
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Column
+from sqlalchemy import event
+from sqlalchemy.orm import InstanceState
+from sqlalchemy.types import TypeDecorator
+
+# The column of values that are not attached to a mapped instance (yet)
+UNATTACHED = '<unattached>'
+
+Listener = Callable[[Optional[str], str, float], None]
+_TypeT = TypeVar('_TypeT', bound=type)
+
+# `Session.info` key of the paths changed on each root since the session's last flush, see `amplification`
+CHANGED_PATHS = 'sqlalchemyv2_nested_mutable.changed_paths'
+
+
+@dataclass
+class ColumnStats:
+    wraps: int = 0
+    wrap_time: float = 0.0
+    nodes_wrapped: int = 0
+    changes: int = 0
+    change_hops: int = 0
+    binds: int = 0
+    bind_time: float = 0.0
+    bind_bytes: int = 0
+    results: int = 0
+    result_time: float = 0.0
+    result_bytes: int = 0
+    writes: int = 0
+    bytes_written: int = 0
+    bytes_changed: int = 0
+
+
+def _column_of(root: Any) -> str:
+    # only roots attached to an instance have (non-empty) `Mutable._parents`
+    for state, key in getattr(root, '_parents', {}).items():
+        return f'{state.class_.__name__}.{key}'
+    return UNATTACHED
+
+
+def _text_size(value: Any) -> int:
+    return len(value) if isinstance(value, (str, bytes)) else 0
+
+
+class Recorder:
+    """Accumulates the measurements of the tracking machinery while instrumentation is enabled."""
+
+    def __init__(self):
+        self.columns: Dict[str, ColumnStats] = {}
+        self.classes_created = 0
+        self.listeners: List[Listener] = []
+        # whether an outermost `make_nested_trackable` call is running, and the containers it wrapped so far
+        self.wrapping = False
+        self.nodes = 0
+        # the column the values being built belong to, if known
+        self.column: Optional[str] = None
+        # the column whose value is being loaded or assigned, by attribute key, see `instrument_attribute`
+        self.loading: Dict[str, str] = {}
+        # whether changed paths are remembered to measure write amplification, and the table of each column
+        self.track_writes = False
+        self.tables: Dict[str, str] = {}
+
+    def stats(self, column: str) -> ColumnStats:
+        stats = self.columns.get(column)
+        if stats is None:
+            stats = self.columns[column] = ColumnStats()
+        return stats
+
+    def _emit(self, column: Optional[str], metric: str, value: float) -> None:
+        for listener in self.listeners:
+            listener(column, metric, value)
+
+    def record_wrap(self, wrap: Callable[[Any, Any], Any], value: Any, parent: Any) -> Any:
+        """Run an outermost `make_nested_trackable` call, whose nested calls count `nodes`."""
+        column = self.column or _column_of(parent.tracked_root())
+        self.wrapping, self.nodes = True, 0
+        start = time.perf_counter()
+        try:
+            return wrap(value, parent)
+        finally:
+            elapsed = time.perf_counter() - start
+            nodes, self.wrapping = self.nodes, False
+            stats = self.stats(column)
+            stats.wraps += 1
+            stats.wrap_time += elapsed
+            stats.nodes_wrapped += nodes
+            if self.listeners:
+                self._emit(column, 'wrap_time', elapsed)
+                self._emit(column, 'nodes_wrapped', nodes)
+
+    def record_coerce(self, coerce: Callable[[Any], Any], key: str, value: Any) -> Any:
+        """Run `coerce(value)` on behalf of the column whose value is being loaded or assigned to `key`."""
+        previous, self.column = self.column, self.loading.pop(key, None) or self.column
+        try:
+            return coerce(value)
+        finally:
+            self.column = previous
+
+    def record_change(self, node: Any, keys: Tuple[Any, ...]) -> None:
+        """Count a `changed()` notification of `node`, and the parent links up to its root."""
+        hops = 0
+        root = node
+        while (parent_ref := getattr(root, '_parent_ref', None)) is not None and (parent := parent_ref()) is not None:
+            root = parent
+            hops += 1
+        column = _column_of(root)
+        stats = self.stats(column)
+        stats.changes += 1
+        stats.change_hops += hops
+        if self.listeners:
+            self._emit(column, 'change_hops', hops)
+        if self.track_writes and column != UNATTACHED:
+            self._remember_paths(root, node, keys)
+
+    def _remember_paths(self, root: Any, node: Any, keys: Tuple[Any, ...]) -> None:
+        path = node.tracked_path()
+        if path is None:
+            paths = [()]
+        else:
+            paths = [path + (key,) for key in keys] if keys else [path]
+        for state in root._parents:
+            if (session := state.session) is not None:
+                changed = session.info.setdefault(CHANGED_PATHS, {})
+                changed.setdefault(id(root), (root, set()))[1].update(paths)
+
+    def record_write(self, column: str, table: str, written: int, changed: int) -> None:
+        """Count a value of `column` rewritten in full by a flush, see `amplification`."""
+        self.tables[column] = table
+        stats = self.stats(column)
+        stats.writes += 1
+        stats.bytes_written += written
+        stats.bytes_changed += changed
+        if self.listeners:
+            self._emit(column, 'bytes_written', written)
+            self._emit(column, 'bytes_changed', changed)
+
+    def record_class(self, cls: type) -> None:
+        self.classes_created += 1
+        if self.listeners:
+            self._emit(None, 'classes_created', 1)
+
+    def record_processing(self, sqltype: Any, kind: str, process: Callable[[Any], Any], value: Any) -> Any:
+        """Run the bind or result `process` function of `sqltype` on `value`, timing it."""
+        bound = getattr(sqltype, '_instrumented_column', None)
+        column = UNATTACHED if bound is None else _column_names.get(bound, UNATTACHED)
+        previous, self.column = self.column, column
+        start = time.perf_counter()
+        try:
+            result = process(value)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.column = previous
+        size = _text_size(result if kind == 'bind' else value)
+        stats = self.stats(column)
+        if kind == 'bind':
+            stats.binds += 1
+            stats.bind_time += elapsed
+            stats.bind_bytes += size
+        else:
+            stats.results += 1
+            stats.result_time += elapsed
+            stats.result_bytes += size
+        if self.listeners:
+            self._emit(column, f'{kind}_time', elapsed)
+            self._emit(column, f'{kind}_bytes', size)
+        return result
+
+
+# The active recorder, `None` while instrumentation is disabled
+recorder: Optional[Recorder] = None
+
+# The name of each mapped column, by the table column its type is bound to, see `instrumented_type`
+_column_names: WeakKeyDictionary[Column[Any], str] = WeakKeyDictionary()
+# The keys of the mutable columns of each mapped class, see `instrument_attribute`
+_attributes: WeakKeyDictionary[type, List[str]] = WeakKeyDictionary()
+# The event listeners attributing loaded values to their column while enabled
+_listeners: List[Tuple[Any, str, Callable[..., None]]] = []
+
+
+def instrument_attribute(attribute: Any) -> None:
+    """
+    Attribute the values of a mapped mutable `attribute` to its column while instrumentation is enabled.
+
+    Must be called before `Mutable` listens on the attribute, so that assignments are attributed
+    before they are coerced.
+    """
+    key = attribute.key
+    column = f'{attribute.class_.__name__}.{key}'
+    _attributes.setdefault(attribute.class_, []).append(key)
+    _column_names.setdefault(attribute.property.columns[0], column)
+
+    def assigning(state: InstanceState[Any], value: Any, *args: Any) -> None:
+        if recorder is not None:
+            recorder.loading[key] = f'{state.class_.__name__}.{key}'
+
+    # attribute events cannot be inserted ahead of `Mutable`'s, so this one is always listened to
+    event.listen(attribute, 'set', assigning, raw=True, propagate=True)
+    if recorder is not None:
+        _listen(attribute.class_, key)
+
+
+def instrumented_type(cls: _TypeT) -> _TypeT:
+    """
+    Class decorator of the column types whose processing is instrumented, binding each of their
+    instances (and the types they wrap) to the column they are given to.
+
+    The processing of a value is attributed to the column bound to the type, or to the copy of
+    it (made per dialect) processing the value. A type given to several columns is copied for
+    each further column, as `Column` copies the types it is copied with.
+    """
+    event.listen(cls, 'after_parent_attach', _bind_column)
+    return cls
+
+
+def _bind_column(sqltype: Any, column: Any) -> None:
+    # the types wrapped by the type of the column are bound along with it
+    if not isinstance(column, Column) or column.type is not sqltype:
+        return
+    bound = getattr(sqltype, '_instrumented_column', None)
+    if bound is not None and bound is not column and bound.type is sqltype:
+        sqltype = column.type = _copy_type(sqltype)
+    while isinstance(sqltype, TypeDecorator):
+        sqltype._instrumented_column = column
+        sqltype = getattr(sqltype, 'sqltype', None)
+
+
+def _copy_type(sqltype: Any) -> Any:
+    """Copy `sqltype`, and the type decorators it wraps."""
+    copied = sqltype.copy()
+    inner = getattr(sqltype, 'sqltype', None)
+    if isinstance(inner, TypeDecorator):
+        copied.sqltype = _copy_type(inner)
+        if sqltype.impl is inner:
+            copied.impl = copied.sqltype
+    return copied
+
+
+def column_keys(class_: type) -> List[str]:
+    """Return the keys of the mutable columns of the mapped `class_`, including inherited ones."""
+    return [key for cls in class_.__mro__ for key in _attributes.get(cls, ())]
+
+
+def _listen(class_: type, key: str) -> None:
+    def loading(state: InstanceState[Any], *args: Any) -> None:
+        # runs before `Mutable` coerces the value, see `Recorder.record_coerce`
+        if recorder is not None:
+            recorder.loading[key] = f'{state.class_.__name__}.{key}'
+
+    for name in ('load', 'refresh', 'refresh_flush'):
+        event.listen(class_, name, loading, raw=True, propagate=True, insert=True)
+        _listeners.append((class_, name, loading))
+
+
+def instrumented_processor(sqltype: Any, kind: str, process: Optional[Callable[[Any], Any]]):
+    """Wrap the `kind` (`'bind'` or `'result'`) `process` function of `sqltype`, to time it while enabled."""
+    if process is None:
+        return None
+
+    def instrumented_process(value):
+        if recorder is None:
+            return process(value)
+        return recorder.record_processing(sqltype, kind, process, value)
+
+    return instrumented_process
+
+
+def enable() -> Recorder:
+    """Start recording, keeping the measurements of an already active recorder."""
+    global recorder
+    if recorder is None:
+        recorder = Recorder()
+        for class_, keys in list(_attributes.items()):
+            for key in keys:
+                _listen(class_, key)
+    return recorder
+
+
+def disable() -> None:
+    """Stop recording, and drop the measurements."""
+    global recorder
+    recorder = None
+    for target, name, listener in _listeners:
+        event.remove(target, name, listener)
+    _listeners.clear()
+
+
+def metrics() -> Dict[str, Any]:
+    """Return the measurements so far, by column, see `ColumnStats`."""
+    if recorder is None:
+        return {'classes_created': 0, 'columns': {}}
+    columns = {column: asdict(stats) for column, stats in recorder.columns.items()}
+    return {'classes_created': recorder.classes_created, 'columns': columns}
+
+
+def reset() -> None:
+    """Reset the measurements of the active recorder."""
+    if recorder is not None:
+        recorder.columns.clear()
+        recorder.tables.clear()
+        recorder.classes_created = 0
+
+
+def add_listener(listener: Listener) -> None:
+    """Call `listener(column, metric, value)` for every measurement, enabling instrumentation if needed."""
+    enable().listeners.append(listener)
+
+
+def remove_listener(listener: Listener) -> None:
+    if recorder is not None:
+        recorder.listeners.remove(listener)
@@ -0,0 +1,86 @@
+# Share the documents of rows holding identical JSON values.
+#
+# Columns fetch their values as JSON text, and an `InternCache` maps the content hash of that text
+# to the document decoded from it the first time, so identical values are decoded once and share
+# one tree. The shared trees are never modified: each row wraps its value lazily, and wrapping a
+# container copies it, so a row only gets private copies of the containers it reads.
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any
+from typing import Callable
+from typing import Union
+
+import sqlalchemy as sa
+from sqlalchemy.sql.type_api import TypeEngine
+
+from .instrumentation import instrumented_processor
+from .serializers import JSON_NULL
+from .serializers import WrappedJSON
+from .trackable import CacheInfo
+
+
+class InternCache:
+    """A bounded LRU of documents by the content hash of their JSON text."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, Any] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, text: Union[str, bytes], load: Callable[[Union[str, bytes]], Any]) -> Any:
+        """Return the document of `text`, loading it with `load` unless an identical one is cached."""
+        key = blake2b(text.encode() if isinstance(text, str) else text, digest_size=16).digest()
+        entries = self._entries
+        if (document := entries.get(key)) is not None:
+            self._hits += 1
+            entries.move_to_end(key)
+            return document
+        self._misses += 1
+        document = entries[key] = load(text)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return document
+
+    def cache_info(self) -> CacheInfo:
+        """Report how often a cached document was reused, and how many are cached."""
+        return CacheInfo(self._hits, self._misses, len(self._entries))
+
+    def cache_clear(self) -> None:
+        """Forget all cached documents and reset the statistics."""
+        self._entries.clear()
+        self._hits = self._misses = 0
+
+
+def fetch_as_text(column: Any, sqltype: TypeEngine[Any]) -> Any:
+    """Select a JSON `column` as text, while still processing its values with `sqltype`."""
+    return sa.type_coerce(sa.cast(column, sa.Text), sqltype)
+
+
+class InternedJSON(WrappedJSON):
+    """
+    A JSON type whose identical values are decoded once, up to `intern_size` distinct ones, and
+    shared between rows, see `InternCache`.
+    """
+
+    cache_ok = True
+
+    def __init__(self, sqltype: TypeEngine[Any], intern_size: int):
+        super().__init__(sqltype)
+        self.intern_size = intern_size
+        self.intern_cache = InternCache(intern_size)
+
+    def column_expression(self, column):
+        return fetch_as_text(column, self)
+
+    def result_processor(self, dialect, coltype):
+        cache = self.intern_cache
+        loads = getattr(dialect, '_json_deserializer', None) or json.loads
+
+        def process(value):
+            return None if value is None or value == JSON_NULL else cache.get(value, loads)
+
+        return instrumented_processor(self, 'result', process)
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import json
+from copy import copy
+from functools import cache
+from typing import Any
 from typing import Iterable
 from typing import List
+from typing import Set
 from typing import TYPE_CHECKING
 from typing import TypeVar
 
@@ -10,14 +15,136 @@ from sqlalchemy.ext.mutable import Mutable
 from sqlalchemy.sql.type_api import TypeEngine
 from typing_extensions import Self
 
+from . import bulk
+from . import instrumentation
+from . import partial
+from . import snapshot
+from ._compat import msgspec
 from ._compat import pydantic
 from ._typing import _T
+from .comparators import JSONPath
+from .dataclass_json import structure
+from .dataclass_json import unstructure
+from .interning import fetch_as_text
+from .interning import InternCache
+from .interning import InternedJSON
+from .offload import deferring
+from .offload import OffloadedJSON
+from .offload import PendingValue
+from .serializers import default_serializer
+from .serializers import JSON_NULL
+from .serializers import json_serializer
+from .serializers import JSONSerializer
+from .serializers import SerializedJSON
+from .serializers import sorted_members
+from .trackable import LazyTrackedDict
+from .trackable import LazyTrackedList
+from .trackable import LazyTrackedPydanticBaseModel
+from .trackable import TrackedDataclass
 from .trackable import TrackedDict
 from .trackable import TrackedList
 from .trackable import TrackedObject
 from .trackable import TrackedPydanticBaseModel
+from .trackable import TrackedSet
+from .trackable import TrackedStruct
+from .trusted import trusted_constructor
 
 _P = TypeVar("_P", bound='MutablePydanticBaseModel')
+_D = TypeVar("_D", bound='MutableDataclass')
+_S = TypeVar("_S", bound='MutableStruct')
+
+
+def tracking_variant(
+    cls: type, lazy: bool = False, journal_limit: int | None = None, partial_writes: bool = True
+) -> type:
+    """
+    Return a subclass of the mutable type `cls` configured for one column.
+
+    With `lazy` the subclass wraps nested values on first access, so loading a value only
+    copies its top level and a document costs nothing beyond the containers that are read.
+    With a `journal_limit` the subclass records up to that many changed paths, which lets a
+    flush update the changed parts of a document instead of rewriting it, see `partial`, unless
+    `partial_writes` is false, and `pending_patch()` return them as a JSON Patch.
+    """
+    # one class per configuration, however the arguments are passed
+    return _tracking_variant(cls, lazy, journal_limit, partial_writes)
+
+
+@cache
+def _tracking_variant(cls: type, lazy: bool, journal_limit: int | None, partial_writes: bool) -> type:
+    if not lazy and journal_limit is None:
+        return cls
+    name = cls.__name__
+    bases: tuple[type, ...] = (cls,)
+    if lazy:
+        name = 'Lazy' + name
+        if issubclass(cls, TrackedList):
+            bases = (cls, LazyTrackedList)
+        elif issubclass(cls, TrackedDict):
+            bases = (cls, LazyTrackedDict)
+        else:
+            # pydantic requires the more derived base to come first
+            bases = (LazyTrackedPydanticBaseModel, cls)
+    if journal_limit is not None:
+        name = 'Journaled' + name
+    namespace = {'__module__': cls.__module__, '__doc__': cls.__doc__, '__reduce_ex__': _reduce_variant}
+    variant = type(name, bases, namespace)
+    # generated classes cannot be pickled, their values are pickled with the class they derive from
+    type.__setattr__(variant, '__variant_of__', cls)
+    type.__setattr__(variant, '__variant_args__', (lazy, journal_limit, partial_writes))
+    if journal_limit is not None:
+        # set on the class directly, pydantic would otherwise treat the attribute as a field
+        type.__setattr__(variant, '_journal_limit', journal_limit)
+        type.__setattr__(variant, '_partial_writes', partial_writes)
+        partial.install()
+    if (recorder := instrumentation.recorder) is not None:
+        recorder.record_class(variant)
+    return variant
+
+
+def _variant_source(cls: type) -> type:
+    """Return the class the tracking variant `cls` was generated from, `cls` itself if it is not one."""
+    while (source := cls.__dict__.get('__variant_of__')) is not None:
+        cls = source
+    return cls
+
+
+def _reduce_variant(self: Any, proto: Any) -> Any:
+    # reduce the value as its class would, then replace the generated class by the calls rebuilding it
+    variant = cls = type(self)
+    configs = []
+    while (source := cls.__dict__.get('__variant_of__')) is not None:
+        configs.append(cls.__variant_args__)
+        cls = source
+    key = (cls, tuple(reversed(configs)))
+    func, args, *rest = cls.__reduce_ex__(self, proto)
+    if func is variant:
+        return (_rebuild_variant, (key, None, args), *rest)
+    if args and args[0] is variant:
+        return (_rebuild_variant, (key, func, args[1:]), *rest)
+    return (func, args, *rest)
+
+
+def _rebuild_variant(key: tuple[type, tuple[tuple[Any, ...], ...]], func: Any, args: tuple[Any, ...]) -> Any:
+    variant, configs = key
+    for config in configs:
+        variant = tracking_variant(variant, *config)
+    return variant(*args) if func is None else func(variant, *args)
+
+
+def _snapshot_tracking(
+    tracking: str, lazy: bool, partial_updates: bool, patches: bool, intern_size: int, offload_size: int
+) -> bool:
+    """Check the `tracking` strategy passed to `as_mutable`, returning whether it is `'snapshot'`."""
+    if tracking not in ('mutations', 'snapshot'):
+        raise ValueError(f"Unknown tracking {tracking!r}, expected 'mutations' or 'snapshot'")
+    if tracking == 'snapshot' and (lazy or partial_updates or patches or intern_size or offload_size):
+        raise ValueError(
+            "tracking='snapshot' cannot be combined with lazy, partial_updates, patches, intern_size or offload_size"
+        )
+    if intern_size and offload_size:
+        raise ValueError("intern_size and offload_size cannot be combined")
+    return tracking == 'snapshot'
 
 
 class MutableList(TrackedList, Mutable, List[_T]):
@@ -30,25 +157,321 @@ class MutableList(TrackedList, Mutable, List[_T]):
         schedule: Mapped[list[list[str]]] = mapped_column(MutableList.as_mutable(ARRAY(sa.String(128), dimensions=2)))
     """
 
+    __slots__ = ('_journal', '_journal_len', '_batch_depth', '_batch_pending', '_dirty')
+
     @classmethod
     def coerce(cls, key, value):
-        return value if isinstance(value, cls) else cls(value)
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, PendingValue):
+            return value.bind(cls.coerce, key)
+        if (recorder := instrumentation.recorder) is not None:
+            return recorder.record_coerce(cls, key, value)
+        return cls(value)
+
+    @classmethod
+    def as_mutable(
+        cls,
+        sqltype: TypeEngine[_T],
+        lazy: bool = False,
+        partial_updates: bool = False,
+        journal_limit: int = 32,
+        serializer: str | JSONSerializer | None = None,
+        tracking: str = 'mutations',
+        intern_size: int = 0,
+        offload_size: int = 0,
+        patches: bool = False,
+    ) -> TypeEngine[_T]:
+        """
+        Associate `sqltype` with this mutable list.
+
+        With `lazy=True` nested containers are only made trackable when they are first read.
+        With `partial_updates=True` a flush only writes the changed and appended elements, as long
+        as no more than `journal_limit` paths changed (ARRAY and JSONB on PostgreSQL, JSON on SQLite).
+        With a `serializer` (`'pydantic'`, `'orjson'`, `'msgspec'` or a callable) values of a JSON
+        `sqltype` are encoded by it rather than by the dialect's `json_serializer`.
+        With `tracking='snapshot'` loaded values stay plain lists, and changes are detected at flush
+        by comparing a fingerprint taken at load, see `snapshot`.
+        With an `intern_size`, up to that many distinct values of a JSON `sqltype` are decoded once
+        and shared by the rows holding them, which wrap them lazily, see `interning`.
+        With an `offload_size`, values of a JSON `sqltype` at least that long (in characters of JSON
+        text) can be loaded off the event loop by the helpers of `offload`.
+        With `patches=True` (or `partial_updates=True`) `pending_patch()` returns the changes since
+        the value was loaded or flushed as a minimal JSON Patch, see `outbox`.
+        """
+        if serializer is not None or isinstance(sqltype, sa.types.JSON):
+            # encoded by `serializer`, or by `default_serializer`, which unlike the dialect's encodes nested sets
+            sqltype = SerializedJSON(sqltype, serializer)
+        if _snapshot_tracking(tracking, lazy, partial_updates, patches, intern_size, offload_size):
+            return snapshot.track_snapshots(sqltype, serializer)
+        if intern_size:
+            sqltype = InternedJSON(sqltype, intern_size)
+            lazy = True
+        if offload_size:
+            sqltype = OffloadedJSON(sqltype, offload_size)
+        variant = tracking_variant(cls, lazy, journal_limit if partial_updates or patches else None, partial_updates)
+        if variant is not cls:
+            return variant.as_mutable(sqltype)
+        return super().as_mutable(sqltype)
+
+    @classmethod
+    def associate_with_attribute(cls, attribute):
+        instrumentation.instrument_attribute(attribute)
+        super().associate_with_attribute(attribute)
+        if cls._journal_limit is not None:
+            partial.journal_attribute(attribute)
 
     def __init__(self, __iterable: Iterable[_T] = []):
-        super().__init__(TrackedObject.make_nested_trackable(__iterable, self))
+        self._parent_ref = None
+        if self._lazy:
+            super().__init__(__iterable)
+            if isinstance(__iterable, TrackedObject):
+                self._adopt(list.__iter__(self))
+        else:
+            super().__init__(TrackedObject.make_nested_trackable(v, self) for v in __iterable)
+
+    # `Mutable` precedes `TrackedObject` in the MRO, but changes must be journaled like nested ones
+    changed = TrackedObject.changed
 
 
 class MutableDict(TrackedDict, Mutable):
+    __slots__ = ('_journal', '_batch_depth', '_batch_pending', '_dirty')
+
     @classmethod
     def coerce(cls, key, value):
-        return value if isinstance(value, cls) else cls(value)
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, PendingValue):
+            return value.bind(cls.coerce, key)
+        if (recorder := instrumentation.recorder) is not None:
+            return recorder.record_coerce(cls, key, value)
+        return cls(value)
+
+    @classmethod
+    def as_mutable(
+        cls,
+        sqltype: TypeEngine[_T],
+        lazy: bool = False,
+        partial_updates: bool = False,
+        journal_limit: int = 32,
+        serializer: str | JSONSerializer | None = None,
+        tracking: str = 'mutations',
+        intern_size: int = 0,
+        offload_size: int = 0,
+        patches: bool = False,
+    ) -> TypeEngine[_T]:
+        """
+        Associate `sqltype` with this mutable dict.
+
+        With `lazy=True` nested containers are only made trackable when they are first read.
+        With `partial_updates=True` a flush only writes the changed keys, as long as no more
+        than `journal_limit` paths changed (JSONB on PostgreSQL, JSON on SQLite).
+        With a `serializer` (`'pydantic'`, `'orjson'`, `'msgspec'` or a callable) values of a JSON
+        `sqltype` are encoded by it rather than by the dialect's `json_serializer`.
+        With `tracking='snapshot'` loaded values stay plain dicts, and changes are detected at flush
+        by comparing a fingerprint taken at load, see `snapshot`.
+        With an `intern_size`, up to that many distinct values of a JSON `sqltype` are decoded once
+        and shared by the rows holding them, which wrap them lazily, see `interning`.
+        With an `offload_size`, values of a JSON `sqltype` at least that long (in characters of JSON
+        text) can be loaded off the event loop by the helpers of `offload`.
+        With `patches=True` (or `partial_updates=True`) `pending_patch()` returns the changes since
+        the value was loaded or flushed as a minimal JSON Patch, see `outbox`.
+        """
+        if serializer is not None or isinstance(sqltype, sa.types.JSON):
+            # encoded by `serializer`, or by `default_serializer`, which unlike the dialect's encodes nested sets
+            sqltype = SerializedJSON(sqltype, serializer)
+        if _snapshot_tracking(tracking, lazy, partial_updates, patches, intern_size, offload_size):
+            return snapshot.track_snapshots(sqltype, serializer)
+        if intern_size:
+            sqltype = InternedJSON(sqltype, intern_size)
+            lazy = True
+        if offload_size:
+            sqltype = OffloadedJSON(sqltype, offload_size)
+        variant = tracking_variant(cls, lazy, journal_limit if partial_updates or patches else None, partial_updates)
+        if variant is not cls:
+            return variant.as_mutable(sqltype)
+        return super().as_mutable(sqltype)
+
+    @classmethod
+    def associate_with_attribute(cls, attribute):
+        instrumentation.instrument_attribute(attribute)
+        super().associate_with_attribute(attribute)
+        if cls._journal_limit is not None:
+            partial.journal_attribute(attribute)
 
     def __init__(self, source=(), **kwds):
-        super().__init__(TrackedObject.make_nested_trackable(dict(source, **kwds), self))
+        self._parent_ref = None
+        if self._lazy:
+            super().__init__(source, **kwds)
+            if isinstance(source, TrackedObject):
+                self._adopt(dict.values(self))
+        else:
+            super().__init__(
+                (k, TrackedObject.make_nested_trackable(v, self)) for k, v in dict(source, **kwds).items()
+            )
+
+
+class SortedArray(sa.types.TypeDecorator):
+    """
+    An ARRAY or JSON type (or a custom one) whose set values are written as sorted arrays, so
+    that equal sets are always stored alike.
+    """
+
+    cache_ok = True
+    impl = sa.types.JSON
+
+    def __init__(self, sqltype: TypeEngine[Any]):
+        super().__init__()
+        self.sqltype = sqltype
+        # compared like `sqltype`, e.g. with the `contains` and `any` of ARRAY
+        self.impl = sqltype
+
+    def __repr__(self):
+        return repr(self.sqltype)
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else sorted_members(value)
+
+
+class MutableSet(TrackedSet, Mutable, Set[_T]):
+    """
+    A mutable set that tracks the members added to and removed from it.
+
+    Used as top-level mapped object, stored as a sorted ARRAY or JSON array. e.g.
+
+        tags: Mapped[set[str]] = mapped_column(MutableSet.as_mutable(ARRAY(String(64))))
+    """
+
+    __slots__ = ('_batch_depth', '_batch_pending', '_dirty')
+
+    @classmethod
+    def coerce(cls, key, value):
+        if isinstance(value, cls):
+            return value
+        if not isinstance(value, (set, frozenset, list, tuple)):
+            return Mutable.coerce(key, value)
+        if (recorder := instrumentation.recorder) is not None:
+            return recorder.record_coerce(cls, key, value)
+        return cls(value)
+
+    @classmethod
+    def as_mutable(cls, sqltype: TypeEngine[_T]) -> TypeEngine[_T]:
+        """Associate `sqltype` (ARRAY, JSON or JSONB) with this mutable set."""
+        return super().as_mutable(SortedArray(sqltype))
+
+    @classmethod
+    def associate_with_attribute(cls, attribute):
+        instrumentation.instrument_attribute(attribute)
+        super().associate_with_attribute(attribute)
+
+    def __init__(self, __iterable: Iterable[_T] = ()):
+        self._parent_ref = None
+        super().__init__(__iterable)
+
+
+@instrumentation.instrumented_type
+class DataclassType(sa.types.TypeDecorator, TypeEngine[_D]):
+    """
+    Stores instances of a `MutableDataclass` subclass as JSON documents (JSONB on PostgreSQL and
+    JSON elsewhere by default), converting them without validation, see `dataclass_json`.
+    """
+
+    cache_ok = True
+    impl = sa.types.JSON
+
+    def __init__(
+        self,
+        dataclass_type: type[_D],
+        sqltype: TypeEngine[_T] | None = None,
+        serializer: str | JSONSerializer | None = None,
+    ):
+        super().__init__()
+        self.dataclass_type = dataclass_type
+        self.sqltype = sqltype
+        self.serializer = serializer
+        self._serialize = None if serializer is None else json_serializer(serializer)
+
+    def load_dialect_impl(self, dialect):
+        from sqlalchemy.dialects.postgresql import JSONB
+
+        if self.sqltype is not None:
+            return dialect.type_descriptor(self.sqltype)
+
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(sa.JSON())
+
+    def __repr__(self):
+        return f'DataclassType({self.dataclass_type.__name__})'
+
+    def bind_processor(self, dialect):
+        return instrumentation.instrumented_processor(self, 'bind', self._bind_processor(dialect))
+
+    def _bind_processor(self, dialect):
+        if (serialize := self._serialize) is None:
+            return super().bind_processor(dialect)
+
+        # the serializer encodes dataclasses itself, without building plain dicts first
+        def process(value):
+            return None if value is None else serialize(value)
+
+        return process
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else unstructure(value)
+
+    def result_processor(self, dialect, coltype):
+        return instrumentation.instrumented_processor(self, 'result', super().result_processor(dialect, coltype))
+
+    def process_result_value(self, value, dialect) -> _D | None:
+        return None if value is None else structure(self.dataclass_type, value)
+
+
+class MutableDataclass(TrackedDataclass, Mutable):
+    """
+    A dataclass that tracks changes to its fields and their children, for documents whose schema
+    is trusted and does not need validating. e.g.
+
+        @dataclass(slots=True)
+        class Profile(MutableDataclass):
+            name: str
+            address: Address  # a plain, possibly slotted, dataclass
+            tags: list[str] = field(default_factory=list)
+
+        profile: Mapped[Profile] = mapped_column(Profile.as_mutable())
+    """
+
+    @classmethod
+    def coerce(cls, key, value):
+        if isinstance(value, cls):
+            return value
+        if not isinstance(value, dict):
+            return Mutable.coerce(key, value)
+        if (recorder := instrumentation.recorder) is not None:
+            return recorder.record_coerce(lambda document: structure(cls, document), key, value)
+        return structure(cls, value)
+
+    @classmethod
+    def as_mutable(
+        cls, sqltype: TypeEngine[_T] | None = None, serializer: str | JSONSerializer | None = None
+    ) -> TypeEngine[Self]:
+        """
+        Map this dataclass onto `sqltype` (JSONB on PostgreSQL and JSON elsewhere by default).
+
+        With a `serializer` (`'orjson'`, `'msgspec'`, `'pydantic'` or a callable) values are encoded
+        to JSON text directly instead of through plain dicts.
+        """
+        return super().as_mutable(DataclassType(cls, sqltype, serializer))
+
+    @classmethod
+    def associate_with_attribute(cls, attribute):
+        instrumentation.instrument_attribute(attribute)
+        super().associate_with_attribute(attribute)
 
 
 if pydantic is not None:
 
+    @instrumentation.instrumented_type
     class PydanticType(sa.types.TypeDecorator, TypeEngine[_P]):
         """
         Inspired by https://gist.github.com/imankulov/4051b7805ad737ace7d8de3d3f934d6b
@@ -57,10 +480,51 @@ if pydantic is not None:
         cache_ok = True
         impl = sa.types.JSON
 
-        def __init__(self, pydantic_type: type[_P], sqltype: TypeEngine[_T] | None = None):
+        class Comparator(sa.types.TypeDecorator.Comparator, sa.types.JSON.Comparator):
+            def __getattr__(self, name):
+                # fields of the model build paths into the document, see `comparators`
+                if name.startswith('_'):
+                    raise AttributeError(name)
+                return getattr(JSONPath(self.expr, self.type.pydantic_type), name)
+
+        comparator_factory = Comparator
+
+        def __init__(
+            self,
+            pydantic_type: type[_P],
+            sqltype: TypeEngine[_T] | None = None,
+            lazy: bool = False,
+            journal_limit: int | None = None,
+            serializer: str | JSONSerializer | None = None,
+            validate_json: bool = False,
+            trusted_load: bool = False,
+            intern_size: int = 0,
+            offload_size: int = 0,
+            partial_writes: bool = True,
+        ):
             super().__init__()
+            # interned models are shared, which only works as long as rows copy their fields before using them
+            lazy = lazy or bool(intern_size)
             self.pydantic_type = pydantic_type
             self.sqltype = sqltype
+            self.lazy = lazy
+            self.journal_limit = journal_limit
+            self.serializer = serializer
+            self.validate_json = validate_json
+            self.trusted_load = trusted_load
+            self.intern_size = intern_size
+            self.intern_cache = InternCache(intern_size) if intern_size else None
+            self.offload_size = offload_size
+            self.partial_writes = partial_writes
+            self._serialize = None if serializer is None else json_serializer(serializer)
+            # loaded values must be instances of the class `as_mutable` listens on
+            self._result_type = tracking_variant(
+                tracking_variant(pydantic_type, journal_limit=journal_limit, partial_writes=partial_writes), lazy
+            )
+            # values read back were validated when they were written
+            self._validate = self._result_type.model_validate
+            if trusted_load:
+                self._validate = trusted_constructor(self._result_type)
 
         def load_dialect_impl(self, dialect):
             from sqlalchemy.dialects.postgresql import JSONB
@@ -76,25 +540,180 @@ if pydantic is not None:
             # NOTE: the `__repr__` is used by Alembic to generate the migration script.
             return f'PydanticType({self.pydantic_type.__name__})'
 
+        def bind_processor(self, dialect):
+            return instrumentation.instrumented_processor(self, 'bind', self._bind_processor(dialect))
+
+        def _bind_processor(self, dialect):
+            if (serialize := self._serialize) is None:
+                impl = self.load_dialect_impl(dialect)
+                if not isinstance(impl, sa.types.JSON) or (serialize := default_serializer(dialect)) is None:
+                    return super().bind_processor(dialect)
+                # `None` is written as the JSON type writes it, a JSON null unless `none_as_null` is set
+                null = None if impl.none_as_null else JSON_NULL
+
+                def process(value):
+                    return serialize(value) if value else null
+
+                return process
+
+            # the serializer produces JSON text, which the dialect's JSON processing would encode again
+            def process(value):
+                return serialize(value) if value else None
+
+            return process
+
         def process_bind_param(self, value, dialect):
             return value.dict() if value else None
 
+        def column_expression(self, column):
+            # fetch the document as text, so that the driver does not decode it
+            return (
+                fetch_as_text(column, self) if self.validate_json or self.intern_size or self.offload_size else column
+            )
+
+        def result_processor(self, dialect, coltype):
+            return instrumentation.instrumented_processor(self, 'result', self._result_processor(dialect, coltype))
+
+        def _result_processor(self, dialect, coltype):
+            if not (self.validate_json or self.intern_size or self.offload_size):
+                return super().result_processor(dialect, coltype)
+            validate = self._validate
+            if self.trusted_load:
+                from pydantic_core import from_json as decode
+            else:
+                decode = getattr(dialect, '_json_deserializer', None) or json.loads
+            if self.validate_json and not self.trusted_load:
+                load = self._result_type.model_validate_json
+            else:
+
+                def load(value):
+                    return validate(decode(value))
+
+            if self.intern_cache is not None:
+                intern = self.intern_cache.get
+
+                def process(value):
+                    if value is None or value == JSON_NULL:
+                        return None
+                    # rows get their own copy of the shared model, whose fields they copy when first read
+                    return copy(intern(value, load))
+
+            else:
+                offload_size = self.offload_size
+
+                def process(value):
+                    if value is None or value == JSON_NULL:
+                        return None
+                    if (unvalidated := bulk.collect(value, self, True)) is not None:
+                        return unvalidated
+                    if deferring(value, offload_size):
+                        # decoded, then validated once by the pending value
+                        return PendingValue(value, decode, validate)
+                    return load(value)
+
+            return process
+
         def process_result_value(self, value, dialect) -> _P | None:
-            return None if value is None else self.pydantic_type.model_validate(value)
+            if value is None:
+                return None
+            if (unvalidated := bulk.collect(value, self, False)) is not None:
+                return unvalidated
+            return self._validate(value)
+
+        def validate_many(self, values: list, text: bool = False) -> list:
+            """Build the values of many rows, JSON texts if `text`, decoded documents otherwise, at once."""
+            if self.trusted_load:
+                from pydantic_core import from_json
+
+                validate = self._validate
+                return [validate(from_json(value) if text else value) for value in values]
+            return bulk.validate_models(self._result_type, values, text)
 
     class MutablePydanticBaseModel(TrackedPydanticBaseModel, Mutable):
+        __slots__ = ('_journal', '_batch_depth', '_batch_pending', '_dirty')
+
         @classmethod
         def coerce(cls, key, value) -> Self:
-            return value if isinstance(value, cls) else cls.model_validate(value)
+            if isinstance(value, cls):
+                return value
+            if isinstance(value, PendingValue):
+                return value.bind(cls.coerce, key)
+            if isinstance(value, _variant_source(cls)):
+                # e.g. an instance of the model a journaled column variant derives from
+                value = dict(value)
+            if (recorder := instrumentation.recorder) is not None:
+                return recorder.record_coerce(cls.model_validate, key, value)
+            return cls.model_validate(value)
 
         def dict(self, *args, **kwargs):
             res = super().model_dump(*args, **kwargs)
             res.pop('_parents', None)
             return res
 
+        def __getstate__(self):
+            # the objects holding the value are not pickled with it, as with `MutableDict`
+            state = super().__getstate__()
+            state['__dict__'] = {k: v for k, v in state['__dict__'].items() if k != '_parents'}
+            return state
+
         @classmethod
-        def as_mutable(cls, sqltype: TypeEngine[_T] | None = None) -> TypeEngine[Self]:
-            return super().as_mutable(PydanticType(cls, sqltype))
+        def as_mutable(
+            cls,
+            sqltype: TypeEngine[_T] | None = None,
+            lazy: bool = False,
+            partial_updates: bool = False,
+            journal_limit: int = 32,
+            serializer: str | JSONSerializer | None = None,
+            validate_json: bool = False,
+            trusted_load: bool = False,
+            intern_size: int = 0,
+            offload_size: int = 0,
+            patches: bool = False,
+        ) -> TypeEngine[Self]:
+            """
+            Map this model onto `sqltype` (JSONB on PostgreSQL and JSON elsewhere by default).
+
+            With `lazy=True` loaded values only make nested fields trackable when they are first read.
+            With `partial_updates=True` a flush only writes the changed fields, as long as no more
+            than `journal_limit` paths changed (JSONB on PostgreSQL, JSON on SQLite).
+            With a `serializer` (`'pydantic'` for `model_dump_json`, `'orjson'`, `'msgspec'` or a
+            callable) values are encoded to JSON text directly instead of through `dict()`.
+            With `validate_json=True` values are fetched as JSON text and parsed by `model_validate_json`,
+            skipping the driver's decoding to Python dicts.
+            With `trusted_load=True` loaded values are built with `model_construct` instead of being
+            validated again, as they were validated when written. Assigned values are still validated.
+            With an `intern_size`, up to that many distinct values are loaded once and shared by the rows
+            holding them, which wrap their fields lazily, see `interning`.
+            With an `offload_size`, values at least that long (in characters of JSON text) can be loaded
+            off the event loop by the helpers of `offload`.
+            With `patches=True` (or `partial_updates=True`) `pending_patch()` returns the changes since
+            the value was loaded or flushed as a minimal JSON Patch, see `outbox`.
+            """
+            if intern_size and offload_size:
+                raise ValueError("intern_size and offload_size cannot be combined")
+            pydantic_type = PydanticType(
+                cls,
+                sqltype,
+                lazy,
+                journal_limit if partial_updates or patches else None,
+                serializer,
+                validate_json,
+                trusted_load,
+                intern_size,
+                offload_size,
+                partial_updates,
+            )
+            if not partial_updates and not patches:
+                return super().as_mutable(pydantic_type)
+            variant = tracking_variant(cls, journal_limit=journal_limit, partial_writes=partial_updates)
+            return super(MutablePydanticBaseModel, variant).as_mutable(pydantic_type)
+
+        @classmethod
+        def associate_with_attribute(cls, attribute):
+            instrumentation.instrument_attribute(attribute)
+            super().associate_with_attribute(attribute)
+            if cls._journal_limit is not None:
+                partial.journal_attribute(attribute)
 
 elif not TYPE_CHECKING:
 
@@ -105,3 +724,112 @@ elif not TYPE_CHECKING:
     class MutablePydanticBaseModel:
         def __new__(cls, *a, **k):
             raise RuntimeError("MutablePydanticBaseModel requires pydantic to be installed")
+
+
+if msgspec is not None:
+
+    @instrumentation.instrumented_type
+    class StructType(sa.types.TypeDecorator, TypeEngine[_S]):
+        """
+        Stores instances of a `MutableStruct` subclass as JSON documents (JSONB on PostgreSQL and
+        JSON elsewhere by default). Documents are fetched as JSON text and decoded by msgspec
+        straight into the struct, which is also encoded by msgspec, without intermediate dicts.
+        """
+
+        cache_ok = True
+        impl = sa.types.JSON
+
+        def __init__(self, struct_type: type[_S], sqltype: TypeEngine[_T] | None = None):
+            super().__init__()
+            self.struct_type = struct_type
+            self.sqltype = sqltype
+            self._decoder = msgspec.json.Decoder(struct_type)
+            self._serialize = json_serializer('msgspec')
+
+        def load_dialect_impl(self, dialect):
+            from sqlalchemy.dialects.postgresql import JSONB
+
+            if self.sqltype is not None:
+                return dialect.type_descriptor(self.sqltype)
+
+            if dialect.name == "postgresql":
+                return dialect.type_descriptor(JSONB())
+            return dialect.type_descriptor(sa.JSON())
+
+        def __repr__(self):
+            return f'StructType({self.struct_type.__name__})'
+
+        def bind_processor(self, dialect):
+            serialize = self._serialize
+
+            def process(value):
+                return None if value is None else serialize(value)
+
+            return instrumentation.instrumented_processor(self, 'bind', process)
+
+        def column_expression(self, column):
+            # fetch the document as text, so that the driver does not decode it
+            return fetch_as_text(column, self)
+
+        def result_processor(self, dialect, coltype):
+            decode = self._decoder.decode
+            struct_type = self.struct_type
+
+            def process(value):
+                if value is None or value == JSON_NULL:
+                    return None
+                if isinstance(value, (str, bytes)):
+                    return decode(value)
+                # e.g. a document selected through an expression that was not fetched as text
+                return msgspec.convert(value, struct_type)
+
+            return instrumentation.instrumented_processor(self, 'result', process)
+
+    class MutableStruct(TrackedStruct, Mutable, msgspec.Struct, dict=True, weakref=True):
+        """
+        A msgspec struct that tracks changes to its fields and their children, for documents that
+        are read and written often. e.g.
+
+            class Item(msgspec.Struct):
+                sku: str
+                quantity: int = 1
+
+            class Order(MutableStruct):
+                customer: str
+                items: list[Item] = []
+
+            order: Mapped[Order] = mapped_column(Order.as_mutable())
+
+        Documents are checked against the annotations when they are decoded or coerced from a
+        dict, not when fields are assigned.
+        """
+
+        @classmethod
+        def coerce(cls, key, value):
+            if isinstance(value, cls):
+                return value
+            if not isinstance(value, dict):
+                return Mutable.coerce(key, value)
+            if (recorder := instrumentation.recorder) is not None:
+                return recorder.record_coerce(lambda document: msgspec.convert(document, cls), key, value)
+            return msgspec.convert(value, cls)
+
+        @classmethod
+        def as_mutable(cls, sqltype: TypeEngine[_T] | None = None) -> TypeEngine[Self]:
+            """Map this struct onto `sqltype` (JSONB on PostgreSQL and JSON elsewhere by default)."""
+            return super().as_mutable(StructType(cls, sqltype))
+
+        @classmethod
+        def associate_with_attribute(cls, attribute):
+            instrumentation.instrument_attribute(attribute)
+            super().associate_with_attribute(attribute)
+
+elif not TYPE_CHECKING:
+
+    class StructType:
+        def __new__(cls, *a, **k):
+            raise RuntimeError("StructType requires msgspec to be installed")
+
+    class MutableStruct:
+        def __new__(cls, *a, **k):
+            raise RuntimeError("MutableStruct requires msgspec to be installed")
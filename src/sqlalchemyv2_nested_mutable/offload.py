@@ -0,0 +1,201 @@
+# Load large values of mutable columns off the event loop, for `sqlalchemy.ext.asyncio`.
+#
+# Under an `AsyncSession`, rows are processed on the event loop thread, so decoding, validating and
+# wrapping a large document stalls every other coroutine. Columns mapped with an `offload_size`
+# fetch their values as JSON text, and while loading `deferred()`, values of at least that many
+# characters are left as `PendingValue` placeholders. `hydrate()` then loads them in an executor
+# and puts the results in place, as if they had been loaded with the row.
+#
+# `scalars()` and `stream_scalars()` wrap the `AsyncSession` methods of the same name, returning
+# objects only once their values are hydrated. Outside of `deferred()`, e.g. in a `Session`, these
+# columns load every value as it is fetched.
+from __future__ import annotations
+
+import asyncio
+import json
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+
+from sqlalchemy.orm import attributes
+from sqlalchemy.orm import InstanceState
+from sqlalchemy.sql.type_api import TypeEngine
+
+from .instrumentation import instrumented_processor
+from .interning import fetch_as_text
+from .serializers import JSON_NULL
+from .serializers import WrappedJSON
+from .trackable import reset_journal
+from .trackable import TrackedObject
+
+# Whether large values being loaded are left for `hydrate()`.
+_deferring: ContextVar[bool] = ContextVar('_deferring', default=False)
+
+
+class PendingValue:
+    """A value held by a loaded object until it is built, by `hydrate()` or `bulk.bulk_load()`."""
+
+    __slots__ = ('raw', 'load', 'validate', 'coerce', 'key', 'state')
+
+    def __init__(
+        self, raw: Any, load: Optional[Callable[[Any], Any]], validate: Optional[Callable[[Any], Any]] = None
+    ):
+        # the JSON text of the value, or the document decoded by the driver when there is no `load`
+        self.raw = raw
+        # `load` decodes the text, `validate` builds the value from the decoded document
+        self.load = load
+        self.validate = validate
+        self.coerce: Optional[Callable[[str, Any], Any]] = None
+        self.key: Optional[str] = None
+        # the state of the object that loaded the value
+        self.state: Optional[InstanceState[Any]] = None
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.raw!r:.40})'
+
+    @property
+    def _parents(self) -> PendingValue:
+        # loading an attribute registers the object holding the value in its `Mutable._parents`,
+        # a value is only ever loaded by one object, which is recorded without a dictionary
+        return self
+
+    def __setitem__(self, state: InstanceState[Any], key: str) -> None:
+        self.state = state
+        self.key = key
+
+    def bind(self, coerce: Callable[[str, Any], Any], key: str) -> PendingValue:
+        """Remember the `Mutable.coerce` of the attribute loading this value, to apply once loaded."""
+        self.coerce = coerce
+        self.key = key
+        return self
+
+    def resolve(self, value: Any) -> Any:
+        if self.validate is not None:
+            value = self.validate(value)
+        return value if self.coerce is None else self.coerce(self.key, value)
+
+    def __call__(self) -> Any:
+        return self.resolve(self.raw) if self.load is None else self.resolve(self.load(self.raw))
+
+
+@contextmanager
+def deferred() -> Iterator[None]:
+    """Leave the large values of columns with an `offload_size` for `hydrate()`, while loading in this block."""
+    token = _deferring.set(True)
+    try:
+        yield
+    finally:
+        _deferring.reset(token)
+
+
+def deferring(text: str, offload_size: int) -> bool:
+    """Whether a value of JSON `text` is left for `hydrate()` by a column with `offload_size`."""
+    return bool(offload_size) and len(text) >= offload_size and _deferring.get()
+
+
+async def _load(pending: PendingValue, executor: Optional[Executor]) -> Any:
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor) and pending.load is not None:
+        # only decoding can be sent to another process, the value is built in the default thread pool
+        document = await loop.run_in_executor(executor, json.loads, pending.raw)
+        return await loop.run_in_executor(None, pending.resolve, document)
+    return await loop.run_in_executor(executor, pending)
+
+
+async def _hydrate(obj: Any, executor: Optional[Executor]) -> Any:
+    state = attributes.instance_state(obj)
+    pending = [(key, value) for key, value in state.dict.items() if isinstance(value, PendingValue)]
+    values = await asyncio.gather(*(_load(value, executor) for _, value in pending))
+    for (key, _), value in zip(pending, values):
+        attach(obj, key, value)
+    return obj
+
+
+def attach(obj: Any, key: str, value: Any) -> None:
+    """Put the loaded `value` of a pending value in place, as if it had been loaded with the row."""
+    state = attributes.instance_state(obj)
+    # replaces the value loaded with the row, as `Mutable` does when coercing it
+    state.dict[key] = value
+    if value is not None:
+        value._parents[state] = key
+    if isinstance(value, TrackedObject) and value._journal_limit is not None:
+        reset_journal(value)
+
+
+async def hydrate(objects: Iterable[Any], executor: Optional[Executor] = None) -> None:
+    """
+    Load the pending values of `objects` in `executor` (the event loop's default one if `None`).
+
+    With a `ProcessPoolExecutor`, the JSON text is decoded in another process, and the values are
+    built from the decoded documents in the default executor.
+    """
+    await asyncio.gather(*(_hydrate(obj, executor) for obj in objects))
+
+
+async def scalars(session: Any, statement: Any, params: Any = None, executor: Optional[Executor] = None, **kw: Any):
+    """Like `AsyncSession.scalars`, loading large values in `executor`, and return all the objects."""
+    with deferred():
+        objects = (await session.scalars(statement, params, **kw)).all()
+    await hydrate(objects, executor)
+    return objects
+
+
+async def stream_scalars(
+    session: Any,
+    statement: Any,
+    params: Any = None,
+    executor: Optional[Executor] = None,
+    batch_size: int = 100,
+    **kw: Any,
+) -> AsyncIterator[Any]:
+    """
+    Like `AsyncSession.stream_scalars`, fetching `batch_size` objects at a time, loading their large
+    values in `executor`, and yielding each object as soon as its values are loaded.
+    """
+    with deferred():
+        result = await session.stream_scalars(statement, params, **kw)
+    try:
+        while True:
+            with deferred():
+                objects: Sequence[Any] = await result.fetchmany(batch_size)
+            if not objects:
+                break
+            for hydrated in asyncio.as_completed([_hydrate(obj, executor) for obj in objects]):
+                yield await hydrated
+    finally:
+        await result.close()
+
+
+class OffloadedJSON(WrappedJSON):
+    """
+    A JSON type fetched as text, whose values of at least `offload_size` characters are left
+    for `hydrate()` while loading `deferred()`.
+    """
+
+    cache_ok = True
+
+    def __init__(self, sqltype: TypeEngine[Any], offload_size: int):
+        super().__init__(sqltype)
+        self.offload_size = offload_size
+
+    def column_expression(self, column):
+        return fetch_as_text(column, self)
+
+    def result_processor(self, dialect, coltype):
+        offload_size = self.offload_size
+        loads = getattr(dialect, '_json_deserializer', None) or json.loads
+
+        def process(value):
+            if value is None or value == JSON_NULL:
+                return None
+            return PendingValue(value, loads) if deferring(value, offload_size) else loads(value)
+
+        return instrumented_processor(self, 'result', process)
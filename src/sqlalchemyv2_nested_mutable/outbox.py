@@ -0,0 +1,119 @@
+# Write the changes of mutable columns to an outbox table, as JSON Patches, in the flush making them.
+#
+# With `enable(table)`, every flush collects the `pending_patch()` of each mutable column value it
+# writes, and inserts one row per value into `table` (see `outbox_table()`) in the same
+# transaction, so that a relay can publish the changes exactly when they are committed:
+#
+# * `table_name`, `row_id` - the table of the object and its primary key, as a JSON array
+# * `column_name` - the column holding the value
+# * `patch` - the RFC 6902 JSON Patch from the value as loaded or last flushed to the one written
+#
+# Columns mapped with `patches=True` (or `partial_updates=True`) produce patches of the changed
+# entries only; other columns (including those with `tracking='snapshot'`), and values assigned or
+# inserted as a whole, replace the document. Deleted objects are not recorded.
+from __future__ import annotations
+
+from itertools import chain
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import attributes
+from sqlalchemy.orm import InstanceState
+from sqlalchemy.orm import Session
+
+from . import instrumentation
+from . import snapshot
+from .trackable import TrackedObject
+
+# `Session.info` key of the patches collected before a flush.
+_PATCHES = 'sqlalchemyv2_nested_mutable.patches'
+
+# The table patches are written to while enabled.
+_table: Optional[sa.Table] = None
+
+
+def outbox_table(metadata: sa.MetaData, name: str = 'json_patch_outbox', **kw: Any) -> sa.Table:
+    """Return an outbox table named `name` in `metadata`, `kw` being passed on to `Table`."""
+    return sa.Table(
+        name,
+        metadata,
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), primary_key=True),
+        sa.Column('table_name', sa.String(255), nullable=False),
+        sa.Column('row_id', sa.JSON(), nullable=False),
+        sa.Column('column_name', sa.String(255), nullable=False),
+        sa.Column('patch', sa.JSON(), nullable=False),
+        **kw,
+    )
+
+
+def enable(table: sa.Table) -> None:
+    """Start writing the patches of every flush to the outbox `table`."""
+    global _table
+    _table = table
+    if not event.contains(Session, 'before_flush', _before_flush):
+        # ahead of `partial`, which forgets the changes it writes
+        event.listen(Session, 'before_flush', _before_flush, insert=True)
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_rollback', _forget_patches)
+
+
+def disable() -> None:
+    """Stop writing patches to the outbox."""
+    global _table
+    _table = None
+    if event.contains(Session, 'before_flush', _before_flush):
+        event.remove(Session, 'before_flush', _before_flush)
+        event.remove(Session, 'after_flush', _after_flush)
+        event.remove(Session, 'after_rollback', _forget_patches)
+
+
+def _patch(value: Any) -> List[Dict[str, Any]]:
+    if isinstance(value, TrackedObject):
+        return value.pending_patch()
+    # set to `None`, or to a value of a column without tracking
+    return [{'op': 'replace', 'path': '', 'value': value}]
+
+
+def _before_flush(session: Session, flush_context: Any, instances: Any) -> None:
+    # runs ahead of the `snapshot` hook, which would flag the changed snapshot-tracked columns too late
+    snapshot.detect_changes(session)
+    patches: List[Tuple[InstanceState[Any], str, List[Dict[str, Any]]]] = []
+    for obj in chain(session.new, session.dirty):
+        state: InstanceState[Any] = attributes.instance_state(obj)
+        for key in chain(instrumentation.column_keys(state.class_), snapshot.column_keys(state.class_)):
+            if state.key is None:
+                if (value := state.dict.get(key)) is None:
+                    continue
+            elif key in state.committed_state:
+                value = state.dict.get(key)
+            else:
+                continue
+            if patch := _patch(value):
+                patches.append((state, key, patch))
+    session.info[_PATCHES] = patches
+
+
+def _forget_patches(session: Session) -> None:
+    session.info.pop(_PATCHES, None)
+
+
+def _after_flush(session: Session, flush_context: Any) -> None:
+    patches = session.info.pop(_PATCHES, [])
+    if (table := _table) is None or not patches:
+        return
+    rows: Dict[Any, List[Dict[str, Any]]] = {}
+    for state, key, patch in patches:
+        mapper = state.mapper
+        column = mapper.get_property(key).columns[0]
+        # new objects only get their identity once the flush is finalized
+        row_id = list(mapper.primary_key_from_instance(state.obj()))
+        rows.setdefault(mapper, []).append({
+            'table_name': column.table.name, 'row_id': row_id, 'column_name': column.name, 'patch': patch
+        })
+    for mapper, values in rows.items():
+        session.execute(sa.insert(table), values, bind_arguments={'mapper': mapper})
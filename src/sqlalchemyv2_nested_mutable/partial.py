@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+from itertools import chain
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import attributes
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.sql.elements import ColumnElement
+
+from ._compat import pydantic
+from .trackable import _child_at
+from .trackable import _jsonable
+from .trackable import _MISSING
+from .trackable import changed_paths
+from .trackable import discard_journal
+from .trackable import journaled_length
+from .trackable import reset_journal
+from .trackable import TrackedObject
+
+# A resolved change: the steps from the root as (key, is list index) pairs, and the new value
+# at the end of them, or `_MISSING` if the entry was removed.
+_Step = Tuple[Any, bool]
+_Operation = Tuple[Tuple[_Step, ...], Any]
+
+
+class _FullWrite(Exception):
+    """Raised when the journaled changes cannot be expressed as a partial update."""
+
+
+def install() -> None:
+    """Register the session hooks writing journaled columns, once per process."""
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+        event.listen(Session, 'after_flush', _after_flush)
+
+
+def journal_attribute(attribute) -> None:
+    """Start journaling the values of a mapped attribute whenever they are loaded from the database."""
+    key = attribute.key
+
+    def load(state, *args):
+        if isinstance(value := state.dict.get(key), TrackedObject):
+            reset_journal(value)
+
+    def refresh(state, context, attrs):
+        if attrs is None or key in attrs:
+            load(state)
+
+    def assign(state, value, *args):
+        # the journal of an assigned value (e.g. taken from another row) does not describe the
+        # changes to the value stored for this one
+        if _journaling(value):
+            discard_journal(value)
+
+    event.listen(attribute.class_, 'load', load, raw=True, propagate=True)
+    event.listen(attribute.class_, 'refresh', refresh, raw=True, propagate=True)
+    event.listen(attribute.class_, 'refresh_flush', refresh, raw=True, propagate=True)
+    event.listen(attribute, 'set', assign, raw=True, propagate=True)
+
+
+def _journaling(value: Any) -> bool:
+    return isinstance(value, TrackedObject) and value._journal_limit is not None
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    for obj in list(session.dirty):
+        state = sa.inspect(obj)
+        for key in list(state.committed_state):
+            if _journaling(root := state.dict.get(key)) and root._partial_writes:
+                _write_partially(session, state, key, root)
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    # the values written in full by the flush now match the database
+    for obj in chain(session.new, session.dirty):
+        for value in sa.inspect(obj).dict.values():
+            if _journaling(value):
+                reset_journal(value)
+
+
+def _write_partially(session: Session, state, key: str, root: TrackedObject) -> None:
+    """
+    Write the journaled changes of `root` with an UPDATE of their paths and mark the attribute as
+    committed, so that the flush does not rewrite the whole value.
+
+    The attribute is left to the flush if the changes, the mapping or the database do not
+    allow a partial update.
+    """
+    mapper = state.mapper
+    if mapper.version_id_col is not None:
+        return
+    column = mapper.get_property(key).columns[0]
+    table = column.table
+    if not isinstance(table, sa.Table) or any(pk.table is not table for pk in mapper.primary_key):
+        return
+    dialect = session.get_bind(mapper).dialect
+    try:
+        values = partial_update_values(column, root, dialect)
+    except _FullWrite:
+        return
+    if values:
+        stmt = (
+            sa.update(table)
+            .where(*(pk == value for pk, value in zip(mapper.primary_key, state.identity)))
+            .values(values)
+        )
+        if session.execute(stmt, bind_arguments={'mapper': mapper}).rowcount != 1:
+            raise StaleDataError(f"UPDATE statement on table '{table.description}' expected to update 1 row(s)")
+    attributes.set_committed_value(state.obj(), key, root)
+    reset_journal(root)
+
+
+def partial_update_values(column: sa.Column, root: TrackedObject, dialect) -> Dict[Any, Any]:
+    """
+    Return the SET clause (targets and values for `Update.values`) turning the stored value of
+    `column` into `root`, empty if nothing needs to be written.
+
+    Raises `_FullWrite` if the whole value has to be written instead.
+    """
+    paths = changed_paths(root)
+    if not paths:
+        # nothing was journaled, yet the attribute was flagged as modified
+        raise _FullWrite
+    sqltype = column.type
+    if dialect.name == 'postgresql' and isinstance(sqltype, sa.ARRAY) and isinstance(root, list):
+        return _array_values(column, sqltype, root, paths)
+    while isinstance(sqltype, sa.types.TypeDecorator):
+        sqltype = sqltype.load_dialect_impl(dialect)
+    if dialect.name == 'postgresql' and isinstance(sqltype, JSONB):
+        expression = _postgresql_expression(column, _operations(root, paths))
+    elif dialect.name == 'sqlite' and isinstance(sqltype, sa.JSON):
+        expression = _sqlite_expression(column, _operations(root, paths))
+    else:
+        raise _FullWrite
+    return {} if expression is None else {column: expression}
+
+
+def _outermost(paths: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+    # entries below a changed container are written along with it
+    changed = set(paths)
+    return [path for path in paths if not any(path[:i] in changed for i in range(1, len(path)))]
+
+
+def _operations(root: TrackedObject, paths: List[Tuple[Any, ...]]) -> List[_Operation]:
+    return [_resolve(root, path) for path in _outermost(paths)]
+
+
+def _resolve(root: TrackedObject, path: Tuple[Any, ...]) -> _Operation:
+    steps: List[_Step] = []
+    node: Any = root
+    for key in path:
+        if node is _MISSING:
+            raise _FullWrite
+        if isinstance(node, list):
+            steps.append((key, True))
+        elif isinstance(node, dict) and isinstance(key, (str, int)) and not isinstance(key, bool):
+            steps.append((key, False))
+        elif pydantic is not None and isinstance(node, pydantic.BaseModel):
+            steps.append((key, False))
+        else:
+            raise _FullWrite
+        node = _child_at(node, key)
+    if node is _MISSING and steps[-1][1]:
+        # removing an element would shift the ones after it
+        raise _FullWrite
+    return tuple(steps), node
+
+
+def _postgresql_expression(column: sa.Column, operations: List[_Operation]) -> Optional[ColumnElement]:
+    expression: ColumnElement = column
+    patch = {}
+    for steps, value in operations:
+        path = sa.literal([str(key) for key, _ in steps], ARRAY(sa.Text))
+        if value is _MISSING:
+            expression = expression.op('#-', return_type=JSONB)(path)
+        elif len(steps) == 1 and not steps[0][1]:
+            # top level keys are merged in one go
+            patch[str(steps[0][0])] = value
+        else:
+            expression = sa.func.jsonb_set(expression, path, sa.cast(_jsonable(value), JSONB), type_=JSONB)
+    if patch:
+        expression = expression.op('||', return_type=JSONB)(sa.cast(_jsonable(patch), JSONB))
+    return None if expression is column else expression
+
+
+def _sqlite_path(steps: Tuple[_Step, ...]) -> str:
+    path = '$'
+    for key, is_index in steps:
+        if is_index:
+            path += f'[{key}]'
+        elif '"' in str(key):
+            raise _FullWrite
+        else:
+            path += f'."{key}"'
+    return path
+
+
+def _sqlite_expression(column: sa.Column, operations: List[_Operation]) -> Optional[ColumnElement]:
+    expression: ColumnElement = column
+    if removed := [_sqlite_path(steps) for steps, value in operations if value is _MISSING]:
+        expression = sa.func.json_remove(expression, *removed, type_=sa.JSON)
+    if assigned := [
+        (_sqlite_path(steps), sa.func.json(sa.literal(_jsonable(value), sa.JSON)))
+        for steps, value in operations
+        if value is not _MISSING
+    ]:
+        expression = sa.func.json_set(expression, *chain.from_iterable(assigned), type_=sa.JSON)
+    return None if expression is column else expression
+
+
+def _array_values(
+    column: sa.Column, sqltype: sa.ARRAY, root: List[Any], paths: List[Tuple[Any, ...]]
+) -> Dict[Any, Any]:
+    """
+    Build subscript and slice assignments for the changed elements of an ARRAY column, or an
+    `array_append`/`array_cat` of the appended ones.
+
+    PostgreSQL only lets one-dimensional arrays grow through subscripts, so appends to
+    multidimensional arrays cannot be combined with changes to existing elements.
+    """
+    dimensions = sqltype.dimensions or 1
+    if sqltype.dimensions is None and any(isinstance(item, list) for item in list.__iter__(root)):
+        raise _FullWrite
+    # subscripts are 1-based unless the type translates them
+    offset = 0 if sqltype.zero_indexes else 1
+    # paths below the element level (e.g. into ARRAY(JSONB) items) replace the whole element
+    elements = _outermost(list(dict.fromkeys(path[:dimensions] for path in paths)))
+    appended_from = journaled_length(root)
+    appended = sorted(path[0] for path in elements if path[0] >= appended_from)
+    if appended != list(range(appended_from, len(root))) or any(
+        len(path) > 1 for path in elements if path[0] >= appended_from
+    ):
+        raise _FullWrite
+    if appended and len(appended) < len(elements) and dimensions > 1:
+        raise _FullWrite
+    if appended and len(appended) == len(elements):
+        items = [_plain(list.__getitem__(root, index)) for index in appended]
+        if len(items) == 1 and dimensions == 1:
+            return {column: sa.func.array_append(column, sa.literal(items[0], sqltype.item_type), type_=sqltype)}
+        return {column: sa.func.array_cat(column, sa.literal(items, sqltype), type_=sqltype)}
+
+    values: Dict[Any, Any] = {}
+    run: List[int] = []
+
+    def flush_run():
+        # consecutive elements (or rows) are assigned as one slice
+        if len(run) == 1 and dimensions == 1:
+            values[column[run[0] + offset]] = _plain(list.__getitem__(root, run[0]))
+        elif run:
+            start, stop = run[0] + offset, run[-1] + offset
+            values[column[start:stop]] = [_plain(list.__getitem__(root, i)) for i in run]
+        run.clear()
+
+    for path in sorted(elements):
+        if len(path) == 1:
+            if run and path[0] != run[-1] + 1:
+                flush_run()
+            run.append(path[0])
+        elif len(path) == dimensions:
+            target = column
+            for index in path:
+                target = target[index + offset]
+            node: Any = root
+            for index in path:
+                node = list.__getitem__(node, index)
+            values[target] = _plain(node)
+        else:
+            raise _FullWrite
+    flush_run()
+    return values
+
+
+def _plain(value: Any) -> Any:
+    # tracked containers are handed to the driver as builtin lists and dicts
+    if isinstance(value, list):
+        return [_plain(item) for item in list.__iter__(value)]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in dict.items(value)}
+    return value
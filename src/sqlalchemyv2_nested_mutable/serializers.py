@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Union
+
+import sqlalchemy as sa
+from sqlalchemy.sql.type_api import TypeEngine
+
+from ._compat import msgspec
+from ._compat import orjson
+from ._compat import pydantic
+from .instrumentation import instrumented_processor
+from .instrumentation import instrumented_type
+
+JSONSerializer = Callable[[Any], Union[str, bytes]]
+
+
+def sorted_members(values: Iterable[Any]) -> List[Any]:
+    """Return the members of a set in order, so that equal sets are always encoded alike."""
+    try:
+        return sorted(values)
+    except TypeError:
+        # members of different types, e.g. numbers and strings in a JSON array
+        return sorted(values, key=lambda value: (type(value).__name__, repr(value)))
+
+
+def _dump_model(value: Any) -> Any:
+    # hook for serializers that do not know pydantic models, sets, tracked dataclasses or msgspec structs
+    if pydantic is not None and isinstance(value, pydantic.BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset)):
+        return sorted_members(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    if msgspec is not None and isinstance(value, msgspec.Struct):
+        return msgspec.structs.asdict(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _json_serializer(value: Any) -> str:
+    return json.dumps(value, default=_dump_model)
+
+
+def default_serializer(dialect: Any) -> Callable[[Any], str] | None:
+    """
+    Return the function encoding values to JSON text when the engine was not given a
+    `json_serializer`: `json.dumps`, also encoding sets as sorted arrays (see `_dump_model`).
+    """
+    return None if getattr(dialect, '_json_serializer', None) else _json_serializer
+
+
+def _pydantic_serializer(value: Any) -> bytes:
+    if isinstance(value, pydantic.BaseModel):
+        return value.model_dump_json().encode()
+    from pydantic_core import to_json
+
+    return to_json(value)
+
+
+def _orjson_serializer(value: Any) -> bytes:
+    return orjson.dumps(value, default=_dump_model)
+
+
+def _msgspec_serializer(value: Any) -> bytes:
+    return msgspec.json.encode(value, enc_hook=_dump_model)
+
+
+_SERIALIZERS = {
+    'pydantic': (pydantic, _pydantic_serializer),
+    'orjson': (orjson, _orjson_serializer),
+    'msgspec': (msgspec, _msgspec_serializer),
+}
+
+
+def json_serializer(serializer: str | JSONSerializer) -> Callable[[Any], str]:
+    """
+    Return a function encoding a column value to JSON text.
+
+    `serializer` is one of `'pydantic'` (`model_dump_json` / `pydantic_core.to_json`), `'orjson'`
+    or `'msgspec'`, or any callable returning `str` or `bytes`. All of them encode tracked
+    dicts and lists as they are, without copying them to plain containers first.
+    """
+    if isinstance(serializer, str):
+        if serializer not in _SERIALIZERS:
+            raise ValueError(f"Unknown JSON serializer {serializer!r}, expected one of {', '.join(_SERIALIZERS)}")
+        module, encode = _SERIALIZERS[serializer]
+        if module is None:
+            raise RuntimeError(f"The {serializer!r} JSON serializer requires {serializer} to be installed")
+    else:
+        encode = serializer
+
+    def serialize(value: Any) -> str:
+        text = encode(value)
+        # drivers bind bytes as binary data, not as JSON
+        return text.decode() if isinstance(text, bytes) else text
+
+    return serialize
+
+
+# The JSON text of a `None` value, which is stored as a JSON null by default
+JSON_NULL = 'null'
+
+
+@instrumented_type
+class WrappedJSON(sa.types.TypeDecorator):
+    """
+    Base of the types processing the values of a JSON type (JSON, JSONB, or a custom one) they
+    wrap, and are stored and compared like.
+    """
+
+    cache_ok = True
+    impl = sa.types.JSON
+
+    def __init__(self, sqltype: TypeEngine[Any]):
+        super().__init__()
+        self.sqltype = sqltype
+        # compared like `sqltype`, e.g. with the `has_key` and `contains` of JSONB
+        self.impl = sqltype
+
+    def load_dialect_impl(self, dialect):
+        return dialect.type_descriptor(self.sqltype)
+
+    def coerce_compared_value(self, op, value):
+        # documents are bound like the values of the column, other operands (e.g. the key of
+        # `has_key`) as `sqltype` binds them
+        coerced = self.impl.coerce_compared_value(op, value)
+        return self if coerced is self.impl else coerced
+
+    def __repr__(self):
+        return repr(self.sqltype)
+
+
+class SerializedJSON(WrappedJSON):
+    """
+    A JSON type whose values are encoded by a given serializer instead of the dialect's
+    `json_serializer`, see `json_serializer`.
+
+    Without a `serializer`, values are encoded by the engine's `json_serializer`, or by
+    `default_serializer` when it has none, so that nested sets can be written.
+    """
+
+    cache_ok = True
+
+    def __init__(self, sqltype: TypeEngine[Any], serializer: str | JSONSerializer | None = None):
+        super().__init__(sqltype)
+        self.serializer = serializer
+        self._serialize = None if serializer is None else json_serializer(serializer)
+
+    def bind_processor(self, dialect):
+        if (serialize := self._serialize) is not None:
+
+            def process(value):
+                return None if value is None else serialize(value)
+
+        elif (serialize := default_serializer(dialect)) is not None:
+            # `None` is written as `sqltype` writes it, a JSON null unless `none_as_null` is set
+            null = None if getattr(self.sqltype, 'none_as_null', False) else JSON_NULL
+
+            def process(value):
+                return null if value is None else serialize(value)
+
+        else:
+            process = super().bind_processor(dialect)
+        return instrumented_processor(self, 'bind', process)
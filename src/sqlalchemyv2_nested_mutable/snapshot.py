@@ -0,0 +1,158 @@
+# Detect changes to JSON columns by comparing fingerprints instead of tracking each mutation.
+#
+# Columns set up by `track_snapshots` hold plain `dict`/`list` values, so in-place edits cost
+# nothing. A fingerprint (a hash of the value's JSON text) is taken when a value is loaded or
+# flushed, and `before_flush` flags the columns whose value no longer matches it.
+#
+# A session skips flushing when none of its objects is flagged as modified, and flagging every
+# loaded object would make each flush update them all. So fingerprints are also compared before
+# a commit and before a query autoflushes the session, flagging only the changed columns. An
+# explicit `Session.flush()` of an otherwise clean session needs `detect_changes` first.
+from __future__ import annotations
+
+import json
+from hashlib import blake2b
+from itertools import chain
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Column
+from sqlalchemy import event
+from sqlalchemy.orm import attributes
+from sqlalchemy.orm import InstanceState
+from sqlalchemy.orm import Mapper
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.type_api import TypeEngine
+
+from ._typing import _T
+from .serializers import json_serializer
+from .serializers import JSONSerializer
+
+_APPLIED_KEY = 'sqlalchemyv2_nested_mutable.snapshot_applied'
+
+# The fingerprints of the loaded or flushed values, by attribute key, of each instance
+_fingerprints: WeakKeyDictionary[InstanceState[Any], Dict[str, bytes]] = WeakKeyDictionary()
+# The functions encoding the values to fingerprint, by attribute key, of each mapped class
+_encoders: Dict[type, Dict[str, Callable[[Any], str]]] = {}
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+def track_snapshots(sqltype: TypeEngine[_T], serializer: str | JSONSerializer | None = None) -> TypeEngine[_T]:
+    """
+    Detect changes to the columns of `sqltype` by fingerprinting their values at load and flush.
+
+    Values are fingerprinted with the JSON text `serializer` (see `json_serializer`) produces for
+    them, `json.dumps` by default.
+    """
+    encode = _dumps if serializer is None else json_serializer(serializer)
+
+    def listen_for_type(mapper: Mapper[Any], class_: type) -> None:
+        if mapper.non_primary:
+            return
+        for prop in mapper.column_attrs:
+            if isinstance(prop.expression, Column) and prop.expression.type is sqltype:
+                if not prop.expression.info.get(_APPLIED_KEY, False):
+                    prop.expression.info[_APPLIED_KEY] = True
+                    snapshot_attribute(getattr(class_, prop.key), encode)
+
+    event.listen(Mapper, 'mapper_configured', listen_for_type)
+    return sqltype
+
+
+def snapshot_attribute(attribute: Any, encode: Callable[[Any], str] = _dumps) -> None:
+    """Fingerprint the values of a mapped `attribute` and flag it when they change in place."""
+    key = attribute.key
+    _encoders.setdefault(attribute.class_, {})[key] = encode
+    install()
+
+    def load(state: InstanceState[Any], *args: Any) -> None:
+        _take(state, (key,))
+
+    def refresh(state: InstanceState[Any], context: Any, attrs: Iterable[str] | None) -> None:
+        if attrs is None or key in attrs:
+            _take(state, (key,))
+
+    event.listen(attribute.class_, 'load', load, raw=True, propagate=True)
+    event.listen(attribute.class_, 'refresh', refresh, raw=True, propagate=True)
+
+
+def install() -> None:
+    """Register the session hooks comparing and renewing fingerprints, once per process."""
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'before_commit', detect_changes)
+        event.listen(Session, 'do_orm_execute', _before_autoflush)
+
+
+def column_keys(class_: type) -> List[str]:
+    """Return the keys of the snapshot-tracked columns of the mapped `class_`, including inherited ones."""
+    return [key for cls in class_.__mro__ for key in _encoders.get(cls, ())]
+
+
+def detect_changes(session: Session) -> None:
+    """Flag the columns of the objects in `session` whose value no longer matches its fingerprint."""
+    if not _encoders:
+        return
+    for state in session.identity_map.all_states():
+        if not (fingerprints := _fingerprints.get(state)) or (obj := state.obj()) is None:
+            continue
+        encoders = _class_encoders(state)
+        values = state.dict
+        for key, fingerprint in fingerprints.items():
+            # assigned values are written anyway, and expired ones were not changed
+            if key in state.committed_state or key not in values:
+                continue
+            if _fingerprint(encoders[key], values[key]) != fingerprint:
+                attributes.flag_modified(obj, key)
+
+
+def _class_encoders(state: InstanceState[Any]) -> Dict[str, Callable[[Any], str]]:
+    encoders: Dict[str, Callable[[Any], str]] = {}
+    for cls in reversed(state.class_.__mro__):
+        encoders.update(_encoders.get(cls, ()))
+    return encoders
+
+
+def _fingerprint(encode: Callable[[Any], str], value: Any) -> bytes:
+    return blake2b(encode(value).encode(), digest_size=16).digest()
+
+
+def _take(state: InstanceState[Any], keys: Iterable[str]) -> None:
+    """Fingerprint the values of `keys`."""
+    encoders = _class_encoders(state)
+    fingerprints = _fingerprints.get(state)
+    if fingerprints is None:
+        fingerprints = _fingerprints[state] = {}
+    values = state.dict
+    for key in keys:
+        if key in values:
+            fingerprints[key] = _fingerprint(encoders[key], values[key])
+        else:
+            fingerprints.pop(key, None)
+
+
+def _before_autoflush(orm_execute_state: ORMExecuteState) -> None:
+    # the handlers run before the statement autoflushes the session
+    if orm_execute_state.session.autoflush:
+        detect_changes(orm_execute_state.session)
+
+
+def _before_flush(session: Session, flush_context: Any, instances: Any) -> None:
+    detect_changes(session)
+
+
+def _after_flush(session: Session, flush_context: Any) -> None:
+    # `new` and `dirty` still list the flushed objects, and `committed_state` the written keys
+    for obj in chain(session.new, session.dirty):
+        state: InstanceState[Any] = attributes.instance_state(obj)
+        if keys := _class_encoders(state).keys():
+            _take(state, keys if state.key is None else keys & state.committed_state.keys())
@@ -1,72 +1,700 @@
 from __future__ import annotations
 
+import abc
+import dataclasses
+import operator
+import types
+from contextlib import contextmanager
+from functools import cache
+from functools import lru_cache
+from typing import AbstractSet
 from typing import Any
+from typing import Callable
 from typing import cast
+from typing import ClassVar
+from typing import Collection
 from typing import Dict
+from typing import ItemsView
 from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Mapping
+from typing import NamedTuple
 from typing import Optional
 from typing import overload
+from typing import Set
 from typing import Tuple
 from typing import TYPE_CHECKING
 from typing import Union
-from weakref import WeakValueDictionary
+from typing import ValuesView
+from weakref import ref
+from weakref import WeakKeyDictionary
+from weakref import WeakSet
 
+from sqlalchemy import event
 from sqlalchemy.ext.mutable import Mutable
+from sqlalchemy.orm import Session
 from sqlalchemy.util.typing import SupportsIndex
 from sqlalchemy.util.typing import TypeGuard
 from typing_extensions import Self
 
+from . import instrumentation
+from ._compat import msgspec
 from ._compat import pydantic
 from ._typing import _KT
 from ._typing import _T
 from ._typing import _VT
-
-parents_track: WeakValueDictionary[int, Mutable] = WeakValueDictionary()
+from .serializers import sorted_members
 
 
 class TrackedObject:
     """
     Represents an object in a nested context whose parent can be tracked.
 
-    The top object in the parent link should be an instance of `Mutable`.
+    Each tracked object keeps a weak reference to the container it is nested in (in the
+    `_parent_ref` slot of its concrete class), and the top object in the parent link
+    should be an instance of `Mutable`.
     """
 
-    def __del__(self):
-        if (id_ := id(self)) in parents_track:
-            del parents_track[id_]
+    __slots__ = ()
+
+    # Whether nested values are wrapped on first access instead of on construction.
+    _lazy = False
+    # Maximum number of changed paths a root records before giving up on partial updates, `None` to disable.
+    _journal_limit: Optional[int] = None
+    # Whether a flush writes the journaled changes alone, rather than only exposing them as `pending_patch()`.
+    _partial_writes = True
+
+    def tracked_parent(self) -> Optional[TrackedObject]:
+        """Return the container this object is nested in, if it is still alive."""
+        ref = getattr(self, '_parent_ref', None)
+        return None if ref is None else ref()
+
+    def tracked_root(self) -> TrackedObject:
+        """Follow the parent links up to the top-most object that is still alive."""
+        node = self
+        while (parent_ref := getattr(node, '_parent_ref', None)) is not None and (parent := parent_ref()) is not None:
+            node = parent
+        return node
+
+    def tracked_path(self) -> Optional[Tuple[Any, ...]]:
+        """
+        Return the keys (dict keys, list indexes or field names) leading from the root to this object.
+
+        Returns `None` if the object has been detached from the tree it was nested in.
+        """
+        path = []
+        node = self
+        while (parent_ref := getattr(node, '_parent_ref', None)) is not None and (parent := parent_ref()) is not None:
+            if (key := _key_in_parent(parent, node)) is _MISSING:
+                return None
+            path.append(key)
+            node = parent
+        path.reverse()
+        return tuple(path)
+
+    def changed(self, *keys: Any, added: Collection[Any] = ()):
+        """
+        Propagate a change to the root `Mutable`.
+
+        `keys` name the entries of this object that were set or removed, no keys means the
+        object changed as a whole. `added` names those of `keys` that did not exist before.
+        """
+        if (recorder := instrumentation.recorder) is not None:
+            recorder.record_change(self, keys)
+        if isinstance(root := self.tracked_root(), Mutable):
+            if root._journal_limit is not None:
+                _record_change(cast(TrackedObject, root), self, keys, added)
+            _emit_change(root)
+
+    def pending_patch(self) -> List[Dict[str, Any]]:
+        """
+        Return the RFC 6902 JSON Patch turning the value this object belongs to, as it was loaded
+        or last flushed, into its current state.
+
+        The patch is built from the journaled changes (see `changed_paths`), so it is minimal for
+        columns mapped with `patches=True` or `partial_updates=True`. Otherwise, or when the whole
+        value has to be written, it replaces the whole document.
+        """
+        root = self.tracked_root()
+        journal: Optional[Dict[Tuple[Any, ...], bool]] = getattr(root, '_journal', None)
+        if journal is None:
+            return [{'op': 'replace', 'path': '', 'value': _jsonable(root)}]
+        patch = []
+        for path, added in journal.items():
+            # entries below a changed container are written along with it
+            if any(path[:i] in journal for i in range(len(path))):
+                continue
+            node: Any = root
+            for key in path:
+                if (node := _child_at(node, key)) is _MISSING:
+                    break
+            pointer = ''.join('/' + str(key).replace('~', '~0').replace('/', '~1') for key in path)
+            if node is _MISSING:
+                if not added:
+                    patch.append({'op': 'remove', 'path': pointer})
+            else:
+                patch.append({'op': 'add' if added else 'replace', 'path': pointer, 'value': _jsonable(node)})
+        return patch
+
+    def set_paths(self, updates: Mapping[Union[str, Tuple[Any, ...]], Any]) -> None:
+        """
+        Set the values at many nested paths of this object at once, with a single change notification.
+
+        Paths are dotted (`'preferred.city'`) or slash-separated (`'home/3/street'`) strings, whose
+        parsing is cached, or tuples of keys. Missing dict entries along a path are created as dicts,
+        while list items and model fields must exist. Each value is made trackable once.
+
+            user.addresses.set_paths({'preferred.city': 'Paris', 'home/0/street': 'Main St'})
+        """
+        changes: List[_Change] = []
+        try:
+            for path, value in updates.items():
+                node, key = self._path_parent(path, changes)
+                added: Tuple[Any, ...] = ()
+                if isinstance(node, dict):
+                    added = () if key in node else (key,)
+                    dict.__setitem__(node, key, TrackedObject.make_nested_trackable(value, node))
+                elif isinstance(node, list):
+                    list.__setitem__(node, key, TrackedObject.make_nested_trackable(value, node))
+                else:
+                    _set_field(node, key, value)
+                changes.append((node, (key,), added))
+        finally:
+            self._changed_all(changes)
+
+    def delete_paths(self, *paths: Union[str, Tuple[Any, ...]]) -> None:
+        """
+        Remove the dict entries or list items at many nested paths of this object at once, with a
+        single change notification. Paths are given as for `set_paths`, and list items are
+        removed from the last one, so the indexes of a list all refer to its items before the call.
+        """
+        targets = [self._path_parent(path) for path in paths]
+        changes: List[_Change] = []
+        try:
+            for node, key in sorted(targets, key=lambda target: isinstance(target[0], list) and -target[1]):
+                if isinstance(node, dict):
+                    dict.__delitem__(node, key)
+                    changes.append((node, (key,), ()))
+                elif isinstance(node, list):
+                    list.__delitem__(node, key)
+                    changes.append((node, (), ()))
+                else:
+                    raise TypeError(f"Cannot delete the field {key!r} of {type(node).__name__}")
+        finally:
+            self._changed_all(changes)
+
+    def _path_parent(
+        self, path: Union[str, Tuple[Any, ...]], created: Optional[List[_Change]] = None
+    ) -> Tuple[Any, Any]:
+        """
+        Return the container holding the last key of `path`, and that key, creating the missing
+        dicts along the way (recorded in `created`) if given.
+        """
+        keys = _parse_path(path) if isinstance(path, str) else tuple(path)
+        if not keys:
+            raise ValueError("Empty path")
+        node: Any = self
+        for key in keys[:-1]:
+            if isinstance(node, dict):
+                if created is not None and node.get(key) is None:
+                    added = () if key in node else (key,)
+                    dict.__setitem__(node, key, TrackedObject.make_nested_trackable({}, node))
+                    created.append((node, (key,), added))
+                child = node[key]
+            elif isinstance(node, list):
+                child = node[int(key)]
+            else:
+                child = getattr(node, key)
+            if not isinstance(child, _CONTAINER_TYPES) or isinstance(child, set):
+                raise TypeError(f"{key!r} in path {path!r} is not a container, but {type(child).__name__}")
+            node = child
+        key = keys[-1]
+        if isinstance(node, list):
+            key = range(len(node))[int(key)]
+        elif not isinstance(node, dict) and key not in _field_names(node):
+            raise AttributeError(f"{type(node).__name__!r} object has no field {key!r}")
+        return node, key
+
+    def _changed_all(self, changes: List[_Change]) -> None:
+        """Propagate the changes made below this object, as one notification of the root `Mutable`."""
+        if not changes:
+            return
+        if (recorder := instrumentation.recorder) is not None:
+            for node, keys, _ in changes:
+                recorder.record_change(node, keys)
+        if isinstance(root := self.tracked_root(), Mutable):
+            if root._journal_limit is not None:
+                for node, keys, added in changes:
+                    _record_change(cast(TrackedObject, root), node, keys, added)
+            _emit_change(root)
+
+    @contextmanager
+    def batch(self) -> Iterator[Self]:
+        """
+        Coalesce the change notifications of the value this object belongs to.
+
+        Changes made inside the block are still tracked, but the root `Mutable` only flags its
+        parents once, when the outermost batch exits (also if it exits with an exception).
 
-    def changed(self):
-        if (id_ := id(self)) in parents_track:
-            parent = parents_track[id_]
-            parent.changed()
-        elif isinstance(self, Mutable):
-            s = cast(Mutable, super())
-            s.changed()
+            with user.settings.batch():
+                for key, value in updates.items():
+                    user.settings[key] = value
+        """
+        root = self.tracked_root()
+        if not isinstance(root, Mutable):
+            yield self
+            return
+        depth = getattr(root, '_batch_depth', 0)
+        _set_state(root, '_batch_depth', depth + 1)
+        try:
+            yield self
+        finally:
+            _set_state(root, '_batch_depth', depth)
+            if not depth and getattr(root, '_batch_pending', False):
+                _set_state(root, '_batch_pending', False)
+                _notify(root)
+
+    def _adopt(self, values: Iterable[Any]):
+        """Re-parent values that were already tracked elsewhere onto this object."""
+        for value in values:
+            if isinstance(value, TrackedObject):
+                _set_parent(value, self)
 
     @classmethod
     def make_nested_trackable(cls, val: _T, parent: Mutable):
+        # scalars, the bulk of most documents, only cost this lookup
+        if (tracker := _dispatch.get(type(val), _MISSING)) is _MISSING:
+            tracker = tracker_of(type(val))
+        if tracker is None:
+            return val
+        if (recorder := instrumentation.recorder) is not None:
+            if not recorder.wrapping:
+                return recorder.record_wrap(cls.make_nested_trackable, val, parent)
+            recorder.nodes += 1
+        if isinstance(parent, TrackedObject) and parent._lazy:
+            return cls.make_lazily_trackable(val, parent)
+
+        new_val: Any = tracker.wrap(val)
+
+        if isinstance(new_val, cls):
+            _set_parent(new_val, parent)
+
+        return new_val
+
+    @classmethod
+    def make_lazily_trackable(cls, val: _T, parent: Mutable):
+        """
+        Wrap only `val` itself, leaving its children to be wrapped when they are first read.
+        """
         new_val: Any = val
 
-        if isinstance(val, dict):
-            new_val = TrackedDict((k, cls.make_nested_trackable(v, parent)) for k, v in val.items())
-        elif isinstance(val, list):
-            new_val = TrackedList(cls.make_nested_trackable(o, parent) for o in val)
-        elif isinstance(val, pydantic.BaseModel) and not isinstance(val, TrackedPydanticBaseModel):
-            model_cls = type('Tracked' + val.__class__.__name__, (TrackedPydanticBaseModel, val.__class__), {})
-            model_cls.__doc__ = (
-                f"This class is composed of `{val.__class__.__name__}` and `TrackedPydanticBaseModel` "
-                "to make it trackable in nested context."
-            )
-            new_val = model_cls.model_validate(val.model_dump())  # type: ignore
+        if not isinstance(val, TrackedObject):
+            if (tracker := tracker_of(type(val))) is not None:
+                new_val = tracker.wrap_lazily(val)
+        elif _owned_elsewhere(val, parent) and (tracker := tracker_of(type(val))) is not None:
+            # like the eager path, copy a value another container still holds, so that its changes
+            # are not moved over to this one (e.g. a value shared between two rows)
+            new_val = tracker.wrap(val)
 
         if isinstance(new_val, cls):
-            parents_track[id(new_val)] = parent
+            _set_parent(new_val, parent)
 
         return new_val
 
 
+_MISSING: Any = object()
+
+
+def _owned_elsewhere(val: TrackedObject, parent: Any) -> bool:
+    """Whether `val` belongs to a container or row other than `parent`."""
+    if isinstance(val, Mutable):
+        return True
+    parent_ref = getattr(val, '_parent_ref', None)
+    owner = None if parent_ref is None else parent_ref()
+    return owner is not None and owner is not parent
+
+
+@lru_cache(maxsize=1024)
+def _parse_path(path: str) -> Tuple[str, ...]:
+    """Split a dotted or slash-separated path (with JSON pointer escapes) into its keys."""
+    if '/' not in path:
+        return tuple(path.split('.'))
+    return tuple(key.replace('~1', '/').replace('~0', '~') for key in path.lstrip('/').split('/'))
+
+
+def _field_names(model: Any) -> Iterable[str]:
+    if isinstance(model, TrackedFields):
+        return model._field_names()
+    return type(model).model_fields
+
+
+def _set_field(model: Any, name: str, value: Any) -> None:
+    # as the `__setattr__` of tracked models, without the change notification
+    if isinstance(model, TrackedFields):
+        model._set_field(name, TrackedObject.make_nested_trackable(value, model))
+        return
+    pydantic.BaseModel.__setattr__(model, name, value)
+    values = model.__dict__
+    if name in values and needs_wrapping(new_value := values[name]):
+        values[name] = TrackedObject.make_nested_trackable(new_value, model)
+
+
+def _child_at(parent: Any, key: Any) -> Any:
+    try:
+        if isinstance(parent, dict):
+            return dict.__getitem__(parent, key)
+        if isinstance(parent, list):
+            return list.__getitem__(parent, key)
+        if isinstance(parent, TrackedFields):
+            # fields of structs and slotted dataclasses are not in a `__dict__`
+            return getattr(parent, key) if key in parent._field_names() else _MISSING
+        return parent.__dict__[key]
+    except (KeyError, IndexError, TypeError):
+        return _MISSING
+
+
+def _key_in_parent(parent: Any, child: TrackedObject) -> Any:
+    # The key found last time is remembered on the child, and only searched for again
+    # when it no longer leads to the child (e.g. after list items shifted).
+    hint = getattr(child, '_parent_key', _MISSING)
+    if hint is not _MISSING and _child_at(parent, hint) is child:
+        return hint
+    if isinstance(parent, dict):
+        entries: Iterable[Tuple[Any, Any]] = dict.items(parent)
+    elif isinstance(parent, list):
+        entries = enumerate(list.__iter__(parent))
+    elif isinstance(parent, TrackedFields):
+        entries = ((name, getattr(parent, name)) for name in parent._field_names())
+    else:
+        entries = parent.__dict__.items()
+    for key, value in entries:
+        if value is child:
+            _set_state(child, '_parent_key', key)
+            return key
+    return _MISSING
+
+
+def _record_change(
+    root: TrackedObject, node: TrackedObject, keys: Tuple[Any, ...], added: Collection[Any] = ()
+) -> None:
+    """
+    Add the paths changed on `node` to the journal of `root`, see `changed_paths`, along with
+    whether their entry did not exist before their first change.
+    """
+    journal = getattr(root, '_journal', None)
+    if journal is None:
+        # the value has not been written yet, or must be written in full anyway
+        return
+    path = node.tracked_path()
+    if path is None or (not keys and not path) or len(journal) + len(keys) > cast(int, root._journal_limit):
+        journal = None
+    elif keys:
+        for key in keys:
+            journal.setdefault(path + (key,), key in added)
+    else:
+        journal.setdefault(path, False)
+    _set_state(root, '_journal', journal)
+
+
+def changed_paths(root: TrackedObject) -> Optional[List[Tuple[Any, ...]]]:
+    """
+    Return the paths changed on `root` since it was loaded or flushed, in the order they first changed.
+
+    Returns `None` when the full value has to be written: the root was never written to the
+    database, changed as a whole, or its journal overflowed.
+    """
+    journal = getattr(root, '_journal', None)
+    return None if journal is None else list(journal)
+
+
+def _jsonable(value: Any) -> Any:
+    # a plain copy of a tracked value, as it is written to JSON
+    if pydantic is not None:
+        from pydantic_core import to_jsonable_python
+
+        return to_jsonable_python(value)
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted_members(value)
+    return value
+
+
+def reset_journal(root: TrackedObject) -> None:
+    """Mark `root` as matching the database, so that later changes are journaled."""
+    _set_state(root, '_journal', {})
+    if isinstance(root, list):
+        _set_state(root, '_journal_len', len(root))
+
+
+def discard_journal(root: TrackedObject) -> None:
+    """Mark `root` as to be written in full, e.g. once it is assigned to an attribute."""
+    _set_state(root, '_journal', None)
+
+
+def journaled_length(root: List[Any]) -> int:
+    """Return the length `root` had when its journal was last reset, entries from there on were appended."""
+    return getattr(root, '_journal_len', 0)
+
+
+# A change made by `set_paths` or `delete_paths`: the container, the keys changed on it and those added.
+_Change = Tuple[TrackedObject, Tuple[Any, ...], Tuple[Any, ...]]
+
+# `Session.info` key of the roots flagged as modified since the session's last flush
+_DIRTY_ROOTS = 'sqlalchemyv2_nested_mutable.dirty_roots'
+
+
+def _emit_change(root: Mutable) -> None:
+    """Notify the parents of `root` of a change, or leave it pending until its outermost batch exits."""
+    if getattr(root, '_batch_depth', 0):
+        _set_state(root, '_batch_pending', True)
+    else:
+        _notify(root)
+
+
+def _notify(root: Mutable) -> None:
+    """
+    Flag the parents of `root` as modified, unless that already happened since their session's
+    last flush, commit or rollback.
+    """
+    if getattr(root, '_dirty', False):
+        return
+    Mutable.changed(root)
+    sessions = [state.session for state in root._parents]
+    # values of transient objects are never cleaned by a session, so they are always flagged
+    if sessions and None not in sessions:
+        if not event.contains(Session, 'after_flush', _clear_dirty_roots):
+            for name in ('after_flush', 'after_commit', 'after_rollback', 'after_transaction_end'):
+                event.listen(Session, name, _clear_dirty_roots)
+            for name in ('persistent_to_detached', 'pending_to_transient'):
+                event.listen(Session, name, _clear_dirty_roots)
+        for session in sessions:
+            session.info.setdefault(_DIRTY_ROOTS, {})[id(root)] = root
+        _set_state(root, '_dirty', True)
+
+
+def _clear_dirty_roots(session: Session, *args: Any) -> None:
+    for root in session.info.pop(_DIRTY_ROOTS, {}).values():
+        _set_state(root, '_dirty', False)
+
+
+def _set_parent(obj: TrackedObject, parent: Any) -> None:
+    # `weakref.ref` hands back the existing reference when called again for the same parent,
+    # so siblings share a single weakref object.
+    try:
+        object.__setattr__(obj, '_parent_ref', ref(parent))
+    except TypeError:
+        cast(TrackedFields, obj)._set_field('_parent_ref', ref(parent))
+
+
+def _set_state(obj: TrackedObject, name: str, value: Any) -> None:
+    # bookkeeping attributes bypass the `__setattr__` of tracked objects
+    try:
+        object.__setattr__(obj, name, value)
+    except TypeError:
+        # msgspec structs only take attributes through their own setter
+        cast(TrackedFields, obj)._set_field(name, value)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    currsize: int
+
+
+# Every generated `Tracked<Model>` class, held weakly so that it goes away together with its source model.
+_tracked_model_classes: WeakSet[type] = WeakSet()
+_tracked_model_stats = {'hits': 0, 'misses': 0}
+
+
+def _tracked_class(source_cls: type, key: Any, base: type, create: Callable[[str], type]) -> type:
+    """
+    Return the trackable subclass of `source_cls` registered under `key`, calling `create` with
+    its name to make it (mixing in `base`) on first use.
+
+    The generated classes are registered on the source class itself (rather than in a global
+    mapping that would keep it alive), so each source type gets exactly one tracked subclass
+    (per `key`) that is evicted together with it.
+    """
+    registry = source_cls.__dict__.get('__tracked_classes__')
+    if registry is not None and (tracked_cls := registry.get(key)) is not None:
+        _tracked_model_stats['hits'] += 1
+        return tracked_cls
+
+    _tracked_model_stats['misses'] += 1
+    tracked_cls = create('Tracked' + source_cls.__name__)
+    tracked_cls.__doc__ = (
+        f"This class is composed of `{source_cls.__name__}` and `{base.__name__}` "
+        "to make it trackable in nested context."
+    )
+    if registry is None:
+        registry = {}
+        type.__setattr__(source_cls, '__tracked_classes__', registry)
+    registry[key] = tracked_cls
+    _tracked_model_classes.add(tracked_cls)
+    if (recorder := instrumentation.recorder) is not None:
+        recorder.record_class(tracked_cls)
+    return tracked_cls
+
+
+def tracked_model_class(model_cls: type, lazy: bool = False) -> type:
+    """
+    Return the trackable subclass of the pydantic model `model_cls`, creating it on first use.
+
+    The generated classes (one per `lazy` flavour) are registered on the source class itself, so
+    that they are evicted together with it.
+    """
+    base = LazyTrackedPydanticBaseModel if lazy else TrackedPydanticBaseModel
+
+    def create(name: str) -> type:
+        return type(name, (base, model_cls), {'__module__': model_cls.__module__})
+
+    return _tracked_class(model_cls, lazy, base, create)
+
+
+def tracked_dataclass_class(dataclass_cls: type) -> type:
+    """
+    Return the trackable subclass of the dataclass `dataclass_cls`, creating it on first use.
+
+    Like the classes of `tracked_model_class`, it is registered on the source class and counted
+    by `tracked_model_cache_info`.
+    """
+
+    def create(name: str) -> type:
+        slots: Tuple[str, ...] = ('_parent_ref', '_parent_key')
+        if not dataclass_cls.__weakrefoffset__:
+            # parents are referenced weakly, which slotted dataclasses do not allow by default
+            slots += ('__weakref__',)
+        namespace = {'__slots__': slots, '__module__': dataclass_cls.__module__}
+        return type(name, (TrackedDataclass, dataclass_cls), namespace)
+
+    return _tracked_class(dataclass_cls, False, TrackedDataclass, create)
+
+
+def tracked_struct_class(struct_cls: type) -> type:
+    """
+    Return the trackable subclass of the msgspec struct `struct_cls`, creating it on first use.
+
+    Like the classes of `tracked_model_class`, it is registered on the source class and counted
+    by `tracked_model_cache_info`.
+    """
+
+    def create(name: str) -> type:
+        # structs cannot declare `__slots__`, the parent reference goes to a `__dict__` instead
+        return types.new_class(
+            name,
+            (TrackedStruct, struct_cls),
+            {'dict': True, 'weakref': True},
+            lambda namespace: namespace.update(
+                __module__=struct_cls.__module__, _struct_post_init=getattr(struct_cls, '__post_init__', None)
+            ),
+        )
+
+    return _tracked_class(struct_cls, False, TrackedStruct, create)
+
+
+def tracked_model_cache_info() -> CacheInfo:
+    """Report how often `tracked_model_class` reused a class, and how many classes are alive."""
+    return CacheInfo(_tracked_model_stats['hits'], _tracked_model_stats['misses'], len(_tracked_model_classes))
+
+
+def tracked_model_cache_clear() -> None:
+    """Forget all generated `Tracked<Model>` classes and reset the statistics."""
+    for tracked_cls in list(_tracked_model_classes):
+        for model_cls in tracked_cls.__bases__:
+            model_cls.__dict__.get('__tracked_classes__', {}).clear()
+    _tracked_model_classes.clear()
+    _tracked_model_stats.update(hits=0, misses=0)
+    _clear_dispatch()
+
+
+class Tracker(NamedTuple):
+    """How `make_nested_trackable` wraps the values of a type, see `register_tracker`."""
+
+    # returns a `TrackedObject` copy of the value, with its children made trackable
+    wrap: Callable[[Any], Any]
+    # returns a `TrackedObject` copy of the value, leaving its children for when they are read
+    wrap_lazily: Callable[[Any], Any]
+
+
+# The trackers registered by type.
+_trackers: Dict[type, Optional[Tracker]] = {}
+# The tracker resolved for each builtin type seen (`None` for values returned as they are), and for the
+# other types, held weakly so that the cache does not keep classes such as generated models alive.
+_dispatch: Dict[type, Optional[Tracker]] = {}
+_class_dispatch: WeakKeyDictionary[type, Optional[Tracker]] = WeakKeyDictionary()
+# Set in the flags of types created at runtime, by class statements or `type()`.
+_HEAPTYPE = 1 << 9
+
+
+def register_tracker(
+    type_: type, wrap: Optional[Callable[[Any], Any]], wrap_lazily: Optional[Callable[[Any], Any]] = None
+) -> None:
+    """
+    Make values of `type_`, and of its subclasses without a tracker of their own, trackable when
+    they are nested in tracked containers.
+
+    `wrap(value)` returns a `TrackedObject` holding the content of `value`, whose own children are
+    made trackable with `TrackedObject.make_nested_trackable(child, result)`. `wrap_lazily(value)`
+    (`wrap` by default) is used by lazy containers and leaves the children as they are. A `wrap`
+    of `None` leaves the values of `type_` as they are.
+    """
+    _trackers[type_] = None if wrap is None else Tracker(wrap, wrap_lazily or wrap)
+    _clear_dispatch()
+
+
+def tracker_of(type_: type) -> Optional[Tracker]:
+    """Return the tracker of the values of `type_`, the one of its nearest registered base, or `None`."""
+    if (tracker := _dispatch.get(type_, _MISSING)) is not _MISSING:
+        return tracker
+    if (tracker := _class_dispatch.get(type_, _MISSING)) is not _MISSING:
+        return tracker
+    tracker = next((_trackers[base] for base in type_.__mro__ if base in _trackers), _MISSING)
+    if tracker is _MISSING:
+        # dataclasses share no base class
+        tracker = _dataclass_tracker if dataclasses.is_dataclass(type_) else None
+    if tracker is not None and _frozen(type_):
+        tracker = None
+    if type_.__flags__ & _HEAPTYPE:
+        _class_dispatch[type_] = tracker
+    else:
+        # builtin and extension types live as long as the process anyway
+        _dispatch[type_] = tracker
+    return tracker
+
+
+def _frozen(type_: type) -> bool:
+    # instances of frozen dataclasses and structs cannot change, they are left as they are
+    if dataclasses.is_dataclass(type_):
+        return type_.__dataclass_params__.frozen  # type: ignore[attr-defined]
+    config = getattr(type_, '__struct_config__', None)
+    return config is not None and config.frozen
+
+
+def _clear_dispatch() -> None:
+    _dispatch.clear()
+    _class_dispatch.clear()
+
+
+# Types of values `set_paths` and `delete_paths` may step into.
+_CONTAINER_TYPES: Tuple[type, ...] = (dict, list, set)
+if pydantic is not None:
+    _CONTAINER_TYPES += (pydantic.BaseModel,)
+
+
+def needs_wrapping(val: Any) -> bool:
+    """Whether `val` is a container that has not been made trackable yet."""
+    if (tracker := _dispatch.get(type(val), _MISSING)) is _MISSING:
+        tracker = tracker_of(type(val))
+    return tracker is not None and not isinstance(val, TrackedObject)
+
+
 class TrackedList(List[_T], TrackedObject):
+    __slots__ = ('_parent_ref', '_parent_key', '__weakref__')
+
     def __reduce_ex__(self, proto: SupportsIndex) -> Tuple[type, Tuple[List[int]]]:
         return (self.__class__, (list(self),))
 
@@ -83,9 +711,17 @@ class TrackedList(List[_T], TrackedObject):
 
     def __setitem__(self, index: SupportsIndex | slice, value: _T | Iterable[_T]) -> None:
         """Detect list set events and emit change events."""
-
-        super().__setitem__(index, TrackedObject.make_nested_trackable(value, self))
-        self.changed()
+        if isinstance(index, slice):
+            value = [TrackedObject.make_nested_trackable(v, self) for v in cast(Iterable[_T], value)]
+            size = len(self)
+            super().__setitem__(index, value)  # type: ignore
+            if len(self) == size:
+                self.changed(*range(size)[index])
+            else:
+                self.changed()
+        else:
+            super().__setitem__(index, TrackedObject.make_nested_trackable(value, self))
+            self.changed(range(len(self))[index])
 
     def __delitem__(self, index: SupportsIndex | slice) -> None:
         """Detect list del events and emit change events."""
@@ -99,14 +735,15 @@ class TrackedList(List[_T], TrackedObject):
 
     def append(self, x: _T) -> None:
         super().append(TrackedObject.make_nested_trackable(x, self))
-        self.changed()
+        self.changed(index := len(self) - 1, added=(index,))
 
     def extend(self, x: Iterable[_T]) -> None:
-        super().extend(x)
-        self.changed()
+        size = len(self)
+        super().extend(TrackedObject.make_nested_trackable(v, self) for v in x)
+        self.changed(*(indexes := range(size, len(self))), added=indexes)
 
     def __iadd__(self, x: Iterable[_T]) -> Self:  # type: ignore
-        self.extend(TrackedObject.make_nested_trackable(v, self) for v in x)
+        self.extend(x)
         return self
 
     def insert(self, i: SupportsIndex, x: _T) -> None:
@@ -131,10 +768,16 @@ class TrackedList(List[_T], TrackedObject):
 
 
 class TrackedDict(TrackedObject, Dict[_KT, _VT]):
+    __slots__ = ('_parent_ref', '_parent_key', '__weakref__')
+
+    def __reduce_ex__(self, proto: SupportsIndex) -> Tuple[type, Tuple[Dict[_KT, _VT]]]:
+        return (self.__class__, (dict(self),))
+
     def __setitem__(self, key: _KT, value: _VT) -> None:
         """Detect dictionary set events and emit change events."""
-        super().__setitem__(key, value)
-        self.changed()
+        added = () if key in self else (key,)
+        super().__setitem__(key, TrackedObject.make_nested_trackable(value, self))
+        self.changed(key, added=added)
 
     if TYPE_CHECKING:
         # from https://github.com/python/mypy/issues/14858
@@ -150,20 +793,21 @@ class TrackedDict(TrackedObject, Dict[_KT, _VT]):
     else:
 
         def setdefault(self, key, value=None):  # noqa: F811
-            result = super().setdefault(key, value=TrackedObject.make_nested_trackable(value, self))
-            self.changed()
+            added = () if key in self else (key,)
+            result = super().setdefault(key, TrackedObject.make_nested_trackable(value, self))
+            self.changed(key, added=added)
             return result
 
     def __delitem__(self, key: _KT) -> None:
         """Detect dictionary del events and emit change events."""
         super().__delitem__(key)
-        self.changed()
+        self.changed(key)
 
     def update(self, *a: Any, **kw: _VT) -> None:
-        a = tuple(TrackedObject.make_nested_trackable(e, self) for e in a)
-        kw = {k: TrackedObject.make_nested_trackable(v, self) for k, v in kw.items()}
-        super().update(*a, **kw)
-        self.changed()
+        items = dict(*a, **kw)
+        added = [key for key in items if key not in self]
+        super().update((k, TrackedObject.make_nested_trackable(v, self)) for k, v in items.items())
+        self.changed(*items, added=added)
 
     if TYPE_CHECKING:
 
@@ -178,43 +822,463 @@ class TrackedDict(TrackedObject, Dict[_KT, _VT]):
     else:
 
         def pop(self, *arg):  # noqa: F811
+            size = len(self)
             result = super().pop(*arg)
-            self.changed()
+            # popping a missing key with a default changes nothing
+            if len(self) != size:
+                self.changed(arg[0])
             return result
 
     def popitem(self) -> Tuple[_KT, _VT]:
         result = super().popitem()
-        self.changed()
+        self.changed(result[0])
         return result
 
     def clear(self) -> None:
         super().clear()
         self.changed()
 
+    # needed for backwards compatibility with
+    # older pickles
     def __setstate__(self, state: Union[Dict[str, int], Dict[str, str]]) -> None:
         self.update(state)
 
 
+class TrackedSet(TrackedObject, Set[_T]):
+    """
+    A set that tracks changes to itself. Changes are only propagated when they add or remove
+    members, so e.g. adding a tag that is already there does not mark the row as modified.
+    """
+
+    # sets are weakly referenceable already
+    __slots__ = ('_parent_ref', '_parent_key')
+
+    def __reduce_ex__(self, proto: SupportsIndex) -> Tuple[type, Tuple[Set[_T]]]:
+        return (self.__class__, (set(self),))
+
+    def _changed_from(self, size: int) -> None:
+        # only ever adding or only ever removing members changes the size whenever it changes the set
+        if len(self) != size:
+            self.changed()
+
+    def add(self, value: _T) -> None:
+        size = len(self)
+        super().add(value)
+        self._changed_from(size)
+
+    def discard(self, value: _T) -> None:
+        size = len(self)
+        super().discard(value)
+        self._changed_from(size)
+
+    def remove(self, value: _T) -> None:
+        super().remove(value)
+        self.changed()
+
+    def pop(self) -> _T:
+        result = super().pop()
+        self.changed()
+        return result
+
+    def clear(self) -> None:
+        size = len(self)
+        super().clear()
+        self._changed_from(size)
+
+    def update(self, *s: Iterable[_T]) -> None:
+        size = len(self)
+        super().update(*s)
+        self._changed_from(size)
+
+    def difference_update(self, *s: Iterable[Any]) -> None:
+        size = len(self)
+        super().difference_update(*s)
+        self._changed_from(size)
+
+    def intersection_update(self, *s: Iterable[Any]) -> None:
+        size = len(self)
+        super().intersection_update(*s)
+        self._changed_from(size)
+
+    def symmetric_difference_update(self, s: Iterable[_T]) -> None:
+        # every member of `s` is either added or removed
+        members = set(s)
+        super().symmetric_difference_update(members)
+        if members:
+            self.changed()
+
+    def __ior__(self, s: AbstractSet[_T]) -> Self:  # type: ignore[override]
+        self.update(s)
+        return self
+
+    def __isub__(self, s: AbstractSet[Any]) -> Self:
+        self.difference_update(s)
+        return self
+
+    def __iand__(self, s: AbstractSet[Any]) -> Self:
+        self.intersection_update(s)
+        return self
+
+    def __ixor__(self, s: AbstractSet[_T]) -> Self:  # type: ignore[override]
+        self.symmetric_difference_update(s)
+        return self
+
+
+class LazyTrackedList(TrackedList[_T]):
+    """
+    A `TrackedList` whose nested containers are made trackable when they are first read.
+
+    Every method handing out items makes them trackable first: the untracked ones may be shared
+    with other rows, see `interning`.
+    """
+
+    __slots__ = ()
+    _lazy = True
+
+    def _wrap_all(self) -> None:
+        for i, value in enumerate(list.__iter__(self)):
+            if needs_wrapping(value):
+                list.__setitem__(self, i, TrackedObject.make_nested_trackable(value, self))
+
+    @overload
+    def __getitem__(self, index: SupportsIndex) -> _T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[_T]: ...
+
+    def __getitem__(self, index: SupportsIndex | slice) -> _T | List[_T]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = super().__getitem__(index)
+        if needs_wrapping(value):
+            value = TrackedObject.make_nested_trackable(value, self)
+            list.__setitem__(self, index, value)
+        return value
+
+    def __iter__(self) -> Iterator[_T]:
+        self._wrap_all()
+        return super().__iter__()
+
+    def __reversed__(self) -> Iterator[_T]:
+        self._wrap_all()
+        return super().__reversed__()
+
+    def pop(self, *arg: SupportsIndex) -> _T:
+        if -len(self) <= (index := operator.index(arg[0]) if arg else -1) < len(self):
+            self[index]
+        return super().pop(*arg)
+
+    def copy(self) -> List[_T]:
+        self._wrap_all()
+        return super().copy()
+
+    def __add__(self, x: List[_T]) -> List[_T]:  # type: ignore[override]
+        self._wrap_all()
+        return super().__add__(x)
+
+
+class LazyTrackedDict(TrackedDict[_KT, _VT]):
+    """
+    A `TrackedDict` whose nested containers are made trackable when they are first read.
+
+    Every method handing out values makes them trackable first, as `LazyTrackedList` does.
+    """
+
+    __slots__ = ()
+    _lazy = True
+
+    def _wrap_all(self) -> None:
+        for key, value in [(k, v) for k, v in dict.items(self) if needs_wrapping(v)]:
+            dict.__setitem__(self, key, TrackedObject.make_nested_trackable(value, self))
+
+    def __getitem__(self, key: _KT) -> _VT:
+        value = super().__getitem__(key)
+        if needs_wrapping(value):
+            value = TrackedObject.make_nested_trackable(value, self)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key: _KT, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    if not TYPE_CHECKING:
+
+        def setdefault(self, key, value=None):  # noqa: F811
+            if key in self:
+                return self[key]
+            return super().setdefault(key, value)
+
+        def pop(self, key, *default):  # noqa: F811
+            if key in self:
+                self[key]
+            return super().pop(key, *default)
+
+    def popitem(self) -> Tuple[_KT, _VT]:
+        if self:
+            # the last inserted item, which `dict.popitem` removes
+            self[next(reversed(self))]
+        return super().popitem()
+
+    def copy(self) -> Dict[_KT, _VT]:
+        self._wrap_all()
+        return super().copy()
+
+    def __or__(self, other: Any) -> Any:
+        self._wrap_all()
+        return super().__or__(other)
+
+    def values(self) -> ValuesView[_VT]:
+        self._wrap_all()
+        return super().values()
+
+    def items(self) -> ItemsView[_KT, _VT]:
+        self._wrap_all()
+        return super().items()
+
+
+@cache
+def dataclass_fields(dataclass_cls: type) -> Tuple[str, ...]:
+    """Return the names of the fields of `dataclass_cls`, leaving out its class and init-only variables."""
+    return tuple(field.name for field in dataclasses.fields(dataclass_cls))
+
+
+class TrackedFields(TrackedObject):
+    """
+    Base of the tracked objects holding their values in fields rather than in a `__dict__`:
+    dataclasses (`TrackedDataclass`) and msgspec structs (`TrackedStruct`).
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    @abc.abstractmethod
+    def _field_names(cls) -> Tuple[str, ...]:
+        """Return the names of the fields of the class."""
+
+    @staticmethod
+    @abc.abstractmethod
+    def _same_kind(other: Any) -> bool:
+        """Return whether `other` is of the kind of object (dataclass, struct) of the class."""
+
+    def _set_field(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+
+    def _track_fields(self) -> None:
+        """Set up tracking on an instance whose fields were set without `__setattr__`."""
+        set_field = self._set_field
+        for name in self._field_names():
+            if (new_value := TrackedObject.make_nested_trackable(value := getattr(self, name), self)) is not value:
+                set_field(name, new_value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if needs_wrapping(value):
+            value = TrackedObject.make_nested_trackable(value, self)
+        self._set_field(name, value)
+        if name in self._field_names():
+            self.changed(name)
+
+    def __eq__(self, other: Any) -> bool:
+        # a tracked copy is equal to the instance it was made from
+        if not self._same_kind(other) or not (isinstance(self, type(other)) or isinstance(other, type(self))):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._field_names())
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class TrackedDataclass(TrackedFields):
+    """
+    A dataclass instance that tracks changes to its fields and their children.
+
+    Nothing is validated: assigned values are only made trackable. Nested dataclasses are copied
+    to a generated subclass mixing this class in, see `tracked_dataclass_class`.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def _field_names(cls) -> Tuple[str, ...]:
+        return dataclass_fields(cls)
+
+    _same_kind = staticmethod(dataclasses.is_dataclass)
+
+
+_CONTAINER_TYPES += (TrackedDataclass,)
+
+
+if msgspec is not None:
+
+    class TrackedStruct(TrackedFields):
+        """
+        A msgspec `Struct` instance that tracks changes to its fields and their children.
+
+        Like `TrackedDataclass` nothing is validated on assignment. Nested structs are copied to a
+        generated subclass mixing this class in, see `tracked_struct_class`.
+        """
+
+        __slots__ = ()
+
+        @classmethod
+        def _field_names(cls) -> Tuple[str, ...]:
+            return cls.__struct_fields__  # type: ignore[attr-defined]
+
+        @staticmethod
+        def _same_kind(other: Any) -> bool:
+            return isinstance(other, msgspec.Struct)
+
+        def _set_field(self, name: str, value: Any) -> None:
+            # structs refuse `object.__setattr__`
+            msgspec.structs.force_setattr(self, name, value)
+
+        def _track_fields(self) -> None:
+            set_field = msgspec.structs.force_setattr
+            wrap = TrackedObject.make_nested_trackable
+            for name in self.__struct_fields__:  # type: ignore[attr-defined]
+                if (new_value := wrap(value := getattr(self, name), self)) is not value:
+                    set_field(self, name, new_value)
+
+        # The `__post_init__` of the struct itself, which runs once its fields are tracked.
+        _struct_post_init: ClassVar[Optional[Callable[[Any], None]]] = None
+
+        def __init_subclass__(cls, **kwargs: Any) -> None:
+            super().__init_subclass__(**kwargs)
+            post_init = cls.__dict__.get('__post_init__')
+            if post_init is not None and post_init is not TrackedStruct.__post_init__:
+                # moved aside, so that tracking does not depend on it calling `super().__post_init__()`
+                type.__setattr__(cls, '_struct_post_init', post_init)
+                type.__setattr__(cls, '__post_init__', TrackedStruct.__post_init__)
+
+        def __post_init__(self) -> None:
+            # called by msgspec once an instance is built, decoded or converted
+            self._track_fields()
+            if (post_init := type(self)._struct_post_init) is not None:
+                post_init(self)
+
+    _CONTAINER_TYPES += (TrackedStruct,)
+
+elif not TYPE_CHECKING:
+
+    class TrackedStruct(TrackedFields):
+        def __new__(cls, *a, **k):
+            raise RuntimeError("msgspec is not installed!")
+
+
 if pydantic is not None:
 
     class TrackedPydanticBaseModel(TrackedObject, Mutable, pydantic.BaseModel):
+        __slots__ = ('_parent_ref', '_parent_key')
+
         @classmethod
         def coerce(cls, key, value):
             return value if isinstance(value, cls) else cls.model_validate(value)
 
         def __init__(self, **data):
             super().__init__(**data)
-            for field in self.model_fields.keys():
-                setattr(self, field, TrackedObject.make_nested_trackable(getattr(self, field), self))
+            self._track_fields()
+
+        def _track_fields(self):
+            """Set up tracking on a freshly built instance, also one made by `model_construct`."""
+            object.__setattr__(self, '_parent_ref', None)
+            if self._lazy:
+                return
+            values = self.__dict__
+            for field in type(self).model_fields.keys():
+                values[field] = TrackedObject.make_nested_trackable(values[field], self)
 
         def __setattr__(self, name, value):
             prev_value = getattr(self, name, None)
             super().__setattr__(name, value)
+            values = self.__dict__
+            if name in values and needs_wrapping(new_value := values[name]):
+                values[name] = TrackedObject.make_nested_trackable(new_value, self)
             if prev_value != getattr(self, name):
-                self.changed()
+                self.changed(name)
+
+    class LazyTrackedPydanticBaseModel(TrackedPydanticBaseModel):
+        """
+        A `TrackedPydanticBaseModel` whose nested fields are made trackable when they are first read.
+        """
+
+        _lazy: ClassVar[bool] = True
+
+        def __getattribute__(self, name: str) -> Any:
+            value = super().__getattribute__(name)
+            if needs_wrapping(value) and name in type(self).model_fields:
+                value = TrackedObject.make_nested_trackable(value, self)
+                super().__getattribute__('__dict__')[name] = value
+            return value
+
+        def __iter__(self) -> Iterator[Tuple[str, Any]]:
+            # fields are handed out trackable, as `LazyTrackedList` items are
+            for name, _ in super().__iter__():
+                yield name, getattr(self, name)
 
 elif not TYPE_CHECKING:
 
     class TrackedPydanticBaseModel:
         def __new__(cls, *a, **k):
             raise RuntimeError("pydantic is not installed!")
+
+    class LazyTrackedPydanticBaseModel:
+        def __new__(cls, *a, **k):
+            raise RuntimeError("pydantic is not installed!")
+
+
+def _track_dict(val: Dict[Any, Any]) -> TrackedDict:
+    new_val: TrackedDict = TrackedDict()
+    dict.update(new_val, ((k, TrackedObject.make_nested_trackable(v, new_val)) for k, v in val.items()))
+    return new_val
+
+
+def _track_list(val: List[Any]) -> TrackedList:
+    new_val: TrackedList = TrackedList()
+    list.extend(new_val, (TrackedObject.make_nested_trackable(o, new_val) for o in val))
+    return new_val
+
+
+def _construct_model(model_cls: Any, val: Any) -> Any:
+    # `val` is valid already, so its fields (and extra fields) are copied over rather than validated again
+    new_val = model_cls.model_construct(val.model_fields_set, **val.__dict__)
+    if val.__pydantic_extra__ is not None:
+        object.__setattr__(new_val, '__pydantic_extra__', dict(val.__pydantic_extra__))
+    return new_val
+
+
+def _track_model(val: Any) -> Any:
+    new_val = _construct_model(tracked_model_class(val.__class__), val)
+    new_val._track_fields()
+    return new_val
+
+
+def _track_model_lazily(val: Any) -> Any:
+    return _construct_model(tracked_model_class(val.__class__, lazy=True), val)
+
+
+def _track_dataclass(val: Any) -> Any:
+    new_val = object.__new__(tracked_dataclass_class(type(val)))
+    for name in dataclass_fields(type(val)):
+        object.__setattr__(new_val, name, getattr(val, name))
+    new_val._track_fields()
+    return new_val
+
+
+def _track_struct(val: Any) -> Any:
+    # fields are tracked by `TrackedStruct.__post_init__`
+    return tracked_struct_class(type(val))(**msgspec.structs.asdict(val))
+
+
+# Used for dataclasses without a tracker registered for them or their bases.
+_dataclass_tracker = Tracker(_track_dataclass, _track_dataclass)
+
+register_tracker(dict, _track_dict, LazyTrackedDict)
+register_tracker(list, _track_list, LazyTrackedList)
+# set members are hashable, so there is nothing to wrap below them
+register_tracker(set, TrackedSet)
+if pydantic is not None:
+    register_tracker(pydantic.BaseModel, _track_model, _track_model_lazily)
+    # already tracked models are adopted as they are
+    register_tracker(TrackedPydanticBaseModel, lambda val: val)
+register_tracker(TrackedDataclass, lambda val: val)
+if msgspec is not None:
+    register_tracker(msgspec.Struct, _track_struct)
+    register_tracker(TrackedStruct, lambda val: val)
@@ -0,0 +1,143 @@
+# Build tracked pydantic models from trusted data without validating it.
+#
+# Values read back from a column were validated when they were written, so `trusted_constructor`
+# rebuilds them with `model_construct`, following the field annotations to construct nested models
+# (as their tracked classes) inside lists, dicts and optionals. Leaves that JSON cannot represent
+# natively (datetimes, enums, UUIDs, ...) are still converted, by a cached `TypeAdapter`.
+from __future__ import annotations
+
+from functools import cache
+from types import UnionType
+from typing import Annotated
+from typing import Any
+from typing import Callable
+from typing import cast
+from typing import get_args
+from typing import get_origin
+from typing import Literal
+from typing import Optional
+from typing import Union
+
+from ._compat import pydantic
+from .trackable import tracked_model_class
+from .trackable import TrackedObject
+
+# A conversion applied to a decoded JSON value, `None` when the value is used as-is.
+_Converter = Optional[Callable[[Any], Any]]
+
+# Annotations whose values come out of a JSON decoder in their final form.
+_JSON_NATIVE = (Any, object, str, int, float, bool, type(None), dict, list)
+
+
+def trusted_constructor(model_cls: type) -> Callable[[Any], Any]:
+    """
+    Return a function building a tracked `model_cls` from decoded JSON without validating it.
+
+    `model_cls` is the class values are loaded as, i.e. a `TrackedPydanticBaseModel`. Nested models
+    are constructed as their tracked classes, or as they are if `model_cls` wraps them lazily.
+    """
+    return cast(Callable[[Any], Any], _converter(model_cls, model_cls._lazy))
+
+
+@cache
+def _converter(annotation: Any, lazy: bool) -> _Converter:
+    if annotation in _JSON_NATIVE:
+        return None
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin is Annotated:
+        return _converter(args[0], lazy)
+    if origin is Literal:
+        return None
+    if origin is Union or origin is UnionType:
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) == 1:
+            return _optional(_converter(options[0], lazy))
+        if all(_converter(arg, lazy) is None for arg in options):
+            return None
+    elif isinstance(annotation, type) and issubclass(annotation, pydantic.BaseModel):
+        return _model_converter(annotation, lazy)
+    elif origin is list and len(args) == 1:
+        return _list_converter(_converter(args[0], lazy))
+    elif origin is dict and len(args) == 2 and args[0] is str:
+        return _dict_converter(_converter(args[1], lazy))
+    elif origin in (list, dict) and not args:
+        return None
+    return pydantic.TypeAdapter(annotation).validate_python
+
+
+def _optional(converter: _Converter) -> _Converter:
+    if converter is None:
+        return None
+    return lambda value: None if value is None else converter(value)
+
+
+def _list_converter(item: _Converter) -> _Converter:
+    if item is None:
+        return None
+    return lambda value: [item(v) for v in value]
+
+
+def _dict_converter(item: _Converter) -> _Converter:
+    if item is None:
+        return None
+    return lambda value: {k: item(v) for k, v in value.items()}
+
+
+def _model_converter(model_cls: type, lazy: bool) -> _Converter:
+    tracked = issubclass(model_cls, TrackedObject)
+    if tracked:
+        # the fields of a tracked model are wrapped the way its own class does it
+        lazy = model_cls._lazy
+    # lazily tracking parents wrap plain nested models when they are read, which keeps them linked to the parent
+    target = model_cls if tracked or lazy else tracked_model_class(model_cls)
+    construct = _constructor(target)
+    # resolved on first use, so that self-referencing models do not recurse here
+    fields: list[tuple[str, Callable[[Any], Any]]] | None = None
+
+    def convert(value: Any) -> Any:
+        nonlocal fields
+        if not isinstance(value, dict):
+            return value
+        if fields is None:
+            fields = [
+                (name, converter)
+                for name, info in target.model_fields.items()
+                if (converter := _converter(info.annotation, lazy)) is not None
+            ]
+        # `value` was freshly decoded, so it is converted in place
+        for name, converter in fields:
+            if (field_value := value.get(name)) is not None:
+                value[name] = converter(field_value)
+        instance = construct(value)
+        if tracked or not lazy:
+            instance._track_fields()
+        return instance
+
+    return convert
+
+
+def _constructor(model_cls: type) -> Callable[[dict], Any]:
+    """
+    Return a function doing `model_cls.model_construct(**values)`, with a shortcut for values holding
+    exactly the fields of the model, which is what dumping a model writes.
+    """
+    model_construct = model_cls.model_construct
+    if model_cls.__private_attributes__ or model_cls.model_post_init is not pydantic.BaseModel.model_post_init:
+        return lambda values: model_construct(**values)
+    names = model_cls.model_fields.keys()
+    new = object.__new__
+    setattr_ = object.__setattr__
+
+    def construct(values: dict) -> Any:
+        if values.keys() != names:
+            # defaults to fill in, or extra entries to drop
+            return model_construct(**values)
+        instance = new(model_cls)
+        setattr_(instance, '__dict__', values)
+        setattr_(instance, '__pydantic_fields_set__', set(values))
+        setattr_(instance, '__pydantic_extra__', None)
+        setattr_(instance, '__pydantic_private__', None)
+        return instance
+
+    return construct
@@ -0,0 +1,106 @@
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import bulk
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable._compat import pydantic
+from sqlalchemyv2_nested_mutable.bulk import bulk_load
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        street: str
+        city: str
+
+    preferred: AddressItem
+    home: List[AddressItem] = []
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    addresses: Mapped[Optional[Addresses]] = mapped_column(Addresses.as_mutable(), nullable=True)
+    work: Mapped[Optional[Addresses]] = mapped_column(Addresses.as_mutable(validate_json=True), nullable=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def users(session: Session):
+    session.add_all([
+        User(
+            name=f"user{i}",
+            addresses={"preferred": {"street": f"bar{i}", "city": "baz"}, "home": [{"street": "a", "city": "b"}]},
+            **({"work": {"preferred": {"street": "qux", "city": "quux"}}} if i % 2 else {}),
+        )
+        for i in range(5)
+    ])
+    session.commit()
+    session.expunge_all()
+
+
+def test_bulk_load_validates_values(session: Session, users):
+
+    # Act
+    loaded = bulk_load(session, sa.select(User).order_by(User.id), chunk_size=2)
+
+    # Assert
+    assert [u.name for u in loaded] == [f"user{i}" for i in range(5)]
+    assert all(isinstance(u.addresses, Addresses) for u in loaded)
+    assert loaded[3].addresses.preferred.street == "bar3"
+    assert isinstance(loaded[3].addresses.home[0], Addresses.AddressItem)
+    assert isinstance(loaded[1].work, Addresses)
+    assert loaded[0].work is None
+    assert not session.dirty
+
+
+def test_bulk_load_tracks_changes(session: Session, users):
+
+    # Arrange
+    user = bulk_load(session, sa.select(User).where(User.name == "user1"))[0]
+
+    # Act
+    assert user.addresses is not None and user.work is not None
+    user.addresses.home[0].city = "qux"
+    user.work.preferred.street = "corge"
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert user.addresses.home[0].city == "qux"
+    assert user.work.preferred.street == "corge"
+
+
+def test_bulk_load_validates_each_chunk_as_fetched(session: Session, users, monkeypatch):
+
+    # Arrange
+    batches = []
+
+    def validate(values):
+        batches.append(len(values))
+        validate_chunk(values)
+
+    validate_chunk = bulk.validate
+    monkeypatch.setattr(bulk, "validate", validate)
+
+    # Act
+    loaded = bulk_load(session, sa.select(User).order_by(User.id), chunk_size=2)
+
+    # Assert - two `addresses` values a chunk, and the `work` values of odd rows
+    assert batches == [3, 3, 1]
+    assert all(isinstance(u.addresses, Addresses) for u in loaded)
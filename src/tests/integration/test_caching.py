@@ -0,0 +1,111 @@
+from datetime import date
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import caching
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable import TrackedDict
+from sqlalchemyv2_nested_mutable._compat import pydantic
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        street: str
+        city: str
+
+    preferred: Optional[AddressItem] = None
+    home: List[AddressItem] = []
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[MutableDict] = mapped_column(
+        MutableDict.as_mutable(JSONB(), partial_updates=True), default=MutableDict
+    )
+    addresses: Mapped[Optional[Addresses]] = mapped_column(Addresses.as_mutable(JSONB()), nullable=True)
+    history: Mapped[Optional[MutableDict]] = mapped_column(MutableDict.as_mutable(sa.PickleType()), nullable=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def user1(session: Session):
+    user = User(
+        name="foo",
+        settings={"theme": {"colors": ["red", "blue"]}, "lang": "en"},
+        addresses={"preferred": {"street": "bar", "city": "baz"}, "home": [{"street": "bar1", "city": "baz"}]},
+        history={"joined": date(2024, 1, 1)},
+    )
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    session.expunge(user)
+    return user
+
+
+def test_cached_object_restores_tracked_values(session: Session, user1: User):
+
+    # Arrange
+    cached = caching.dumps(user1)
+
+    # Act
+    user = session.merge(caching.loads(cached), load=False)
+    user.settings["theme"]["colors"].append("green")
+    user.addresses.home[0].city = "qux"
+    session.commit()
+
+    # Assert
+    session.refresh(user)
+    assert user.settings == {"theme": {"colors": ["red", "blue", "green"]}, "lang": "en"}
+    assert user.addresses.home[0].city == "qux"
+
+
+def test_cached_values_are_wrapped_lazily(user1: User):
+
+    # Act
+    user = caching.loads(caching.dumps(user1))
+
+    # Assert
+    assert type(dict.__getitem__(user.settings, "theme")) is dict
+    assert isinstance(user.settings["theme"], TrackedDict)
+    assert user.addresses.preferred.city == "baz"
+
+
+def test_cached_values_are_stored_as_json(user1: User):
+
+    # Act
+    cached = caching.dumps(user1)
+
+    # Assert
+    assert user1.addresses.model_dump_json().encode() in cached
+    # generated classes are not referenced
+    assert b"TrackedAddressItem" not in cached
+    assert b"Journaled" not in cached
+
+
+def test_values_of_other_columns_are_pickled_as_usual(user1: User):
+
+    # Act
+    user = caching.loads(caching.dumps(user1))
+
+    # Assert
+    assert user.history == {"joined": date(2024, 1, 1)}
+    assert isinstance(user.history, MutableDict)
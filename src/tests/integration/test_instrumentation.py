@@ -0,0 +1,138 @@
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import instrumentation
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable._compat import pydantic
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        street: str
+        city: str
+
+    home: List[AddressItem] = []
+
+
+# shared by two columns
+AddressesType = Addresses.as_mutable()
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[MutableDict] = mapped_column(MutableDict.as_mutable(JSONB()), default=MutableDict)
+    addresses: Mapped[Optional[Addresses]] = mapped_column(AddressesType, nullable=True)
+    previous: Mapped[Optional[Addresses]] = mapped_column(AddressesType, nullable=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def recorder():
+    yield instrumentation.enable()
+    instrumentation.disable()
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(
+        name="foo",
+        settings={"theme": {"colors": ["red", {"accent": "blue"}]}},
+        addresses={"home": [{"street": "bar", "city": "baz"}]},
+    )
+
+
+def test_instrumentation_counts_per_column(session: Session, user1: User, recorder: instrumentation.Recorder):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+    session.expire_all()
+    instrumentation.reset()
+
+    # Act
+    user1.settings["theme"]["colors"][1]["accent"] = "green"
+    assert user1.addresses is not None
+    user1.addresses.home[0].city = "qux"
+    session.commit()
+
+    # Assert
+    columns = instrumentation.metrics()["columns"]
+    assert columns["User.settings"]["nodes_wrapped"] == 3
+    assert columns["User.settings"]["changes"] == 1
+    assert columns["User.settings"]["change_hops"] == 3
+    assert columns["User.addresses"]["changes"] == 1
+    assert columns["User.addresses"]["change_hops"] == 2
+    assert columns["User.addresses"]["binds"] == 1
+    assert columns["User.addresses"]["results"] == 1
+
+
+def test_instrumentation_attributes_shared_type_per_column(
+    session: Session, user1: User, recorder: instrumentation.Recorder
+):
+
+    # Arrange
+    user1.previous = {"home": [{"street": "old", "city": "town"}]}
+    session.add(user1)
+    session.commit()
+    session.expire_all()
+    instrumentation.reset()
+
+    # Act
+    assert user1.addresses is not None and user1.previous is not None
+    user1.previous.home[0].city = "village"
+    session.commit()
+
+    # Assert - both values are loaded, only the changed one is written
+    columns = instrumentation.metrics()["columns"]
+    assert columns["User.addresses"]["results"] == 1
+    assert columns["User.addresses"]["binds"] == 0
+    assert columns["User.previous"]["results"] == 1
+    assert columns["User.previous"]["binds"] == 1
+    assert columns["User.previous"]["changes"] == 1
+
+
+def test_instrumentation_calls_listeners(session: Session, user1: User, recorder: instrumentation.Recorder):
+
+    # Arrange
+    measurements = []
+    instrumentation.add_listener(lambda column, metric, value: measurements.append((column, metric)))
+
+    # Act
+    session.add(user1)
+    user1.settings["theme"] = "dark"
+    session.commit()
+
+    # Assert
+    assert ("User.settings", "change_hops") in measurements
+    assert ("User.addresses", "bind_time") in measurements
+
+
+def test_instrumentation_disabled_records_nothing(session: Session, user1: User):
+
+    # Act
+    session.add(user1)
+    user1.settings["theme"] = "dark"
+    session.commit()
+
+    # Assert
+    assert instrumentation.recorder is None
+    assert instrumentation.metrics()["columns"] == {}
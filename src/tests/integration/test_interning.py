@@ -0,0 +1,125 @@
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutableList
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable._compat import pydantic
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        street: str
+        city: str
+
+    preferred: Optional[AddressItem] = None
+    home: List[AddressItem] = []
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[MutableDict] = mapped_column(MutableDict.as_mutable(JSONB(), intern_size=8), default=MutableDict)
+    schedule: Mapped[MutableList] = mapped_column(MutableList.as_mutable(JSONB(), intern_size=8), default=MutableList)
+    addresses: Mapped[Optional[Addresses]] = mapped_column(Addresses.as_mutable(JSONB(), intern_size=8), nullable=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def users():
+    return [
+        User(
+            name=f"foo{i}",
+            settings={"theme": {"colors": ["red", {"accent": "blue"}]}},
+            schedule=[["meeting", "launch"], {"day": "tue"}],
+            addresses={"preferred": {"street": "bar", "city": "baz"}, "home": [{"street": "bar1", "city": "baz"}]},
+        )
+        for i in range(3)
+    ]
+
+
+def test_interning_shares_identical_documents(session: Session, users: List[User]):
+
+    # Arrange
+    session.add_all(users)
+    session.commit()
+    session.expire_all()
+    cache = User.__table__.c.settings.type.intern_cache
+    cache.cache_clear()
+
+    # Act
+    settings = [u.settings for u in users]
+
+    # Assert
+    assert cache.cache_info().misses == 1
+    assert cache.cache_info().hits == 2
+    assert settings[0] is not settings[1]
+    assert settings[0] == settings[1] == {"theme": {"colors": ["red", {"accent": "blue"}]}}
+
+
+def test_interning_copies_on_write(session: Session, users: List[User]):
+
+    # Arrange
+    session.add_all(users)
+    session.commit()
+    session.expire_all()
+    u1, u2, _ = users
+
+    # Act
+    u1.settings["theme"]["colors"][1]["accent"] = "green"
+    u1.schedule[0].append("review")
+    assert u1.addresses is not None
+    u1.addresses.home[0].city = "qux"
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert u1.settings == {"theme": {"colors": ["red", {"accent": "green"}]}}
+    assert u2.settings == {"theme": {"colors": ["red", {"accent": "blue"}]}}
+    assert u1.schedule == [["meeting", "launch", "review"], {"day": "tue"}]
+    assert u2.schedule == [["meeting", "launch"], {"day": "tue"}]
+    assert u1.addresses is not None and u2.addresses is not None
+    assert u1.addresses.home[0].city == "qux"
+    assert u2.addresses.home[0].city == "baz"
+
+
+def test_interning_hands_out_copies_only(session: Session, users: List[User]):
+
+    # Arrange
+    session.add_all(users)
+    session.commit()
+    session.expire_all()
+    u1, u2, u3 = users
+
+    # Act - values taken out of one row are not the documents the other rows share
+    u1.settings.pop("theme")["colors"].append("green")
+    u1.schedule.pop()["day"] = "wed"
+    u1.schedule.copy()[0].append("review")
+    assert u1.addresses is not None
+    u1.addresses.home.pop(0).city = "qux"
+    dict(u1.addresses)["preferred"].city = "qux"
+    session.rollback()
+
+    # Assert
+    assert u2.settings == {"theme": {"colors": ["red", {"accent": "blue"}]}}
+    assert u2.schedule == [["meeting", "launch"], {"day": "tue"}]
+    assert u3.addresses is not None
+    assert u3.addresses.home[0].city == "baz"
+    assert u3.addresses.preferred is not None and u3.addresses.preferred.city == "baz"
@@ -0,0 +1,178 @@
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutableList
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable import outbox
+from sqlalchemyv2_nested_mutable._compat import pydantic
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        street: str
+        city: str
+
+    preferred: Optional[AddressItem] = None
+    home: List[AddressItem] = []
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[MutableDict] = mapped_column(MutableDict.as_mutable(JSONB(), patches=True), default=MutableDict)
+    schedule: Mapped[MutableList] = mapped_column(MutableList.as_mutable(JSONB()), default=MutableList)
+    addresses: Mapped[Optional[Addresses]] = mapped_column(
+        Addresses.as_mutable(JSONB(), partial_updates=True), nullable=True
+    )
+    notes: Mapped[Optional[dict]] = mapped_column(MutableDict.as_mutable(JSONB(), tracking="snapshot"), nullable=True)
+
+
+patch_outbox = outbox.outbox_table(Base.metadata)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function", autouse=True)
+def outbox_enabled():
+    outbox.enable(patch_outbox)
+    yield
+    outbox.disable()
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(
+        name="foo",
+        settings={"theme": {"colors": ["red", {"accent": "blue"}]}, "lang": "en", "a/b": 1},
+        schedule=[["meeting", "launch"], {"day": "tue"}],
+        addresses={"preferred": {"street": "bar", "city": "baz"}, "home": [{"street": "bar1", "city": "baz"}]},
+    )
+
+
+def test_pending_patch_of_nested_changes(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.settings["theme"]["colors"][1]["accent"] = "green"
+    user1.settings["theme"]["colors"].append("black")
+    user1.settings["font"] = "mono"
+    user1.settings["tmp"] = 1
+    del user1.settings["tmp"]
+    del user1.settings["lang"]
+    user1.settings["a/b"] = 2
+    user1.addresses.home.append(Addresses.AddressItem(street="bar2", city="qux"))
+
+    # Assert
+    assert user1.settings.pending_patch() == [
+        {"op": "replace", "path": "/theme/colors/1/accent", "value": "green"},
+        {"op": "add", "path": "/theme/colors/2", "value": "black"},
+        {"op": "add", "path": "/font", "value": "mono"},
+        {"op": "remove", "path": "/lang"},
+        {"op": "replace", "path": "/a~1b", "value": 2},
+    ]
+    assert user1.addresses.home.pending_patch() == [
+        {"op": "add", "path": "/home/1", "value": {"street": "bar2", "city": "qux"}}
+    ]
+    # not journaled, the whole value is replaced
+    assert user1.schedule.pending_patch() == [
+        {"op": "replace", "path": "", "value": [["meeting", "launch"], {"day": "tue"}]}
+    ]
+
+
+def test_pending_patch_is_reset_by_flush(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+    user1.settings["lang"] = "fr"
+
+    # Act
+    session.flush()
+
+    # Assert
+    assert user1.settings.pending_patch() == []
+    user1.settings["theme"] = {}
+    assert user1.settings.pending_patch() == [{"op": "replace", "path": "/theme", "value": {}}]
+
+
+def test_outbox_records_patches_in_the_flush(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.settings["lang"] = "fr"
+    user1.addresses.preferred.city = "qux"
+    user1.name = "bar"
+    session.commit()
+
+    # Assert
+    rows = session.execute(sa.select(patch_outbox).order_by(patch_outbox.c.id)).all()
+    assert [(row.table_name, row.row_id, row.column_name) for row in rows] == [
+        ("user_account", [user1.id], "settings"),
+        ("user_account", [user1.id], "schedule"),
+        ("user_account", [user1.id], "addresses"),
+        ("user_account", [user1.id], "settings"),
+        ("user_account", [user1.id], "addresses"),
+    ]
+    settings = {"theme": {"colors": ["red", {"accent": "blue"}]}, "lang": "en", "a/b": 1}
+    assert rows[0].patch == [{"op": "replace", "path": "", "value": settings}]
+    assert rows[3].patch == [{"op": "replace", "path": "/lang", "value": "fr"}]
+    assert rows[4].patch == [{"op": "replace", "path": "/preferred/city", "value": "qux"}]
+    session.refresh(user1)
+    assert user1.addresses.preferred.city == "qux"
+
+
+def test_outbox_is_rolled_back_with_the_flush(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+    count = session.scalar(sa.select(sa.func.count()).select_from(patch_outbox))
+    user1.settings["lang"] = "fr"
+    session.flush()
+
+    # Act
+    session.rollback()
+
+    # Assert
+    assert session.scalar(sa.select(sa.func.count()).select_from(patch_outbox)) == count
+
+
+def test_outbox_records_snapshot_tracked_columns(session: Session, user1: User):
+
+    # Arrange
+    user1.notes = {"todo": ["call"]}
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.notes["todo"].append("write")
+    session.commit()
+
+    # Assert
+    rows = session.execute(sa.select(patch_outbox).order_by(patch_outbox.c.id.desc()).limit(1)).all()
+    assert [(row.column_name, row.patch) for row in rows] == [
+        ("notes", [{"op": "replace", "path": "", "value": {"todo": ["call", "write"]}}])
+    ]
@@ -0,0 +1,113 @@
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+from sqlalchemyv2_nested_mutable import json_path_indexes
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable._compat import pydantic
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        street: str
+        city: str
+        floor: int = 0
+
+    preferred: AddressItem
+    home: Optional[AddressItem] = None
+    others: List[AddressItem] = []
+    tags: List[str] = []
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    addresses: Mapped[Optional[Addresses]] = mapped_column(Addresses.as_mutable(), nullable=True)
+
+
+indexes = json_path_indexes(User.addresses, "preferred.city", "preferred.floor")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def users(session: Session):
+    session.add_all([
+        User(
+            name="foo",
+            addresses={
+                "preferred": {"street": "bar", "city": "baz", "floor": 3},
+                "others": [{"street": "qux", "city": "quux", "floor": 7}],
+                "tags": ["work"],
+            },
+        ),
+        User(name="bar", addresses={"preferred": {"street": "baz", "city": "qux", "floor": 1}}),
+    ])
+    session.commit()
+
+
+def names(session: Session, criterion) -> List[str]:
+    return session.scalars(sa.select(User.name).where(criterion).order_by(User.name)).all()
+
+
+def test_json_path_equality_uses_containment(session: Session, users):
+
+    # Act
+    criterion = User.addresses.preferred.city == "baz"
+
+    # Assert
+    assert "@>" in str(criterion.compile(dialect=postgresql.dialect()))
+    assert names(session, criterion) == ["foo"]
+    assert names(session, User.addresses.preferred.city != "baz") == ["bar"]
+    assert names(session, User.addresses.others.city == "quux") == ["foo"]
+    assert names(session, User.addresses.tags.contains("work")) == ["foo"]
+
+
+def test_json_path_ordering_comparisons(session: Session, users):
+
+    # Act
+    criterion = User.addresses.others.floor > 5
+
+    # Assert
+    assert "jsonb_path_exists" in str(criterion.compile(dialect=postgresql.dialect()))
+    assert names(session, criterion) == ["foo"]
+    assert names(session, User.addresses.preferred.floor >= 1) == ["bar", "foo"]
+    assert names(session, User.addresses.preferred.floor < 3) == ["bar"]
+    assert names(session, User.addresses.others[0].city == "quux") == ["foo"]
+
+
+def test_json_path_unknown_field():
+    with pytest.raises(AttributeError):
+        User.addresses.preferred.country
+
+
+def test_json_path_indexes():
+
+    # Act
+    ddl = [str(CreateIndex(index).compile(dialect=postgresql.dialect())) for index in indexes]
+
+    # Assert
+    assert ddl == [
+        "CREATE INDEX ix_user_account_addresses_path_ops ON user_account USING gin (addresses jsonb_path_ops)",
+        "CREATE INDEX ix_user_account_addresses_preferred_city ON user_account ((addresses #>> '{preferred, city}'))",
+        (
+            "CREATE INDEX ix_user_account_addresses_preferred_floor "
+            "ON user_account (CAST(addresses #>> '{preferred, floor}' AS BIGINT))"
+        ),
+    ]
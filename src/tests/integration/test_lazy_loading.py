@@ -0,0 +1,184 @@
+import pickle
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutableList
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable import TrackedDict
+from sqlalchemyv2_nested_mutable import TrackedList
+from sqlalchemyv2_nested_mutable import TrackedPydanticBaseModel
+from sqlalchemyv2_nested_mutable._compat import pydantic
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        street: str
+        city: str
+
+    preferred: Optional[AddressItem] = None
+    home: List[AddressItem] = []
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[MutableDict] = mapped_column(MutableDict.as_mutable(JSONB(), lazy=True), default=MutableDict)
+    schedule: Mapped[MutableList] = mapped_column(MutableList.as_mutable(JSONB(), lazy=True), default=MutableList)
+    addresses: Mapped[Optional[Addresses]] = mapped_column(Addresses.as_mutable(JSONB(), lazy=True), nullable=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(
+        name="foo",
+        settings={"theme": {"colors": ["red", {"accent": "blue"}]}},
+        schedule=[["meeting", "launch"], {"day": "tue"}],
+        addresses={"preferred": {"street": "bar", "city": "baz"}, "home": [{"street": "bar1", "city": "baz"}]},
+    )
+
+
+def test_lazy_load_keeps_children_unwrapped(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+
+    # Act
+    session.add(u)
+    session.commit()
+
+    # Assert - nothing below the top level has been read yet
+    assert type(dict.__getitem__(u.settings, "theme")) is dict
+    assert type(list.__getitem__(u.schedule, 0)) is list
+    assert u.addresses is not None
+    assert not isinstance(u.addresses.__dict__["preferred"], TrackedPydanticBaseModel)
+
+
+def test_lazy_load_wraps_on_access(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+
+    # Act
+    theme = u.settings["theme"]
+    first, second = u.schedule
+    assert u.addresses is not None
+    preferred = u.addresses.preferred
+
+    # Assert
+    assert isinstance(theme, TrackedDict)
+    assert isinstance(theme["colors"], TrackedList)
+    assert isinstance(first, TrackedList)
+    assert isinstance(second, TrackedDict)
+    assert isinstance(preferred, Addresses.AddressItem)
+    assert isinstance(preferred, TrackedPydanticBaseModel)
+
+
+def test_lazy_load_deep_change(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+
+    # Act
+    u.settings["theme"]["colors"][1]["accent"] = "green"
+    u.schedule[0].append("dinner")
+    assert u.addresses is not None
+    u.addresses.home[0].street = "bar2"
+    session.commit()
+
+    # Assert
+    assert u.settings == {"theme": {"colors": ["red", {"accent": "green"}]}}
+    assert u.schedule == [["meeting", "launch", "dinner"], {"day": "tue"}]
+    assert u.addresses.home[0].model_dump() == {"street": "bar2", "city": "baz"}
+
+
+def test_lazy_load_change_through_iteration(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+
+    # Act
+    for value in u.settings.values():
+        value["font"] = "mono"
+    session.commit()
+
+    # Assert
+    assert u.settings["theme"]["font"] == "mono"
+
+
+def test_lazy_setdefault_of_existing_key(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+
+    # Act
+    theme = u.settings.setdefault("theme", {})
+    unchanged = u not in session.dirty
+    u.settings.setdefault("lang", "en")
+
+    # Assert
+    assert isinstance(theme, TrackedDict)
+    assert unchanged
+    assert u in session.dirty
+
+
+def test_lazy_value_shared_between_rows(session: Session, user1: User):
+
+    # Arrange
+    user2 = User(name="bar", settings={"a": {"b": 1}})
+    session.add_all([user1, user2])
+    session.commit()
+    user1.settings["x"] = user2.settings["a"]
+    session.flush()
+
+    # Act
+    user2.settings["a"]["b"] = 99
+    session.commit()
+
+    # Assert
+    session.expire_all()
+    assert user1.settings["x"] == {"b": 1}
+    assert user2.settings["a"] == {"b": 99}
+
+
+def test_lazy_values_pickle_round_trip(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+    session.expire_all()
+    values = [user1.settings, user1.schedule, user1.addresses]
+
+    # Act
+    restored = [pickle.loads(pickle.dumps(value)) for value in values]
+
+    # Assert
+    assert [type(value) for value in restored] == [type(value) for value in values]
+    assert restored == values
+    assert restored[0]["theme"]["colors"][1] == {"accent": "blue"}
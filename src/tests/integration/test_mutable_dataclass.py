@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDataclass
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import TrackedDataclass
+from sqlalchemyv2_nested_mutable import TrackedList
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+@dataclass(slots=True)
+class Address:
+    street: str
+    city: str
+
+
+@dataclass(slots=True)
+class Profile(MutableDataclass):
+    nickname: str
+    preferred: Optional[Address] = None
+    others: List[Address] = field(default_factory=list)
+    labels: Dict[str, Address] = field(default_factory=dict)
+    tags: Set[str] = field(default_factory=set)
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    profile: Mapped[Optional[Profile]] = mapped_column(Profile.as_mutable(JSONB()), nullable=True)
+    settings: Mapped[MutableDict] = mapped_column(
+        MutableDict.as_mutable(JSONB(), serializer="orjson"), default=MutableDict
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(name="foo", profile=Profile(nickname="f", preferred=Address("bar", "baz"), tags={"b", "a"}))
+
+
+def test_mutable_dataclass(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.profile.preferred.city = "qux"
+    user1.profile.others.append(Address("bar1", "baz1"))
+    user1.profile.labels["work"] = Address("bar2", "baz2")
+    user1.profile.tags.add("c")
+    session.commit()
+
+    # Assert
+    session.refresh(user1)
+    assert isinstance(user1.profile, Profile)
+    assert isinstance(user1.profile.preferred, TrackedDataclass)
+    assert isinstance(user1.profile.others, TrackedList)
+    assert user1.profile.preferred == Address("bar", "qux")
+    assert user1.profile.others == [Address("bar1", "baz1")]
+    assert user1.profile.labels == {"work": Address("bar2", "baz2")}
+    assert user1.profile.tags == {"a", "b", "c"}
+    stored = session.scalar(sa.select(sa.cast(User.profile, sa.String)).where(User.id == user1.id))
+    assert '"tags": ["a", "b", "c"]' in stored
+
+
+def test_mutable_dataclass_from_document(session: Session):
+
+    # Arrange
+    user = User(name="foo", profile={"nickname": "f", "others": [{"street": "bar", "city": "baz"}]})
+
+    # Act
+    session.add(user)
+    session.commit()
+
+    # Assert
+    session.refresh(user)
+    assert user.profile.nickname == "f"
+    assert user.profile.preferred is None
+    assert user.profile.others[0].city == "baz"
+
+
+def test_nested_dataclass_in_dict(session: Session, user1: User):
+
+    # Arrange
+    user1.settings = {"home": Address("bar", "baz")}
+    session.add(user1)
+    session.flush()
+
+    # Act
+    user1.settings["home"].city = "qux"
+
+    # Assert
+    assert user1 in session.dirty
+    assert user1.settings["home"] == Address("bar", "qux")
+    assert not hasattr(user1.settings["home"], "__dict__")
+
+
+def test_mutable_dataclass_set_paths(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    assert user1.profile is not None
+    user1.profile.set_paths({"nickname": "g", "preferred.city": "qux", "labels/work": Address("bar2", "baz2")})
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert user1.profile.nickname == "g"
+    assert user1.profile.preferred == Address("bar", "qux")
+    assert user1.profile.labels == {"work": Address("bar2", "baz2")}
+    user1.profile.set_paths({"labels.work.city": "quux"})
+    assert user1 in session.dirty
+
+
+def test_mutable_dataclass_delete_paths(session: Session, user1: User):
+
+    # Arrange
+    assert user1.profile is not None
+    user1.profile.others.extend([Address("bar1", "baz1"), Address("bar2", "baz2")])
+    user1.profile.labels["work"] = Address("bar3", "baz3")
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.profile.delete_paths("others/0", "labels.work")
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert user1.profile.others == [Address("bar2", "baz2")]
+    assert user1.profile.labels == {}
+    with pytest.raises(TypeError):
+        user1.profile.delete_paths("nickname")
+    with pytest.raises(AttributeError):
+        user1.profile.set_paths({"preferred.country": "fr"})
@@ -1,3 +1,5 @@
+import gc
+
 import pytest
 import sqlalchemy as sa
 from sqlalchemy.dialects.postgresql import JSONB
@@ -173,3 +175,166 @@ def test_mutable_dict_mixed_with_list_deep_changes(session: Session, user2: User
         {"label": "secret0", "address": "789 Moon Street"},
         {"label": "secret1", "address": "791 Moon Street"},
     ]
+
+
+def test_mutable_dict_batch(session: Session, user2: User):
+
+    # Arrange
+    u = user2
+    session.add(u)
+    session.commit()
+
+    # Act - nested batches only flag the attribute once the outermost one exits
+    with u.addresses.batch() as addresses:
+        with addresses["others"].batch():
+            addresses["others"].append({"label": "secret1", "address": "790 Moon Street"})
+        addresses["work"] = "457 Wall Street"
+        assert not sa.inspect(u).attrs.addresses.history.has_changes()
+    session.commit()
+
+    # Assert
+    assert u.addresses["work"] == "457 Wall Street"
+    assert len(u.addresses["others"]) == 2
+
+
+def test_mutable_dict_batch_with_exception(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+
+    # Act - changes made before the exception are still flagged
+    with pytest.raises(ValueError):
+        with u.addresses.batch():
+            u.addresses["home"]["city"] = "Boston"
+            raise ValueError()
+    session.commit()
+
+    # Assert
+    assert u.addresses["home"]["city"] == "Boston"
+
+
+def test_mutable_dict_change_after_reparenting(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+
+    # Act - a value moved to another container reports its changes through its new parent
+    u.addresses["previous"] = {"home": u.addresses.pop("home")}
+    session.flush()
+    moved = u.addresses["previous"]["home"]
+    moved["city"] = "Boston"
+    reaches_root = moved.tracked_root() is u.addresses
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert reaches_root
+    assert "home" not in u.addresses
+    assert u.addresses["previous"] == {"home": {"street": "123 Main Street", "city": "Boston"}}
+
+
+def test_mutable_dict_change_through_weak_parent_links(session: Session, user2: User):
+
+    # Arrange
+    u = user2
+    session.add(u)
+    session.commit()
+    other = u.addresses["others"][0]
+
+    # Act - parents are only referenced weakly by their children, and kept alive by the root
+    gc.collect()
+    other["label"] = "secret1"
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert u.addresses["others"] == [{"label": "secret1", "address": "789 Moon Street"}]
+
+
+def test_mutable_dict_change_after_parent_collected(session: Session, user2: User):
+
+    # Arrange
+    u = user2
+    session.add(u)
+    session.commit()
+    other = u.addresses["others"][0]
+
+    # Act - a value whose parent was collected no longer reaches the root
+    del u.addresses["others"]
+    session.commit()
+    gc.collect()
+    other["label"] = "secret1"
+
+    # Assert
+    assert other.tracked_parent() is None
+    assert not session.dirty
+    assert "others" not in u.addresses
+
+
+def test_mutable_dict_flags_again_after_flush_and_rollback(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+
+    # Act - every flush cycle flags the first change again
+    u.addresses["home"]["city"] = "Boston"
+    u.addresses["home"]["street"] = "1 Beacon Street"
+    session.flush()
+    u.addresses["work"] = "457 Wall Street"
+    flagged_after_flush = sa.inspect(u).attrs.addresses.history.has_changes()
+    session.rollback()
+    u.addresses["work"] = "458 Wall Street"
+    session.commit()
+
+    # Assert
+    assert flagged_after_flush
+    assert u.addresses["home"] == {"street": "123 Main Street", "city": "New York"}
+    assert u.addresses["work"] == "458 Wall Street"
+
+
+def test_mutable_dict_set_paths(session: Session, user2: User):
+
+    # Arrange
+    u = user2
+    session.add(u)
+    session.commit()
+    modified = []
+
+    def on_modified(target, initiator):
+        modified.append(initiator)
+
+    # Act
+    sa.event.listen(User.addresses, "modified", on_modified)
+    u.addresses.set_paths({"home.city": "Boston", "others/0/label": "secret1", ("office", "floor"): 3})
+    sa.event.remove(User.addresses, "modified", on_modified)
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert len(modified) == 1
+    assert u.addresses["home"]["city"] == "Boston"
+    assert u.addresses["others"][0]["label"] == "secret1"
+    assert u.addresses["office"] == {"floor": 3}
+    assert isinstance(u.addresses["office"], TrackedDict)
+
+
+def test_mutable_dict_delete_paths(session: Session, user2: User):
+
+    # Arrange
+    u = user2
+    session.add(u)
+    session.commit()
+
+    # Act
+    u.addresses.delete_paths("home.street", "work", "others/0")
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert u.addresses == {"home": {"city": "New York"}, "others": []}
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import Session
 from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable import tracked_model_cache_info
 from sqlalchemyv2_nested_mutable import TrackedList
 from sqlalchemyv2_nested_mutable import TrackedPydanticBaseModel
 from sqlalchemyv2_nested_mutable._compat import pydantic
@@ -24,10 +25,16 @@ class Addresses(MutablePydanticBaseModel):
         city: str
         area: Optional[str] = None
 
+    class Note(pydantic.BaseModel):
+        model_config = pydantic.ConfigDict(extra="allow")
+
+        text: str
+
     preferred: Optional[AddressItem] = None
     work: List[AddressItem] = []
     home: List[AddressItem] = []
     updated_time: Optional[str] = None
+    note: Optional[Note] = None
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -146,3 +153,87 @@ def test_mutable_pydantic_type_deep_pop(session: Session, user1: User):
     assert u.addresses.home[0].model_dump(exclude_none=True) == {"street": "bar1", "city": "baz"}
     assert u.addresses.home[1].model_dump(exclude_none=True) == {"street": "bar2", "city": "baz"}
     assert len(u.addresses.home) == 2
+
+
+def test_mutable_pydantic_type_reuses_tracked_class(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    assert u.addresses is not None
+    for i in range(3):
+        u.addresses.home.append(Addresses.AddressItem.model_validate({"street": f"bar{i}", "city": "baz"}))
+    session.add(u)
+    session.commit()
+    misses = tracked_model_cache_info().misses
+
+    # Act - reload all nested items
+    session.expire(u)
+    assert u.addresses is not None
+    items = [u.addresses.preferred, *u.addresses.home]
+
+    # Assert - one class for all items, and no new class created on reload
+    assert len({type(item) for item in items}) == 1
+    assert tracked_model_cache_info().misses == misses
+
+
+def test_mutable_pydantic_type_batch(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+    assert u.addresses is not None
+
+    # Act
+    with u.addresses.batch():
+        for i in range(3):
+            u.addresses.home.append(Addresses.AddressItem.model_validate({"street": f"bar{i}", "city": "baz"}))
+        u.addresses.updated_time = "now"
+        assert not sa.inspect(u).attrs.addresses.history.has_changes()
+    session.commit()
+
+    # Assert
+    assert u.addresses.updated_time == "now"
+    assert [item.street for item in u.addresses.home] == ["bar0", "bar1", "bar2"]
+
+
+def test_mutable_pydantic_type_set_paths(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+    assert u.addresses is not None
+    u.addresses.home.append(Addresses.AddressItem.model_validate({"street": "bar0", "city": "baz"}))
+    session.commit()
+
+    # Act
+    u.addresses.set_paths({"preferred.city": "qux", "home/0/area": "north", "updated_time": "now"})
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert u.addresses.preferred is not None
+    assert u.addresses.preferred.city == "qux"
+    assert u.addresses.home[0].area == "north"
+    assert u.addresses.updated_time == "now"
+
+
+def test_mutable_pydantic_type_keeps_extra_fields(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+
+    # Act
+    assert u.addresses is not None
+    u.addresses.note = Addresses.Note(text="x", zip="123")
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert u.addresses.note is not None
+    assert u.addresses.note.model_dump() == {"text": "x", "zip": "123"}
+    u.addresses.note.text = "y"
+    assert u.addresses.note.model_extra == {"zip": "123"}
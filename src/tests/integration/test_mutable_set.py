@@ -0,0 +1,128 @@
+from typing import Optional
+from typing import Set
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable import MutableSet
+from sqlalchemyv2_nested_mutable import TrackedSet
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Permissions(MutablePydanticBaseModel):
+    granted: Set[str] = set()
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    tags: Mapped[MutableSet] = mapped_column(MutableSet.as_mutable(JSONB()), default=MutableSet)
+    settings: Mapped[MutableDict] = mapped_column(
+        MutableDict.as_mutable(JSONB(), serializer="orjson"), default=MutableDict
+    )
+    permissions: Mapped[Optional[Permissions]] = mapped_column(
+        Permissions.as_mutable(JSONB(), serializer="pydantic"), nullable=True
+    )
+    # encoded by the default serializer
+    preferences: Mapped[MutableDict] = mapped_column(MutableDict.as_mutable(JSONB()), default=MutableDict)
+    grants: Mapped[Optional[Permissions]] = mapped_column(Permissions.as_mutable(JSONB()), nullable=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(name="foo", tags={"b", "a"}, settings={"roles": {"admin"}}, permissions={"granted": {"read"}})
+
+
+def test_mutable_set(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.tags.add("c")
+    user1.tags.discard("a")
+    user1.tags -= {"b"}
+    user1.tags |= {"d", "e"}
+    session.commit()
+
+    # Assert
+    session.refresh(user1)
+    assert isinstance(user1.tags, MutableSet)
+    assert user1.tags == {"c", "d", "e"}
+    stored = session.scalar(sa.select(sa.cast(User.tags, sa.String)).where(User.id == user1.id))
+    assert stored.replace(" ", "") == '["c","d","e"]'
+
+
+def test_mutable_set_ignores_unchanged_members(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.tags.add("a")
+    user1.tags.discard("z")
+    user1.tags.update({"b"})
+
+    # Assert
+    assert user1 not in session.dirty
+
+
+def test_nested_sets(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.flush()
+
+    # Act
+    user1.settings["roles"].add("editor")
+    user1.permissions.granted.add("write")
+    session.commit()
+
+    # Assert
+    session.refresh(user1)
+    # JSON has no sets, the members are stored as a sorted array
+    assert user1.settings["roles"] == ["admin", "editor"]
+    assert isinstance(user1.permissions.granted, TrackedSet)
+    assert user1.permissions.granted == {"read", "write"}
+
+
+def test_nested_sets_with_default_serializer(session: Session, user1: User):
+
+    # Arrange
+    user1.preferences = {"roles": {"b", "a"}}
+    user1.grants = Permissions(granted={"read"})
+    session.add(user1)
+    session.flush()
+
+    # Act
+    user1.preferences["roles"].add("c")
+    user1.grants.granted.add("write")
+    session.commit()
+
+    # Assert
+    session.refresh(user1)
+    assert user1.preferences["roles"] == ["a", "b", "c"]
+    assert user1.grants.granted == {"read", "write"}
+
+
+def test_mutable_set_rejects_other_types(session: Session, user1: User):
+    with pytest.raises(ValueError):
+        user1.tags = "abc"
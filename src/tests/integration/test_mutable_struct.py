@@ -0,0 +1,162 @@
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import msgspec
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutableStruct
+from sqlalchemyv2_nested_mutable import TrackedList
+from sqlalchemyv2_nested_mutable import TrackedStruct
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(msgspec.Struct):
+    sku: str
+    quantity: int = 1
+
+
+class Price(msgspec.Struct, frozen=True):
+    amount: int
+    currency: str
+
+
+class Order(MutableStruct):
+    customer: str
+    items: List[Item] = []
+    by_sku: Dict[str, Item] = {}
+    total: Optional[Price] = None
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    order: Mapped[Optional[Order]] = mapped_column(Order.as_mutable(JSONB()), nullable=True)
+    settings: Mapped[MutableDict] = mapped_column(
+        MutableDict.as_mutable(JSONB(), serializer="msgspec"), default=MutableDict
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(name="foo", order=Order(customer="f", items=[Item("a")], total=Price(10, "EUR")))
+
+
+def test_mutable_struct(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.order.items[0].quantity = 2
+    user1.order.items.append(Item("b"))
+    user1.order.by_sku["c"] = Item("c", 3)
+    session.commit()
+
+    # Assert
+    session.refresh(user1)
+    assert isinstance(user1.order, Order)
+    assert isinstance(user1.order.items, TrackedList)
+    assert isinstance(user1.order.items[0], TrackedStruct)
+    assert user1.order.items == [Item("a", 2), Item("b")]
+    assert user1.order.by_sku == {"c": Item("c", 3)}
+    # frozen structs cannot change, they are not tracked
+    assert type(user1.order.total) is Price
+
+
+def test_mutable_struct_from_document(session: Session):
+
+    # Arrange
+    user = User(name="foo", order={"customer": "f", "items": [{"sku": "a"}]})
+
+    # Act
+    session.add(user)
+    session.commit()
+
+    # Assert
+    session.refresh(user)
+    assert user.order.customer == "f"
+    assert user.order.items == [Item("a")]
+    stored = session.scalar(sa.select(sa.cast(User.order, sa.String)).where(User.id == user.id))
+    assert '"items":[{"sku":"a","quantity":1}]' in stored.replace(" ", "")
+
+
+def test_mutable_struct_rejects_invalid_document():
+    with pytest.raises(msgspec.ValidationError):
+        User(name="foo", order={"customer": "f", "items": [{"quantity": 1}]})
+
+
+def test_nested_struct_in_dict(session: Session, user1: User):
+
+    # Arrange
+    user1.settings = {"item": Item("a")}
+    session.add(user1)
+    session.flush()
+
+    # Act
+    user1.settings["item"].quantity = 5
+
+    # Assert
+    assert user1 in session.dirty
+    assert user1.settings["item"] == Item("a", 5)
+
+
+def test_mutable_struct_set_paths(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    assert user1.order is not None
+    user1.order.set_paths({"customer": "g", "items/0/quantity": 4, "by_sku.c": Item("c", 3)})
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert user1.order.customer == "g"
+    assert user1.order.items == [Item("a", 4)]
+    assert user1.order.by_sku == {"c": Item("c", 3)}
+    user1.order.set_paths({"by_sku.c.quantity": 5})
+    assert user1 in session.dirty
+    assert isinstance(user1.order.by_sku["c"], TrackedStruct)
+
+
+def test_mutable_struct_delete_paths(session: Session, user1: User):
+
+    # Arrange
+    assert user1.order is not None
+    user1.order.items.append(Item("b"))
+    user1.order.by_sku["c"] = Item("c")
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.order.delete_paths("items/0", "by_sku.c")
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert user1.order.items == [Item("b")]
+    assert user1.order.by_sku == {}
+    with pytest.raises(TypeError):
+        user1.order.delete_paths("customer")
+    with pytest.raises(TypeError):
+        user1.order.set_paths({"total.amount": 20})
@@ -0,0 +1,191 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable import offload
+from sqlalchemyv2_nested_mutable._compat import pydantic
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        street: str
+        city: str
+
+    home: List[AddressItem] = []
+
+
+class AsyncSessionAdapter:
+    """The part of `AsyncSession` used by the offload helpers, over a `Session` as no async driver is installed."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def scalars(self, statement, params=None, **kw):
+        return self.session.scalars(statement, params, **kw)
+
+    async def stream_scalars(self, statement, params=None, **kw):
+        return AsyncScalarResultAdapter(self.session.scalars(statement, params, **kw))
+
+
+class AsyncScalarResultAdapter:
+    def __init__(self, result):
+        self.result = result
+
+    async def fetchmany(self, size):
+        return self.result.fetchmany(size)
+
+    async def close(self):
+        self.result.close()
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[MutableDict] = mapped_column(
+        MutableDict.as_mutable(JSONB(), offload_size=64), default=MutableDict
+    )
+    addresses: Mapped[Optional[Addresses]] = mapped_column(Addresses.as_mutable(offload_size=64), nullable=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def users(session: Session):
+    session.add_all([
+        User(
+            name="foo",
+            settings={"theme": {"colors": ["red", {"accent": "blue"}]}, "notes": "x" * 100},
+            addresses={"home": [{"street": "bar" * 30, "city": "baz"}]},
+        ),
+        User(name="bar", settings={"theme": "dark"}, addresses={"home": []}),
+    ])
+    session.commit()
+    session.expunge_all()
+
+
+async def test_offload_defers_large_values(session: Session, users):
+
+    # Arrange
+    with offload.deferred():
+        foo, bar = session.scalars(sa.select(User).order_by(User.name.desc())).all()
+    assert isinstance(foo.settings, offload.PendingValue)
+    assert isinstance(foo.addresses, offload.PendingValue)
+    assert isinstance(bar.settings, MutableDict)
+
+    # Act
+    with ThreadPoolExecutor(2) as executor:
+        await offload.hydrate([foo, bar], executor)
+
+    # Assert
+    assert isinstance(foo.settings, MutableDict)
+    assert foo.settings["theme"]["colors"][1] == {"accent": "blue"}
+    assert isinstance(foo.addresses, Addresses)
+    assert isinstance(foo.addresses.home[0], Addresses.AddressItem)
+    assert not session.dirty
+
+
+async def test_offload_hydrated_values_track_changes(session: Session, users):
+
+    # Arrange
+    with offload.deferred():
+        foo = session.scalars(sa.select(User).where(User.name == "foo")).one()
+    await offload.hydrate([foo])
+
+    # Act
+    foo.settings["theme"]["colors"][1]["accent"] = "green"
+    assert foo.addresses is not None
+    foo.addresses.home[0].city = "qux"
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert foo.settings["theme"]["colors"][1]["accent"] == "green"
+    assert foo.addresses.home[0].city == "qux"
+
+
+def test_offload_loads_inline_by_default(session: Session, users):
+
+    # Act
+    foo = session.scalars(sa.select(User).where(User.name == "foo")).one()
+
+    # Assert
+    assert isinstance(foo.settings, MutableDict)
+    assert isinstance(foo.addresses, Addresses)
+
+
+def test_offload_pending_values_validate_once(session: Session, users):
+
+    # Act
+    with offload.deferred():
+        foo = session.scalars(sa.select(User).where(User.name == "foo")).one()
+    pending = foo.__dict__["addresses"]
+
+    # Assert
+    # the text is only decoded, the model is validated by `resolve`
+    assert pending.load(pending.raw) == {"home": [{"street": "bar" * 30, "city": "baz"}]}
+    assert isinstance(pending(), Addresses)
+
+
+async def test_offload_hydrates_in_process_pool(session: Session, users):
+
+    # Arrange
+    with offload.deferred():
+        foo = session.scalars(sa.select(User).where(User.name == "foo")).one()
+
+    # Act
+    with ProcessPoolExecutor(1) as executor:
+        await offload.hydrate([foo], executor)
+
+    # Assert
+    assert isinstance(foo.settings, MutableDict)
+    assert foo.settings["notes"] == "x" * 100
+    assert isinstance(foo.addresses, Addresses)
+    assert foo.addresses.home[0].city == "baz"
+
+
+async def test_offload_scalars(session: Session, users):
+
+    # Act
+    foo, bar = await offload.scalars(AsyncSessionAdapter(session), sa.select(User).order_by(User.name.desc()))
+
+    # Assert
+    assert isinstance(foo.settings, MutableDict)
+    assert isinstance(foo.addresses, Addresses)
+    assert foo.settings["theme"]["colors"][1] == {"accent": "blue"}
+    assert bar.settings == {"theme": "dark"}
+
+
+async def test_offload_stream_scalars(session: Session, users):
+
+    # Act
+    users = [
+        user
+        async for user in offload.stream_scalars(
+            AsyncSessionAdapter(session), sa.select(User).order_by(User.name), batch_size=1
+        )
+    ]
+
+    # Assert
+    assert [user.name for user in users] == ["bar", "foo"]
+    assert all(isinstance(user.settings, MutableDict) for user in users)
+    assert isinstance(users[1].addresses, Addresses)
+    assert not session.dirty
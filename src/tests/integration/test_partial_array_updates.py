@@ -0,0 +1,116 @@
+from typing import List
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import Connection
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableList
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    aliases: Mapped[MutableList[str]] = mapped_column(
+        MutableList[str].as_mutable(ARRAY(sa.String(128)), partial_updates=True), default=MutableList[str]
+    )
+    schedule: Mapped[MutableList[List[str]]] = mapped_column(
+        MutableList[List[str]].as_mutable(ARRAY(sa.String(128), dimensions=2), partial_updates=True),
+        default=MutableList[List[str]],
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(
+        name="foo",
+        aliases=["a", "b", "c", "d"],
+        schedule=[["meeting", "launch"], ["training", "presentation"]],
+    )
+
+
+@pytest.fixture(scope="function")
+def updates(connection: Connection):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            statements.append(statement)
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(connection, "before_cursor_execute", before_cursor_execute)
+
+
+def reload(session: Session, user: User) -> User:
+    session.commit()
+    session.expire_all()
+    return session.get(User, user.id)
+
+
+def test_partial_update_of_array_elements(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.aliases[0] = "x"
+    user1.aliases[2:4] = ["y", "z"]
+    user1.schedule[1][0] = "lunch"
+    u = reload(session, user1)
+
+    # Assert
+    assert len(updates) == 2
+    assert "aliases[" in updates[0] and "schedule[" in updates[1]
+    assert u.aliases == ["x", "b", "y", "z"]
+    assert u.schedule == [["meeting", "launch"], ["lunch", "presentation"]]
+
+
+def test_partial_update_of_array_appends(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.aliases.append("e")
+    user1.schedule.append(["standup", "review"])
+    u = reload(session, user1)
+
+    # Assert
+    assert len(updates) == 2
+    assert "array_append" in updates[0] and "array_cat" in updates[1]
+    assert u.aliases == ["a", "b", "c", "d", "e"]
+    assert u.schedule == [["meeting", "launch"], ["training", "presentation"], ["standup", "review"]]
+
+
+def test_partial_update_of_array_falls_back_to_full_rewrite(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.aliases.reverse()
+    u = reload(session, user1)
+
+    # Assert
+    assert len(updates) == 1
+    assert "aliases=%(aliases)s" in updates[0]
+    assert u.aliases == ["d", "c", "b", "a"]
@@ -0,0 +1,251 @@
+import pickle
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import Connection
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutableList
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable._compat import pydantic
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        street: str
+        city: str
+
+    preferred: Optional[AddressItem] = None
+    home: List[AddressItem] = []
+
+
+class JSONDocument(sa.types.TypeDecorator):
+    impl = JSONB
+    cache_ok = True
+
+
+class Document(sa.types.TypeDecorator):
+    impl = JSONDocument
+    cache_ok = True
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[MutableDict] = mapped_column(
+        MutableDict.as_mutable(JSONB(), partial_updates=True, journal_limit=3), default=MutableDict
+    )
+    schedule: Mapped[MutableList] = mapped_column(
+        MutableList.as_mutable(JSONB(), partial_updates=True), default=MutableList
+    )
+    addresses: Mapped[Optional[Addresses]] = mapped_column(
+        Addresses.as_mutable(JSONB(), partial_updates=True), nullable=True
+    )
+    profile: Mapped[MutableDict] = mapped_column(
+        MutableDict.as_mutable(Document(), partial_updates=True), default=MutableDict
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(
+        name="foo",
+        settings={"theme": {"colors": ["red", {"accent": "blue"}]}, "lang": "en"},
+        schedule=[["meeting", "launch"], {"day": "tue"}],
+        addresses={"preferred": {"street": "bar", "city": "baz"}, "home": [{"street": "bar1", "city": "baz"}]},
+    )
+
+
+@pytest.fixture(scope="function")
+def updates(connection: Connection):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            statements.append(statement)
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(connection, "before_cursor_execute", before_cursor_execute)
+
+
+def reload(session: Session, user: User) -> User:
+    session.commit()
+    session.expire_all()
+    return session.get(User, user.id)
+
+
+def test_partial_update_of_nested_dict_value(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.settings["theme"]["colors"][1]["accent"] = "green"
+    del user1.settings["lang"]
+    u = reload(session, user1)
+
+    # Assert
+    assert len(updates) == 1
+    assert "settings=" in updates[0]
+    assert "settings=%(settings)s" not in updates[0] and "settings=?" not in updates[0]
+    assert u.settings == {"theme": {"colors": ["red", {"accent": "green"}]}}
+
+
+def test_partial_update_of_list_and_model(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.schedule[1]["day"] = "wed"
+    assert user1.addresses is not None
+    user1.addresses.home[0].city = "qux"
+    user1.addresses.preferred = Addresses.AddressItem(street="new", city="town")
+    u = reload(session, user1)
+
+    # Assert
+    assert len(updates) == 2
+    assert all("=%(" not in statement and "=?" not in statement for statement in updates)
+    assert u.schedule == [["meeting", "launch"], {"day": "wed"}]
+    assert u.addresses is not None
+    assert u.addresses.home[0].city == "qux"
+    assert u.addresses.preferred is not None
+    assert u.addresses.preferred.street == "new"
+
+
+def test_partial_update_falls_back_to_full_rewrite(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act - structural list changes and too many changed paths are written in full
+    user1.schedule.insert(0, "standup")
+    for key in ("a", "b", "c", "d"):
+        user1.settings[key] = key
+    u = reload(session, user1)
+
+    # Assert
+    assert len(updates) == 1
+    assert "schedule=" in updates[0] and "settings=" in updates[0]
+    assert u.schedule == ["standup", ["meeting", "launch"], {"day": "tue"}]
+    assert u.settings["d"] == "d"
+
+
+def test_partial_update_after_replacing_value(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act - a replaced value is written in full, then journaled again
+    user1.settings = {"theme": {}}
+    user1.settings["theme"]["mode"] = "dark"
+    session.commit()
+    user1.settings["theme"]["mode"] = "light"
+    u = reload(session, user1)
+
+    # Assert
+    assert len(updates) == 2
+    assert "settings=%(settings)s" in updates[0] or "settings=?" in updates[0]
+    assert "jsonb_set" in updates[1] or "json_set" in updates[1]
+    assert u.settings == {"theme": {"mode": "light"}}
+
+
+def test_journaled_values_pickle_round_trip(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+    session.expire_all()
+    values = [user1.settings, user1.schedule]
+
+    # Act
+    restored = [pickle.loads(pickle.dumps(value)) for value in values]
+
+    # Assert
+    assert [type(value) for value in restored] == [type(value) for value in values]
+    assert restored == values
+    assert restored[0]._journal_limit == 3
+
+
+def test_partial_update_through_nested_type_decorators(session: Session, user1: User, updates: list):
+
+    # Arrange
+    user1.profile = {"bio": {"short": "hi"}}
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.profile["bio"]["short"] = "hello"
+    u = reload(session, user1)
+
+    # Assert
+    assert len(updates) == 1
+    assert "jsonb_set" in updates[0] or "json_set" in updates[0]
+    assert u.profile == {"bio": {"short": "hello"}}
+
+
+def test_journaled_model_accepts_instances_of_its_model(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.addresses = Addresses(home=[Addresses.AddressItem(street="new", city="town")])
+    user1.addresses.home[0].city = "village"
+    u = reload(session, user1)
+
+    # Assert
+    assert u.addresses is not None
+    assert u.addresses.home[0].street == "new"
+    assert u.addresses.home[0].city == "village"
+
+
+def test_journaled_model_rejects_other_models(user1: User):
+    class Other(pydantic.BaseModel):
+        home: List[Addresses.AddressItem] = []
+
+    with pytest.raises(pydantic.ValidationError):
+        user1.addresses = Other(home=[Addresses.AddressItem(street="new", city="town")])
+
+
+def test_partial_update_after_assigning_value_of_another_row(session: Session, user1: User, updates: list):
+
+    # Arrange
+    user2 = User(name="bar", settings={"x": 1, "z": 5})
+    user1.settings = {"x": 0, "y": {"a": 1}}
+    session.add_all([user1, user2])
+    session.commit()
+
+    # Act - the journal of the value taken from `user2` does not describe the value stored for `user1`
+    settings = user2.settings
+    user2.settings = {}
+    user1.settings = settings
+    user1.settings["x"] = 99
+    u = reload(session, user1)
+
+    # Assert
+    assert u.settings == {"x": 99, "z": 5}
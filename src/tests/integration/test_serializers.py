@@ -0,0 +1,137 @@
+import json
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutableList
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable._compat import pydantic
+from sqlalchemyv2_nested_mutable.serializers import json_serializer
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        street: str
+        city: str
+
+    preferred: Optional[AddressItem] = None
+    home: List[AddressItem] = []
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[MutableDict] = mapped_column(
+        MutableDict.as_mutable(JSONB(), serializer="pydantic"), default=MutableDict
+    )
+    schedule: Mapped[MutableList] = mapped_column(
+        MutableList.as_mutable(JSONB(), serializer=lambda value: json.dumps(value)), default=MutableList
+    )
+    addresses: Mapped[Optional[Addresses]] = mapped_column(
+        Addresses.as_mutable(JSONB(), serializer="pydantic"), nullable=True
+    )
+    billing: Mapped[Optional[Addresses]] = mapped_column(Addresses.as_mutable(validate_json=True), nullable=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(
+        name="foo",
+        settings={"theme": {"colors": ["red", {"accent": "blue"}]}},
+        schedule=[["meeting", "launch"], {"day": "tue"}],
+        addresses={"preferred": {"street": "bar", "city": "baz"}, "home": [{"street": "bar1", "city": "baz"}]},
+    )
+
+
+def test_serializer_round_trip(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+
+    # Act
+    u.settings["theme"]["colors"][1]["accent"] = "green"
+    u.schedule[1]["day"] = "wed"
+    assert u.addresses is not None
+    u.addresses.home.append(Addresses.AddressItem(street="bar2", city="baz"))
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert u.settings == {"theme": {"colors": ["red", {"accent": "green"}]}}
+    assert u.schedule == [["meeting", "launch"], {"day": "wed"}]
+    assert u.addresses is not None
+    assert [item.street for item in u.addresses.home] == ["bar1", "bar2"]
+
+
+def test_serializer_encodes_tracked_values_to_text(user1: User):
+
+    # Arrange
+    serialize = json_serializer("pydantic")
+
+    # Act
+    settings = serialize(user1.settings)
+    addresses = serialize(user1.addresses)
+
+    # Assert
+    assert json.loads(settings) == {"theme": {"colors": ["red", {"accent": "blue"}]}}
+    assert json.loads(addresses)["home"] == [{"street": "bar1", "city": "baz"}]
+    with pytest.raises(ValueError):
+        json_serializer("unknown")
+
+
+def test_validate_json_loads_models_from_text(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    u.billing = Addresses(preferred=Addresses.AddressItem(street="bar", city="baz"))
+    session.add(u)
+    session.commit()
+    session.expire_all()
+
+    # Act
+    assert u.billing is not None
+    u.billing.home.append(Addresses.AddressItem(street="bar2", city="baz"))
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert isinstance(u.billing, Addresses)
+    assert u.billing.preferred is not None and u.billing.preferred.city == "baz"
+    assert [item.street for item in u.billing.home] == ["bar2"]
+
+
+def test_wrapped_json_keeps_jsonb_comparator(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    with_theme = session.scalars(sa.select(User.name).where(User.settings.has_key("theme"))).all()
+    with_colors = session.scalars(
+        sa.select(User.name).where(User.settings.contains({"theme": {"colors": ["red"]}}))
+    ).all()
+
+    # Assert
+    assert with_theme == ["foo"]
+    assert with_colors == ["foo"]
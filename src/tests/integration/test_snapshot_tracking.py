@@ -0,0 +1,181 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import Connection
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutableList
+from sqlalchemyv2_nested_mutable import snapshot
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[dict] = mapped_column(MutableDict.as_mutable(JSONB(), tracking="snapshot"), default=dict)
+    schedule: Mapped[list] = mapped_column(MutableList.as_mutable(JSONB(), tracking="snapshot"), default=list)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(
+        name="foo",
+        settings={"theme": {"colors": ["red", {"accent": "blue"}]}},
+        schedule=[["meeting", "launch"], {"day": "tue"}],
+    )
+
+
+@pytest.fixture(scope="function")
+def updates(connection: Connection):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            statements.append(statement)
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(connection, "before_cursor_execute", before_cursor_execute)
+
+
+def test_snapshot_tracking_keeps_plain_values(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+    session.expire_all()
+
+    # Act
+    settings = user1.settings
+    schedule = user1.schedule
+
+    # Assert
+    assert type(settings) is dict and type(settings["theme"]["colors"]) is list
+    assert type(schedule) is list and type(schedule[1]) is dict
+
+
+def test_snapshot_tracking_writes_changed_values(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.settings["theme"]["colors"][1]["accent"] = "green"
+    user1.schedule[0].append("review")
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert len(updates) == 1
+    assert user1.settings == {"theme": {"colors": ["red", {"accent": "green"}]}}
+    assert user1.schedule == [["meeting", "launch", "review"], {"day": "tue"}]
+
+
+def test_snapshot_tracking_skips_unchanged_values(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+
+    # Act
+    user1.settings["theme"]["colors"].append("blue")
+    user1.settings["theme"]["colors"].pop()
+    session.commit()
+    user1.name = "bar"
+    session.commit()
+
+    # Assert
+    assert len(updates) == 1
+    assert "settings" not in updates[0]
+
+
+def test_snapshot_tracking_after_autoflush(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+    user1.settings["theme"] = "dark"
+
+    # Act
+    count = session.scalar(sa.select(sa.func.count()).select_from(User).where(User.name == "foo"))
+    user1.schedule[1]["day"] = "wed"
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert count == 1
+    assert len(updates) == 2
+    assert user1.settings == {"theme": "dark"}
+    assert user1.schedule == [["meeting", "launch"], {"day": "wed"}]
+
+
+def test_snapshot_tracking_explicit_flush(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+    session.expunge_all()
+    user = session.scalars(sa.select(User).where(User.name == "foo")).one()
+
+    # Act - changes right after a load, then right after a flush
+    user.settings["theme"] = "dark"
+    snapshot.detect_changes(session)
+    session.flush()
+    user.schedule[1]["day"] = "wed"
+    snapshot.detect_changes(session)
+    session.flush()
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert len(updates) == 2
+    assert "settings" in updates[0] and "schedule" in updates[1]
+    assert user.settings == {"theme": "dark"}
+    assert user.schedule == [["meeting", "launch"], {"day": "wed"}]
+
+
+def test_snapshot_tracking_leaves_loaded_rows_clean(session: Session, user1: User, updates: list):
+
+    # Arrange
+    session.add_all([user1, User(name="bar")])
+    session.commit()
+    session.expunge_all()
+    updated = []
+
+    def before_update(mapper, connection, target):
+        updated.append(target.name)
+
+    # Act
+    event.listen(User, "before_update", before_update)
+    user, other = session.scalars(sa.select(User).order_by(User.id)).all()
+    dirty = set(session.dirty)
+    user.settings["theme"] = "dark"
+    session.commit()
+    event.remove(User, "before_update", before_update)
+
+    # Assert
+    assert dirty == set()
+    assert updated == ["foo"]
+    assert len(updates) == 1
+
+
+def test_snapshot_tracking_rejects_other_options():
+    with pytest.raises(ValueError):
+        MutableDict.as_mutable(JSONB(), tracking="snapshot", lazy=True)
+    with pytest.raises(ValueError):
+        MutableDict.as_mutable(JSONB(), tracking="unknown")
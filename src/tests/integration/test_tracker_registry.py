@@ -0,0 +1,123 @@
+import gc
+import weakref
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import register_tracker
+from sqlalchemyv2_nested_mutable import trackable
+from sqlalchemyv2_nested_mutable import TrackedList
+from sqlalchemyv2_nested_mutable.trackable import TrackedObject
+from sqlalchemyv2_nested_mutable.trackable import tracker_of
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[MutableDict] = mapped_column(MutableDict.as_mutable(JSONB()), default=MutableDict)
+
+
+class Tags(list):
+    pass
+
+
+class TrackedTags(TrackedList):
+    __slots__ = ()
+
+    def first(self):
+        return self[0]
+
+
+class Frozen(dict):
+    pass
+
+
+def track_tags(value):
+    tags = TrackedTags()
+    list.extend(tags, (TrackedObject.make_nested_trackable(tag, tags) for tag in value))
+    return tags
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def trackers():
+    # the registry is shared by the whole process, restore it for the other tests
+    registered = dict(trackable._trackers)
+    yield
+    trackable._trackers.clear()
+    trackable._trackers.update(registered)
+    trackable._clear_dispatch()
+
+
+def test_registered_type_is_tracked(session: Session, trackers):
+
+    # Arrange
+    # wrapped as a list before `Tags` gets a tracker of its own
+    MutableDict({"tags": Tags(["seen", "before"])})
+    register_tracker(Tags, track_tags)
+    user = User(name="foo", settings={"tags": Tags(["a"])})
+    session.add(user)
+    session.commit()
+
+    # Act
+    user.settings["tags"] = Tags(["b"])
+    session.flush()
+    user.settings["tags"].append("c")
+
+    # Assert
+    assert isinstance(user.settings["tags"], TrackedTags)
+    assert user.settings["tags"].first() == "b"
+    assert user in session.dirty
+    session.commit()
+    session.refresh(user)
+    assert user.settings["tags"] == ["b", "c"]
+
+
+def test_registered_type_left_as_is(session: Session, trackers):
+
+    # Arrange
+    register_tracker(Frozen, None)
+    user = User(name="foo", settings={"limits": Frozen(max=1)})
+    session.add(user)
+    session.commit()
+
+    # Act
+    user.settings["limits"] = Frozen(max=2)
+    session.flush()
+    user.settings["limits"]["max"] = 3
+
+    # Assert
+    assert type(user.settings["limits"]) is Frozen
+    assert user not in session.dirty
+
+
+def test_tracker_cache_does_not_keep_classes_alive():
+
+    # Arrange
+    class Settings(dict):
+        pass
+
+    # Act
+    tracker = tracker_of(Settings)
+    settings_ref = weakref.ref(Settings)
+    del Settings
+    gc.collect()
+
+    # Assert
+    assert tracker is not None
+    assert settings_ref() is None
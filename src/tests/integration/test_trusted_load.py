@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import ClassVar
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import MutablePydanticBaseModel
+from sqlalchemyv2_nested_mutable import TrackedList
+from sqlalchemyv2_nested_mutable import TrackedPydanticBaseModel
+from sqlalchemyv2_nested_mutable._compat import pydantic
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Addresses(MutablePydanticBaseModel):
+    class AddressItem(pydantic.BaseModel):
+        validations: ClassVar[int] = 0
+
+        street: str
+        city: str
+        moved_in: Optional[datetime] = None
+
+        @pydantic.field_validator("street")
+        @classmethod
+        def count_validations(cls, value: str) -> str:
+            Addresses.AddressItem.validations += 1
+            return value
+
+    preferred: Optional[AddressItem] = None
+    home: List[AddressItem] = []
+    by_name: Dict[str, AddressItem] = {}
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    addresses: Mapped[Optional[Addresses]] = mapped_column(
+        Addresses.as_mutable(JSONB(), trusted_load=True, serializer="pydantic"), nullable=True
+    )
+    lazy_addresses: Mapped[Optional[Addresses]] = mapped_column(
+        Addresses.as_mutable(JSONB(), lazy=True, trusted_load=True, serializer="pydantic"), nullable=True
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function")
+def user1():
+    addresses = {
+        "preferred": {"street": "bar", "city": "baz", "moved_in": "2020-01-01T00:00:00"},
+        "home": [{"street": "bar1", "city": "baz"}],
+        "by_name": {"work": {"street": "bar2", "city": "baz"}},
+    }
+    return User(name="foo", addresses=addresses, lazy_addresses=addresses)
+
+
+def test_trusted_load_skips_validation(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+    session.expire_all()
+    Addresses.AddressItem.validations = 0
+
+    # Act
+    addresses = u.addresses
+    lazy_addresses = u.lazy_addresses
+
+    # Assert
+    assert addresses is not None and lazy_addresses is not None
+    assert isinstance(addresses.preferred, TrackedPydanticBaseModel)
+    assert isinstance(addresses.home, TrackedList)
+    assert addresses.preferred.moved_in == datetime(2020, 1, 1)
+    assert lazy_addresses.by_name["work"].street == "bar2"
+    assert Addresses.AddressItem.validations == 0
+
+
+def test_trusted_load_tracks_changes(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+    session.expire_all()
+
+    # Act
+    assert u.addresses is not None and u.lazy_addresses is not None
+    u.addresses.home[0].city = "qux"
+    u.addresses.by_name["work"].city = "qux"
+    u.lazy_addresses.home.append(Addresses.AddressItem(street="bar3", city="baz"))
+    session.commit()
+    session.expire_all()
+
+    # Assert
+    assert u.addresses.home[0].city == "qux"
+    assert u.addresses.by_name["work"].city == "qux"
+    assert [item.street for item in u.lazy_addresses.home] == ["bar1", "bar3"]
+
+
+def test_trusted_load_validates_assigned_values(session: Session, user1: User):
+
+    # Arrange
+    u = user1
+    session.add(u)
+    session.commit()
+
+    # Act / Assert
+    with pytest.raises(pydantic.ValidationError):
+        u.addresses = {"preferred": {"street": "bar"}}
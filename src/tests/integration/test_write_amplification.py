@@ -0,0 +1,95 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import Session
+from sqlalchemyv2_nested_mutable import amplification
+from sqlalchemyv2_nested_mutable import instrumentation
+from sqlalchemyv2_nested_mutable import MutableDict
+from sqlalchemyv2_nested_mutable import MutableList
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class User(Base):
+    __tablename__ = "user_account"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(30))
+    settings: Mapped[MutableDict] = mapped_column(MutableDict.as_mutable(JSONB()), default=MutableDict)
+    schedule: Mapped[MutableList] = mapped_column(MutableList.as_mutable(JSONB()), default=MutableList)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mapper():
+    return Base
+
+
+@pytest.fixture(scope="function", autouse=True)
+def recorder():
+    yield amplification.enable()
+    instrumentation.disable()
+
+
+@pytest.fixture(scope="function")
+def user1():
+    return User(
+        name="foo",
+        settings={"theme": {"colors": ["red", {"accent": "blue"}]}, "notes": "x" * 100},
+        schedule=[["meeting", "launch"], {"day": "tue"}],
+    )
+
+
+def test_write_amplification_of_inserts(session: Session, user1: User):
+
+    # Act
+    session.add(user1)
+    session.commit()
+
+    # Assert
+    columns = amplification.report()["columns"]
+    assert columns["User.settings"]["writes"] == 1
+    assert columns["User.settings"]["bytes_written"] == columns["User.settings"]["bytes_changed"]
+    assert columns["User.settings"]["amplification"] == 1.0
+
+
+def test_write_amplification_of_nested_changes(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+    instrumentation.reset()
+
+    # Act
+    user1.settings["theme"]["colors"][1]["accent"] = "green"
+    user1.schedule[1] = {"day": "wed"}
+    session.commit()
+
+    # Assert
+    report = amplification.report()
+    assert report["columns"]["User.settings"]["bytes_changed"] == len('"green"')
+    assert report["columns"]["User.settings"]["bytes_written"] > 100
+    assert report["columns"]["User.schedule"]["bytes_changed"] == len('{"day":"wed"}')
+    assert report["tables"]["user_account"]["writes"] == 2
+    assert report["tables"]["user_account"]["amplification"] > 1
+
+
+def test_write_amplification_of_replaced_values(session: Session, user1: User):
+
+    # Arrange
+    session.add(user1)
+    session.commit()
+    instrumentation.reset()
+
+    # Act
+    user1.schedule = [["review"]]
+    session.commit()
+
+    # Assert
+    columns = amplification.report()["columns"]
+    assert "User.settings" not in columns
+    assert columns["User.schedule"]["amplification"] == 1.0